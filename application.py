@@ -1,9 +1,56 @@
-from fastapi import FastAPI, Request
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI, HTTPException, Request, Response
+from fastapi.responses import JSONResponse
 from dotenv import load_dotenv
+import logging
+import secrets
 
 load_dotenv()
 
-app = FastAPI()
+from core import config, metrics
+from core.client import pool_stats
+from core.rate_limit import BodySizeLimitMiddleware, RateLimitMiddleware
+from core.resources import resources
+from core.security import get_current_user
+
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Secretos y clientes de AWS se crean en paralelo al arrancar, no al importar
+    failed = {name: error for name, error in (await resources.warm(timeout=config.STARTUP_TIMEOUT_SECONDS)).items() if error}
+    if failed:
+        logger.error(f"Recursos sin inicializar al arrancar (se reintentan en su primer uso): {failed}")
+    # Desde acá, lo que falte no se crea en el event loop: 503 y se crea en un hilo
+    resources.fail_fast = True
+    resources.start_refresh(timeout=config.STARTUP_TIMEOUT_SECONDS)
+    yield
+    resources.fail_fast = False
+    await resources.stop_refresh()
+
+app = FastAPI(lifespan=lifespan)
+# El último middleware agregado es el más externo: las métricas también ven los 413 y 429.
+# Los límites por IP/usuario van antes de que FastAPI lea y valide el cuerpo
+from blog.routers.blog_routers import admit_create_post
+from users.routers.users import admit_login, admit_register
+app.add_middleware(
+    RateLimitMiddleware,
+    checks={
+        ("POST", "/users/login"): admit_login,
+        ("POST", "/users/register"): admit_register,
+        ("POST", "/blog/create"): admit_create_post,
+    },
+)
+app.add_middleware(
+    BodySizeLimitMiddleware,
+    max_bytes=config.MAX_REQUEST_BODY_BYTES,
+    limits={
+        "/blog/create": config.MAX_POST_BODY_BYTES,
+        "/blog/edit/": config.MAX_POST_BODY_BYTES,
+        "/blog/upload/": config.MAX_IMAGE_UPLOAD_BYTES,
+    },
+)
+app.add_middleware(metrics.MetricsMiddleware, server_timing=config.METRICS_SERVER_TIMING)
 
 @app.get("/")
 async def inicio(request: Request):
@@ -13,6 +60,31 @@ async def inicio(request: Request):
         "url": f"{base_url}docs"
         }
 
+@app.get("/ready", include_in_schema=False)
+async def readiness():
+    # Health check del balanceador: 503 hasta que secretos y clientes de AWS estén creados
+    pending = [name for name in resources.factories if not resources.is_ready(name)]
+    for name in pending:
+        resources.build_in_background(name)
+    if pending:
+        return JSONResponse({"ready": False, "pending": pending}, status_code=503)
+    return {"ready": True}
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics(request: Request):
+    expected = f"Bearer {config.METRICS_TOKEN}"
+    if config.METRICS_TOKEN and not secrets.compare_digest(request.headers.get("authorization", ""), expected):
+        raise HTTPException(status_code=401, detail="Unauthorized")
+    body, content_type = metrics.exposition(request.headers.get("accept"))
+    return Response(content=body, media_type=content_type)
+
+@app.get("/metrics/aws")
+async def aws_metrics(user=Depends(get_current_user)):
+    # Para dimensionar AWS_MAX_POOL_CONNECTIONS: peak_in_flight cerca de max_pool_connections = pool saturado
+    if user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Forbidden")
+    return {"clients": pool_stats(), "resources": resources.stats()}
+
 # Registrar las rutas de todos los microservicios
 from users.routers import users  # Importa directamente el router de usuarios
 app.include_router(users.router, prefix="/users")  # Agrega las rutas bajo el prefijo "/users"
@@ -30,9 +102,16 @@ app.include_router(blog_routers.router, prefix="/blog")  # Agrega las rutas bajo
 # app.include_router(catalog.router, prefix="/catalog")  # Agrega las rutas bajo el prefijo "/orders"
 
 
-import os
-
 if __name__ == "__main__":
+    # Desarrollo o servidores sin gunicorn; en producción: gunicorn -c gunicorn.conf.py application:app
     import uvicorn
-    port = int(os.getenv("PORT", 8080))
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    uvicorn.run(
+        "application:app",  # Con varios workers uvicorn necesita la app como import string
+        host="0.0.0.0",
+        port=config.PORT,
+        workers=config.WEB_CONCURRENCY,
+        # Reciclar solo con supervisor: con un único proceso, el servidor terminaría
+        limit_max_requests=(config.WORKER_MAX_REQUESTS or None) if config.WEB_CONCURRENCY > 1 else None,
+        timeout_graceful_shutdown=config.WORKER_GRACEFUL_TIMEOUT,
+        timeout_keep_alive=config.SERVER_KEEPALIVE_SECONDS,
+    )
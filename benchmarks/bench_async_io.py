@@ -0,0 +1,65 @@
+# benchmarks/bench_async_io.py
+"""
+Throughput de lecturas de DynamoDB desde el event loop: llamada boto3
+bloqueante dentro de una corrutina vs. la misma llamada con el pool de
+I/O asíncrono (core.client.aio / run_io).
+
+Con la llamada bloqueante las corrutinas se ejecutan de a una; con el pool
+se solapan hasta AWS_IO_MAX_WORKERS llamadas.
+
+Uso:
+    python -m benchmarks.bench_async_io [--requests 500] [--concurrency 50] [--latency-ms 10]
+"""
+
+import argparse
+import asyncio
+import time
+
+from benchmarks.local_aws import add_latency, local_aws
+
+
+async def drive(call, total: int, concurrency: int) -> float:
+    """Ejecuta `total` llamadas con `concurrency` corrutinas; retorna req/s."""
+    remaining = iter(range(total))
+
+    async def worker():
+        for _ in remaining:
+            await call()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return total / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=10.0, help="Latencia de red simulada por llamada")
+    args = parser.parse_args()
+
+    with local_aws():
+        from core.client import aio, dynamodb
+        from core.schema import BLOG_POSTS_TABLE
+
+        table = dynamodb.Table(BLOG_POSTS_TABLE)
+        table.put_item(Item={"post_id": "bench", "title": "benchmark"})
+        add_latency(table.meta.client, args.latency_ms)
+        atable = aio(table)
+
+        async def blocking_call():
+            table.get_item(Key={"post_id": "bench"})
+
+        async def async_call():
+            await atable.get_item(Key={"post_id": "bench"})
+
+        blocking = asyncio.run(drive(blocking_call, args.requests, args.concurrency))
+        pooled = asyncio.run(drive(async_call, args.requests, args.concurrency))
+
+    print(f"requests={args.requests} concurrency={args.concurrency} latency={args.latency_ms}ms")
+    print(f"  boto3 bloqueante en el event loop: {blocking:8.1f} req/s")
+    print(f"  pool de I/O asíncrono (aio):       {pooled:8.1f} req/s  (x{pooled / blocking:.1f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# benchmarks/bench_create_post.py
+"""
+Latencia de create_post con portada y miniatura en base64: los pasos en
+secuencia (chequeo de slug, portada, miniatura, escritura) vs. la versión
+actual, que hace el chequeo y las dos subidas en paralelo.
+
+Uso:
+    python -m benchmarks.bench_create_post [--iterations 20] [--latency-ms 20] [--image-kb 256]
+"""
+
+import argparse
+import asyncio
+import base64
+import os
+import statistics
+import time
+
+from benchmarks.local_aws import add_latency, local_aws
+
+
+def random_image(size_kb: int) -> str:
+    # Bytes aleatorios: cada imagen es distinta y no se deduplica
+    return "data:image/png;base64," + base64.b64encode(os.urandom(size_kb * 1024)).decode("ascii")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Latencia de red simulada por llamada a AWS")
+    parser.add_argument("--image-kb", type=int, default=256)
+    args = parser.parse_args()
+
+    with local_aws():
+        from blog.db.schemas.blog_schemas import BlogPostCreate
+        from blog.services import blog_services
+        from core import config
+        from core.client import dynamodb, dynamodbClient
+
+        # Los derivados se generan fuera del request: no forman parte de la medición
+        blog_services.schedule_derivatives = lambda *args, **kwargs: None
+
+        add_latency(dynamodb.meta.client, args.latency_ms)
+        add_latency(dynamodbClient, args.latency_ms)
+        add_latency(config.s3_client, args.latency_ms)
+
+        def payload(i: int, label: str) -> BlogPostCreate:
+            return BlogPostCreate(
+                title=f"Benchmark {label} {i}",
+                content="contenido del benchmark",
+                cover=random_image(args.image_kb),
+                thumbnail=random_image(args.image_kb // 4),
+            )
+
+        async def sequential(data: BlogPostCreate):
+            # Mismos pasos que create_post, uno detrás de otro
+            slug = blog_services.slugify(data.title)
+            await blog_services.ensure_slug_available(slug, "", "slug en uso")
+            cover_url = await blog_services.safe_upload(data.cover)
+            thumbnail_url = await blog_services.safe_upload(data.thumbnail)
+            post_id = slug
+            await blog_services.blogposts_table.put_item(Item={
+                "post_id": post_id, "slug": slug, "cover_url": cover_url, "thumbnail_url": thumbnail_url,
+            })
+
+        async def parallel(data: BlogPostCreate):
+            await blog_services.create_post(data, author_id="bench", author_name="Benchmark")
+
+        async def measure(label: str, func) -> list:
+            samples = []
+            for i in range(args.iterations):
+                data = payload(i, label)
+                start = time.perf_counter()
+                await func(data)
+                samples.append((time.perf_counter() - start) * 1000)
+            return samples
+
+        async def run():
+            return await measure("seq", sequential), await measure("par", parallel)
+
+        seq, par = asyncio.run(run())
+
+    print(f"iterations={args.iterations} latency={args.latency_ms}ms image={args.image_kb}KB")
+    for label, samples in (("secuencial", seq), ("paralelo (create_post)", par)):
+        print(f"  {label:24s} p50={statistics.median(samples):7.1f} ms  max={max(samples):7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
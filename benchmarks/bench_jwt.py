@@ -0,0 +1,60 @@
+# benchmarks/bench_jwt.py
+"""
+Verificaciones de JWT por segundo en un solo núcleo: cada verificador
+disponible (python-jose y, si está instalado, PyJWT) decodificando en cada
+request vs. la verificación cacheada de core.security.verify_token, que
+sirve los tokens repetidos sin volver a comprobar la firma.
+
+Uso:
+    python -m benchmarks.bench_jwt [--iterations 20000] [--tokens 100]
+"""
+
+import argparse
+import asyncio
+import time
+
+from benchmarks.local_aws import local_aws
+
+
+def per_second(call, tokens, iterations: int) -> float:
+    start = time.perf_counter()
+    for i in range(iterations):
+        call(tokens[i % len(tokens)])
+    return iterations / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--tokens", type=int, default=100, help="Tokens distintos (usuarios activos) que se reparten los requests")
+    args = parser.parse_args()
+
+    with local_aws():  # SECRET_KEY desde el Secrets Manager simulado (o el entorno local)
+        from core import security
+
+    tokens = [
+        security.create_access_token({"sub": f"user-{i}", "name": "Bench", "role": "user"})
+        for i in range(args.tokens)
+    ]
+
+    results = {}
+    for name in security.VERIFIERS:
+        try:
+            verifier = security.build_verifier(name)
+        except ImportError:
+            print(f"  {name}: no instalado, se omite")
+            continue
+        results[f"{name} (sin caché)"] = per_second(verifier.decode, tokens, args.iterations)
+
+    loop = asyncio.new_event_loop()
+    cached = lambda token: loop.run_until_complete(security.verify_token(token))
+    results[f"{security.token_verifier.name} + caché"] = per_second(cached, tokens, args.iterations)
+    loop.close()
+
+    print(f"iterations={args.iterations} tokens={args.tokens}")
+    for label, rate in results.items():
+        print(f"  {label:<22} {rate:10.0f} tokens/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# benchmarks/bench_micro.py
+"""
+Micro-benchmarks de las funciones de CPU que corren en cada request:
+slugify, decode_base64_image, make_excerpt, tokenización para la búsqueda
+y creación/verificación de tokens JWT.
+
+Cada caso se repite (timeit) y se reporta el mejor de --repeat rondas, para
+comparar versiones del código en la misma máquina.
+
+Uso:
+    python -m benchmarks.bench_micro [--repeat 5] [--filter slugify]
+"""
+
+import argparse
+import asyncio
+import base64
+import os
+import timeit
+
+from benchmarks.local_aws import local_aws
+
+LONG_TITLE = "¿Cómo quitar manchas de óxido del acero inoxidable sin dañar la superficie? Guía práctica " * 3
+CONTENT = ("La limpieza del baño empieza por las juntas: vinagre, bicarbonato y paciencia. " * 40).strip()
+
+
+def data_url(size_kb: int) -> str:
+    return "data:image/png;base64," + base64.b64encode(os.urandom(size_kb * 1024)).decode("ascii")
+
+
+def cases() -> dict:
+    """{nombre: (función sin argumentos, bytes procesados por llamada o None)}."""
+    from blog.services.blog_services import make_excerpt
+    from blog.services.search_services import term_weights
+    from blog.utils.s3_utils import decode_base64_image
+    from blog.utils.text_utils import slugify
+    from core import security
+
+    claims = {"sub": "user-1", "name": "Bench", "role": "user"}
+    access_token = security.create_access_token(claims)
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(security.verify_token(access_token))  # Queda en el caché de tokens verificados
+
+    found = {
+        "slugify (título corto)": (lambda: slugify("Hola Mundo: Limpieza Ecológica"), None),
+        "slugify (título largo)": (lambda: slugify(LONG_TITLE), None),
+        "make_excerpt (3 KB)": (lambda: make_excerpt(CONTENT), None),
+        "term_weights (3 KB)": (lambda: term_weights("Limpieza del baño", CONTENT), None),
+        "create_access_token": (lambda: security.create_access_token(claims), None),
+        "create_refresh_token": (lambda: security.create_refresh_token({**claims, "jti": "j", "fam": "f"}), None),
+        f"verificar token ({security.token_verifier.name})": (lambda: security.token_verifier.decode(access_token), None),
+        "verify_token (caché)": (lambda: loop.run_until_complete(security.verify_token(access_token)), None),
+    }
+    for size_kb in (64, 1024, 5 * 1024):
+        image = data_url(size_kb)
+        found[f"decode_base64_image ({size_kb} KB)"] = (lambda image=image: decode_base64_image(image), size_kb * 1024)
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--filter", default="", help="Solo los casos cuyo nombre contenga este texto")
+    args = parser.parse_args()
+
+    with local_aws():  # SECRET_KEY desde el Secrets Manager simulado (o el entorno local)
+        selected = {name: case for name, case in cases().items() if args.filter in name}
+
+    for name, (func, size) in selected.items():
+        timer = timeit.Timer(func)
+        number, _ = timer.autorange()
+        best = min(timer.repeat(repeat=args.repeat, number=number)) / number
+        throughput = f"{size / best / 1024 / 1024:9.1f} MB/s" if size else f"{1 / best:9.0f} ops/s"
+        print(f"  {name:<36} {best * 1e6:10.2f} µs  {throughput}")
+
+
+if __name__ == "__main__":
+    main()
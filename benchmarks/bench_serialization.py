@@ -0,0 +1,130 @@
+# benchmarks/bench_serialization.py
+"""
+Costo de serializar una página de posts (ítems de DynamoDB -> bytes JSON),
+por tamaño de página, con los tres caminos posibles:
+
+  - pydantic + jsonable_encoder: el camino anterior (model(**item), luego
+    jsonable_encoder y json.dumps, como JSONResponse)
+  - pydantic + dump_json: model(**item) y el serializador de pydantic (lo
+    que hace FastAPI con un response_model sin response_class propia)
+  - item_to_response + orjson: el camino actual de /blog/posts
+
+También mide AuthResponse/UserOut, que siguen en el camino de FastAPI:
+es un solo objeto chico por request y dump_json ya lo serializa en Rust.
+
+Uso:
+    python -m benchmarks.bench_serialization [--repeat 5] [--sizes 1,10,50,100]
+"""
+
+import argparse
+import json
+import timeit
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from benchmarks.bench_micro import CONTENT
+from blog.db.models.blog_models import BlogPost, BlogPostSummary
+from core.responses import ORJSONResponse, item_to_response
+from users.db.schemas.users_schemas import AuthResponse
+
+
+def dynamo_item(i: int) -> dict:
+    """Un post tal como lo retorna boto3 (números como Decimal, fechas en ISO)."""
+    created = datetime(2024, 1, 1) + timedelta(minutes=i)
+    return {
+        "post_id": f"post-{i:06d}",
+        "slug": f"post-de-prueba-{i}",
+        "title": f"Post de prueba {i}",
+        "content": CONTENT,
+        "excerpt": CONTENT[:200],
+        "cover_url": f"https://cdn.example.com/covers/{i}.webp",
+        "thumbnail_url": f"https://cdn.example.com/thumbs/{i}.webp",
+        "cover_srcset": ", ".join(f"https://cdn.example.com/covers/{i}-{w}.webp {w}w" for w in (320, 640, 1280)),
+        "author_id": "user-1",
+        "author_name": "Bench",
+        "created_at": created.isoformat(),
+        "updated_at": (created + timedelta(hours=1)).isoformat(),
+        "version": Decimal(3),
+        "listing": "ALL",
+    }
+
+
+def json_dumps(content) -> bytes:
+    # Igual que starlette.responses.JSONResponse.render
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def page_cases(model, items: list) -> dict:
+    page_adapter = TypeAdapter(dict)
+    models_adapter = TypeAdapter(list[model])
+    orjson_response = ORJSONResponse(None)
+
+    def encoder():
+        return json_dumps(jsonable_encoder({"items": [model(**item) for item in items], "next_token": None}))
+
+    def dump_json():
+        posts = models_adapter.validate_python(items)
+        return page_adapter.dump_json({"items": posts, "next_token": None})
+
+    def direct():
+        return orjson_response.render({"items": [item_to_response(item, model) for item in items], "next_token": None})
+
+    return {"pydantic + jsonable_encoder": encoder, "pydantic + dump_json": dump_json, "item_to_response + orjson": direct}
+
+
+def auth_cases() -> dict:
+    auth = {
+        "access_token": "x" * 180,
+        "refresh_token": "y" * 220,
+        "token_type": "bearer",
+        "user": {
+            "id": "user-1",
+            "email": "bench@example.com",
+            "name": "Bench",
+            "role": "user",
+            "picture": "https://cdn.example.com/avatars/1.webp",
+            "created_at": "2024-01-01T00:00:00",
+        },
+    }
+    adapter = TypeAdapter(AuthResponse)
+    obj = AuthResponse(**auth)
+    orjson_response = ORJSONResponse(None)
+    return {
+        "pydantic + jsonable_encoder": lambda: json_dumps(jsonable_encoder(obj)),
+        "pydantic + dump_json": lambda: adapter.dump_json(obj),
+        "orjson (model_dump)": lambda: orjson_response.render(obj),
+    }
+
+
+def measure(func, repeat: int) -> float:
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--sizes", default="1,10,50,100", help="Tamaños de página, separados por coma")
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(",")]
+
+    for model in (BlogPost, BlogPostSummary):
+        print(f"{model.__name__}")
+        for size in sizes:
+            items = [dynamo_item(i) for i in range(size)]
+            results = {name: measure(func, args.repeat) for name, func in page_cases(model, items).items()}
+            baseline = results["pydantic + jsonable_encoder"]
+            for name, secs in results.items():
+                print(f"  {size:>4} posts  {name:<28} {secs * 1e6:10.1f} µs  x{baseline / secs:5.1f}")
+
+    print("AuthResponse")
+    for name, func in auth_cases().items():
+        print(f"  {name:<39} {measure(func, args.repeat) * 1e6:10.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
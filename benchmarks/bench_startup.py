@@ -0,0 +1,79 @@
+# benchmarks/bench_startup.py
+"""
+Costo de arranque: importar la app y crear secretos / clientes de AWS.
+
+  - import: tiempo de `import application` en un proceso nuevo; ya no crea
+    clientes ni llama a Secrets Manager, así que no depende de la red
+  - serie: crear los recursos uno tras otro (lo que antes pasaba al importar)
+  - warm: crearlos en paralelo como hace el lifespan (core.resources.warm)
+
+Secrets Manager, DynamoDB y S3 se simulan con moto; --latency-ms agrega a
+cada recurso la latencia de red de su primera llamada (credenciales,
+DNS/TLS, GetSecretValue).
+
+Uso:
+    python -m benchmarks.bench_startup [--latency-ms 150] [--runs 5]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.local_aws import LOCAL_ENV, local_aws
+
+
+def import_seconds() -> float:
+    code = "import time; t = time.perf_counter(); import application; print(time.perf_counter() - t)"
+    env = {**os.environ, **LOCAL_ENV}
+    output = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True)
+    return float(output.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency-ms", type=float, default=150.0, help="Latencia simulada al crear cada recurso")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    imports = [import_seconds() for _ in range(args.runs)]
+
+    serial, warm = [], []
+    with local_aws():
+        import application  # noqa: F401  (registra todos los recursos)
+        from core.resources import resources
+
+        # Crear una sesión de boto3 no usa la red; el resto paga su primera conexión
+        factories = {name: f for name, f in resources.factories.items() if not name.endswith("_session")}
+
+        def slow(factory):
+            def build():
+                time.sleep(args.latency_ms / 1000)
+                return factory()
+            return build
+
+        for _ in range(args.runs):
+            for name, factory in factories.items():
+                resources.override(name, slow(factory))
+            start = time.perf_counter()
+            for name in factories:
+                resources.get(name)
+            serial.append(time.perf_counter() - start)
+
+            for name, factory in factories.items():
+                resources.override(name, slow(factory))
+            start = time.perf_counter()
+            asyncio.run(resources.warm())
+            warm.append(time.perf_counter() - start)
+
+    print(f"recursos={len(factories)} latency={args.latency_ms}ms runs={args.runs} (mediana)")
+    print(f"  import application:       {statistics.median(imports) * 1000:8.1f} ms")
+    print(f"  recursos en serie:        {statistics.median(serial) * 1000:8.1f} ms")
+    print(f"  recursos en paralelo:     {statistics.median(warm) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
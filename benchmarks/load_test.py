@@ -0,0 +1,214 @@
+# benchmarks/load_test.py
+"""
+Prueba de carga de la API completa: levanta la app con uvicorn contra AWS
+local (moto, o DynamoDB Local con --dynamodb-endpoint), carga usuarios y
+posts, y ejecuta cada escenario por separado con N clientes concurrentes.
+
+Por escenario reporta p50/p95/p99, throughput, errores, llamadas a AWS por
+request y capacidad consumida de DynamoDB (según core.metrics; moto solo la
+informa en algunas operaciones, DynamoDB Local en todas).
+
+Las lecturas pasan por los cachés de la app como en producción. Los números
+con moto sirven para comparar versiones en la misma máquina, no como
+estimación de la latencia real contra AWS (usar --latency-ms para simular red).
+
+Requiere moto y httpx (pip install "moto[dynamodb,s3]" httpx).
+
+Uso:
+    python -m benchmarks.load_test [--users 10000] [--posts 10000] [--concurrency 32]
+        [--duration 15] [--scenarios login,me,list_posts,get_post,create_post]
+        [--latency-ms 0] [--dynamodb-endpoint http://localhost:8000] [--json resultados.json]
+        [--base-url http://127.0.0.1:8080]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import threading
+import time
+import uuid
+from contextlib import nullcontext
+
+from benchmarks.local_aws import add_latency, local_aws
+
+SCENARIOS = ("login", "me", "list_posts", "get_post", "create_post")
+
+
+def percentile(samples: list, p: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+
+class Server:
+    """La app en un uvicorn dentro de un hilo (mismo proceso: comparte el mock de moto)."""
+
+    def __init__(self, port: int):
+        import uvicorn
+        from application import app
+
+        self.server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+        self.base_url = f"http://127.0.0.1:{port}"
+
+    def __enter__(self):
+        self.thread.start()
+        while not self.server.started:
+            if not self.thread.is_alive():
+                raise SystemExit("uvicorn no pudo arrancar (¿puerto en uso?)")
+            time.sleep(0.05)
+        return self
+
+    def __exit__(self, *exc):
+        self.server.should_exit = True
+        self.thread.join(timeout=10)
+
+
+def build_requests(data: dict, tokens: list, admin_token: str):
+    """Por escenario, una función que arma un request: (método, url, kwargs)."""
+    from benchmarks.seed import SEED_PASSWORD
+
+    emails, post_ids = data["emails"], data["post_ids"]
+
+    def login():
+        return "POST", "/users/login", {"json": {"email": random.choice(emails), "password": SEED_PASSWORD}}
+
+    def me():
+        return "GET", "/users/me", {"headers": {"Authorization": f"Bearer {random.choice(tokens)}"}}
+
+    def list_posts():
+        return "GET", "/blog/posts", {"params": {"limit": 20}}
+
+    def get_post():
+        return "GET", f"/blog/post/{random.choice(post_ids)}", {}
+
+    def create_post():
+        payload = {
+            "title": f"Carga {uuid.uuid4().hex[:12]}",
+            "content": "Contenido de la prueba de carga. " * 20,
+            "cover": None,
+            "thumbnail": None,
+        }
+        return "POST", "/blog/create", {"json": payload, "headers": {"Authorization": f"Bearer {admin_token}"}}
+
+    return {"login": login, "me": me, "list_posts": list_posts, "get_post": get_post, "create_post": create_post}
+
+
+async def run_scenario(client, make_request, concurrency: int, duration: float, in_process: bool = True) -> dict:
+    """`in_process`: la app corre en este proceso y se pueden leer sus métricas de AWS."""
+    from core import metrics
+
+    latencies, errors = [], 0
+    capacity_before = metrics.dynamodb_consumed_capacity.total()
+    aws_before = metrics.aws_requests.total()
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            method, url, kwargs = make_request()
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, url, **kwargs)
+                ok = response.status_code < 400
+            except Exception:
+                ok = False
+            latencies.append((time.perf_counter() - start) * 1000)
+            errors += not ok
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    requests = len(latencies)
+    aws_calls = (metrics.aws_requests.total() - aws_before) / max(requests, 1)
+    capacity = (metrics.dynamodb_consumed_capacity.total() - capacity_before) / max(requests, 1)
+    return {
+        "requests": requests,
+        "errors": errors,
+        "throughput_rps": round(requests / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies), 2) if latencies else 0.0,
+        "p95_ms": round(percentile(latencies, 0.95), 2),
+        "p99_ms": round(percentile(latencies, 0.99), 2),
+        "aws_calls_per_request": round(aws_calls, 2) if in_process else None,
+        "capacity_units_per_request": round(capacity, 2) if in_process else None,
+    }
+
+
+async def load(args, data: dict, base_url: str, in_process: bool) -> dict:
+    import httpx
+
+    from benchmarks.seed import SEED_PASSWORD
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        # Tokens para los escenarios autenticados (el primer usuario es admin)
+        tokens = []
+        for email in data["emails"][: min(20, len(data["emails"]))]:
+            response = await client.post("/users/login", json={"email": email, "password": SEED_PASSWORD})
+            response.raise_for_status()
+            tokens.append(response.json()["access_token"])
+
+        requests = build_requests(data, tokens, admin_token=tokens[0])
+        results = {}
+        for name in args.scenarios:
+            # Calentamiento corto: conexiones, cachés de JIT de pydantic, pools de boto3
+            await run_scenario(client, requests[name], args.concurrency, min(1.0, args.duration), in_process)
+            results[name] = await run_scenario(client, requests[name], args.concurrency, args.duration, in_process)
+            print(f"  {name:<12} {json.dumps(results[name])}")
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--posts", type=int, default=10000)
+    parser.add_argument("--content-words", type=int, default=300, help="Palabras por post cargado")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=15.0, help="Segundos por escenario")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), type=lambda value: value.split(","))
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Latencia de red simulada por llamada a AWS")
+    parser.add_argument("--dynamodb-endpoint", help="DynamoDB Local en vez de moto (p. ej. http://localhost:8000)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument(
+        "--base-url",
+        help="Servidor ya levantado (p. ej. gunicorn con varios workers) en vez del uvicorn en proceso; "
+             "requiere --dynamodb-endpoint apuntando a la misma base que usa el servidor",
+    )
+    parser.add_argument("--json", help="Guardar los resultados en este archivo")
+    args = parser.parse_args()
+
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"escenarios desconocidos: {', '.join(sorted(unknown))}")
+    if args.base_url and not args.dynamodb_endpoint:
+        parser.error("--base-url requiere --dynamodb-endpoint (los datos se cargan en la base del servidor)")
+
+    with local_aws(args.dynamodb_endpoint):
+        from benchmarks.seed import seed
+        from core import config
+        from core.client import dynamodb, dynamodbClient
+
+        print(f"Cargando {args.users} usuarios y {args.posts} posts...")
+        data = asyncio.run(seed(args.users, args.posts, args.content_words))
+        print(f"  listo en {data['seconds']} s")
+
+        add_latency(dynamodb.meta.client, args.latency_ms)
+        add_latency(dynamodbClient, args.latency_ms)
+        add_latency(config.s3_client, args.latency_ms)
+
+        with nullcontext() if args.base_url else Server(args.port) as server:
+            base_url = args.base_url or server.base_url
+            print(f"{base_url} concurrency={args.concurrency} duration={args.duration}s latency={args.latency_ms}ms")
+            results = asyncio.run(load(args, data, base_url, in_process=not args.base_url))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"args": vars(args), "seed_seconds": data["seconds"], "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
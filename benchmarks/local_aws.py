@@ -0,0 +1,88 @@
+# benchmarks/local_aws.py
+"""
+Entorno AWS local para benchmarks: DynamoDB y S3 simulados con moto, con el
+mismo esquema de tablas que producción (core/schema.py). Con
+`dynamodb_endpoint` DynamoDB va a ese endpoint (p. ej. DynamoDB Local en
+http://localhost:8000) y moto simula solo el resto.
+
+moto no forma parte de requirements.txt; instalarlo aparte:
+    pip install "moto[dynamodb,s3]"
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+LOCAL_ENV = {
+    "SECRET_KEY": "benchmark-secret",
+    "AWS_ACCESS_KEY_ID": "test",
+    "AWS_SECRET_ACCESS_KEY": "test",
+    "AWS_REGION": "us-east-1",
+    "AWS_DEFAULT_REGION": "us-east-1",
+    "AWS_S3_BUCKET_NAME": "benchmark-bucket",
+    "RATE_LIMIT_ENABLED": "false",  # Los escenarios repiten login y create desde una sola IP
+}
+
+
+def set_local_env():
+    """Debe llamarse antes de importar core.*, que lee el entorno al importarse."""
+    for key, value in LOCAL_ENV.items():
+        os.environ.setdefault(key, value)
+
+
+def add_latency(client, latency_ms: float):
+    """
+    Simula la latencia de red de AWS: cada request del cliente duerme
+    latency_ms antes de que moto responda (sin retener el GIL, como la red real).
+    """
+    if latency_ms <= 0:
+        return
+
+    def sleep_before_send(**kwargs):
+        time.sleep(latency_ms / 1000)
+
+    client.meta.events.register_first("before-send", sleep_before_send)
+
+
+def serialize_moto():
+    """
+    moto guarda las tablas en dicts sin locks: con llamadas concurrentes desde
+    el pool de I/O, TransactWriteItems falla al copiarlas ("dictionary changed
+    size during iteration"). Se atiende un request simulado a la vez; la
+    latencia de add_latency ocurre antes, fuera del lock.
+    """
+    from moto.core.botocore_stubber import BotocoreStubber
+
+    if getattr(BotocoreStubber.process_request, "serialized", False):
+        return
+    lock = threading.Lock()
+    process_request = BotocoreStubber.process_request
+
+    def serialized(self, request):
+        with lock:
+            return process_request(self, request)
+
+    serialized.serialized = True
+    BotocoreStubber.process_request = serialized
+
+
+@contextmanager
+def local_aws(dynamodb_endpoint: str = None):
+    if dynamodb_endpoint:
+        os.environ["DYNAMODB_ENDPOINT"] = dynamodb_endpoint
+    set_local_env()
+    try:
+        from moto import mock_aws
+    except ImportError:
+        raise SystemExit('Este benchmark necesita moto: pip install "moto[dynamodb,s3]"')
+
+    import boto3
+    serialize_moto()
+    moto_config = {"core": {"passthrough": {"services": ["dynamodb"]}}} if dynamodb_endpoint else None
+    with mock_aws(config=moto_config):
+        from core.schema import create_tables
+        region = os.environ["AWS_REGION"]
+        create_tables(boto3.client("dynamodb", region_name=region, endpoint_url=dynamodb_endpoint))
+        boto3.client("s3", region_name=region).create_bucket(Bucket=os.environ["AWS_S3_BUCKET_NAME"])
+        yield
@@ -0,0 +1,132 @@
+# benchmarks/seed.py
+"""
+Carga de datos para benchmarks: usuarios (con su reserva de email) y posts
+(con su reserva de slug y el atributo de listado) con la misma forma que
+escriben create_user y create_post, escritos con BatchWriteItem.
+
+Todos los usuarios comparten la contraseña SEED_PASSWORD; el hash se calcula
+una sola vez con el BCRYPT_ROUNDS configurado, así que el login cuesta lo
+mismo que en producción.
+"""
+
+import asyncio
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+
+SEED_PASSWORD = "Benchmark-Passw0rd"
+FLUSH_EVERY = 2500  # Escrituras por tanda (100 lotes de 25 en paralelo, acotados por el pool de I/O)
+
+WORDS = (
+    "limpieza hogar cocina baño oficina consejos productos ecológicos vinagre bicarbonato ventanas "
+    "alfombras muebles madera acero manchas grasa desinfección rutina semanal orden espacios plantas "
+    "aromas textiles colchones cortinas azulejos juntas horno microondas refrigerador lavavajillas"
+).split()
+
+
+def user_email(i: int) -> str:
+    return f"bench-user-{i}@example.com"
+
+
+def random_text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+async def _flush(pending: dict) -> None:
+    from core.batch import batch_write
+    if any(pending.values()):
+        await batch_write(pending)
+    for requests in pending.values():
+        requests.clear()
+
+
+async def seed_users(count: int, admins: int = 1) -> dict:
+    """Crea `count` usuarios (los primeros `admins` con rol admin). Retorna {email: id}."""
+    from core.schema import USER_EMAILS_TABLE, USERS_TABLE
+    from users.services.password_services import password_hasher
+    from users.services.users_services import email_key
+
+    hashed_password = await password_hasher.hash(SEED_PASSWORD)
+    created_at = datetime.utcnow().isoformat()
+    pending = {USERS_TABLE: [], USER_EMAILS_TABLE: []}
+    users = {}
+    for i in range(count):
+        user_id, email = str(uuid.uuid4()), user_email(i)
+        users[email] = user_id
+        pending[USERS_TABLE].append({"PutRequest": {"Item": {
+            "id": user_id,
+            "email": email,
+            "name": f"Bench User {i}",
+            "hashed_password": hashed_password,
+            "role": "admin" if i < admins else "user",
+            "created_at": created_at,
+            "picture": "/images/default-avatar.png",
+        }}})
+        pending[USER_EMAILS_TABLE].append({"PutRequest": {"Item": {"email": email_key(email), "user_id": user_id}}})
+        if len(pending[USERS_TABLE]) * 2 >= FLUSH_EVERY:
+            await _flush(pending)
+    await _flush(pending)
+    return users
+
+
+async def seed_posts(count: int, authors: list, content_words: int = 300, seed: int = 0) -> list:
+    """Crea `count` posts repartidos entre `authors` (ids). Retorna los post_id."""
+    from fastapi.encoders import jsonable_encoder
+
+    from blog.db.models.blog_models import BlogPost
+    from blog.services.blog_services import LISTING_PARTITION, make_excerpt
+    from blog.utils.text_utils import slugify
+    from core.schema import BLOG_POSTS_TABLE, BLOG_SLUGS_TABLE
+
+    rng = random.Random(seed)
+    start = datetime.utcnow() - timedelta(minutes=count)
+    pending = {BLOG_POSTS_TABLE: [], BLOG_SLUGS_TABLE: []}
+    post_ids = []
+    for i in range(count):
+        post_id = str(uuid.uuid4())
+        title = f"{random_text(rng, 6)[:-1]} {i}"
+        content = random_text(rng, content_words)
+        slug = slugify(title)
+        post = BlogPost(
+            post_id=post_id,
+            slug=slug,
+            title=title,
+            content=content,
+            excerpt=make_excerpt(content),
+            cover_url=None,
+            thumbnail_url=None,
+            author_id=authors[i % len(authors)],
+            author_name="Bench Author",
+            created_at=start + timedelta(minutes=i),
+            version=1,
+        )
+        post_ids.append(post_id)
+        pending[BLOG_POSTS_TABLE].append({"PutRequest": {"Item": {**jsonable_encoder(post), "listing": LISTING_PARTITION}}})
+        pending[BLOG_SLUGS_TABLE].append({"PutRequest": {"Item": {"slug": slug, "post_id": post_id}}})
+        if len(pending[BLOG_POSTS_TABLE]) * 2 >= FLUSH_EVERY:
+            await _flush(pending)
+    await _flush(pending)
+    return post_ids
+
+
+async def seed(users: int, posts: int, content_words: int = 300) -> dict:
+    """Carga usuarios y posts; retorna lo que necesitan los escenarios de carga."""
+    start = time.perf_counter()
+    seeded_users = await seed_users(max(users, 1))
+    authors = list(seeded_users.values())[: max(1, min(len(seeded_users), 100))]
+    post_ids = await seed_posts(posts, authors, content_words)
+    return {
+        "emails": list(seeded_users),
+        "post_ids": post_ids,
+        "seconds": round(time.perf_counter() - start, 1),
+    }
+
+
+if __name__ == "__main__":
+    # Prueba rápida de la carga contra moto: python -m benchmarks.seed
+    from benchmarks.local_aws import local_aws
+
+    with local_aws():
+        result = asyncio.run(seed(users=1000, posts=1000))
+    print(f"users={len(result['emails'])} posts={len(result['post_ids'])} en {result['seconds']} s")
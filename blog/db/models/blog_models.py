@@ -8,8 +8,25 @@ class BlogPost(BaseModel):
     slug: Optional[str]
     title: str
     content: str
+    excerpt: Optional[str] = None  # Resumen en texto plano, calculado al escribir el post
     cover_url: Optional[str]
     thumbnail_url: Optional[str]
+    thumbnail_generated: bool = False  # True si la miniatura se generó de la portada (no la subió el autor)
+    cover_srcset: Optional[str] = None  # "url 320w, url 640w, ..." generado en segundo plano
+    author_id: str
+    author_name: str
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    version: int = 0  # Se incrementa en cada edición (0 = post anterior al versionado)
+
+
+class BlogPostSummary(BaseModel):
+    """Lo que necesita una vista de listado: sin content ni srcset."""
+    post_id: str
+    slug: Optional[str]
+    title: str
+    excerpt: Optional[str] = None
+    thumbnail_url: Optional[str] = None
     author_id: str
     author_name: str
     created_at: datetime
@@ -1,29 +1,50 @@
 # blog/db/schemas/blog_schemas.py
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Dict, List, Literal, Optional
 from datetime import datetime
 
 class BlogPostCreate(BaseModel):
     title: str = Field(..., min_length=3)
     content: str = Field(..., min_length=10)
-    cover: Optional[str]  # Imagen opcional en base64
-    thumbnail: Optional[str]  # Imagen opcional en base64
+    cover: Optional[str]  # URL de /blog/upload o imagen en base64 (compatibilidad)
+    thumbnail: Optional[str]  # URL de /blog/upload o imagen en base64 (compatibilidad)
     slug: Optional[str] = None  # Slug opcional para SEO, se generará automáticamente si no se proporciona
+    cover_key: Optional[str] = None  # Key de una subida directa a S3 (/blog/upload/presign)
+    thumbnail_key: Optional[str] = None  # Key de una subida directa a S3 (/blog/upload/presign)
 
 class BlogPostOut(BaseModel):
     post_id: str
     title: str
     slug: Optional[str]
     content: str
+    excerpt: Optional[str] = None
     cover_url: Optional[str]
     thumbnail_url: Optional[str]
+    cover_srcset: Optional[str] = None
     author_id: str
     author_name: str
     created_at: datetime
+    version: int = 0
     
 class BlogPostUpdate(BaseModel):
     title: Optional[str] = None 
     content: Optional[str] = None 
     cover: Optional[str] = None  # base64 o URL existente
     thumbnail: Optional[str] = None  # base64 o URL existente
-    slug: Optional[str] = None  # Slug opcional para SEO, se generará automáticamente si no se proporciona
\ No newline at end of file
+    slug: Optional[str] = None  # Slug opcional para SEO, se generará automáticamente si no se proporciona
+    cover_key: Optional[str] = None  # Key de una subida directa a S3 (/blog/upload/presign)
+    thumbnail_key: Optional[str] = None  # Key de una subida directa a S3 (/blog/upload/presign)
+    version: Optional[int] = None  # Versión que se editó; si otra edición la cambió antes, 409
+
+class BlogPostBatchDelete(BaseModel):
+    post_ids: List[str] = Field(..., min_length=1, max_length=1000)
+
+class PresignedUploadRequest(BaseModel):
+    folder: Literal["cover", "thumbnail"]
+    content_type: str
+
+class PresignedUploadOut(BaseModel):
+    url: str
+    fields: Dict[str, str]  # Campos que el cliente debe enviar en el form POST junto al archivo
+    key: str  # Se envía luego como cover_key/thumbnail_key
+    expires_in: int
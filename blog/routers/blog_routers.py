@@ -1,10 +1,45 @@
 # blog/routes/blog_routes.py
 
-from fastapi import APIRouter, Depends, HTTPException, logger, status, Query
-from blog.db.schemas.blog_schemas import BlogPostCreate, BlogPostOut, BlogPostUpdate
-from blog.services.blog_services import create_post, delete_post, get_paginated_posts, get_post_by_slug_or_id, update_post
-from core.security import get_current_user
-from typing import Dict, Optional
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Query
+from datetime import datetime
+from blog.db.models.blog_models import BlogPost, BlogPostSummary
+from blog.db.schemas.blog_schemas import BlogPostBatchDelete, BlogPostCreate, BlogPostOut, BlogPostUpdate, PresignedUploadOut, PresignedUploadRequest
+from blog.services.blog_services import LISTING_SURROGATE_KEY, create_post, delete_post, delete_posts, get_paginated_posts, get_post_by_slug_or_id, get_posts_by_slugs_or_ids, search_posts, post_surrogate_key, posts_cache, update_post
+from blog.utils.s3_utils import ALLOWED_IMAGE_TYPES, create_presigned_upload, upload_image_stream
+from core import config
+from core.rate_limit import ConcurrencyLimit, Rate, RateLimiter
+from jose import JWTError
+from core.http_cache import cache_headers, is_not_modified, make_etag
+from core.responses import ORJSONResponse, model_to_response
+from core.security import get_current_user, verify_token
+from typing import Dict, List, Literal, Optional
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCH_IDS = 100  # Por llamada a /posts/batch (la URL tiene que caber en la caché del CDN)
+MODERATION_ROLES = ("admin", "moderator")
+
+# Crear un post sube imágenes a S3 y escribe en varias tablas
+create_post_limiter = RateLimiter("create_post", user=Rate.parse(config.RATE_LIMIT_CREATE_POST_USER))
+create_post_slots = ConcurrencyLimit("create_post", config.CREATE_POST_MAX_CONCURRENCY)
+
+
+async def admit_create_post(request: Request):
+    """
+    Chequeo de RateLimitMiddleware (application.py), antes de leer el cuerpo.
+    El usuario sale del token (verificación cacheada en core.security); con
+    un token inválido no se limita acá y get_current_user responde 401.
+    """
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return
+    try:
+        claims = await verify_token(token)
+    except JWTError:
+        return
+    if claims.get("type") == "access" and claims.get("sub"):
+        await create_post_limiter.hit(user=claims["sub"])
 
 router = APIRouter(tags=["Blog"],
                 responses={status.HTTP_404_NOT_FOUND:{"message":"Not found"}})
@@ -12,16 +47,17 @@ router = APIRouter(tags=["Blog"],
 
 # Crear un post
 @router.post("/create", response_model=BlogPostOut, status_code=status.HTTP_201_CREATED)
-def create_blog_post(
+async def create_blog_post(
     payload: BlogPostCreate,
     user: Dict = Depends(get_current_user)
 ):    
     try:
-        return  create_post(
-        data=payload,
-        author_id=user["id"],
-        author_name=user["name"]
-    )
+        async with create_post_slots:
+            return await create_post(
+            data=payload,
+            author_id=user["id"],
+            author_name=user["name"]
+        )
     except HTTPException as e:
         raise e
     except Exception as e:
@@ -31,30 +67,142 @@ def create_blog_post(
 
 # Modificar un post
 @router.patch("/edit/{post_id}", response_model=BlogPostOut)
-def edit_blog_post(
+async def edit_blog_post(
     post_id: str,
     payload: BlogPostUpdate,
     user=Depends(get_current_user)
 ):
-    return update_post(post_id, payload, user["id"])
+    return await update_post(post_id, payload, user["id"])
 
 
-# Obtener un post por ID o slug
+# Obtener un post por ID o slug (con ETag/Last-Modified; 304 si el cliente ya lo tiene)
 @router.get("/post/{slug_or_id}", response_model=BlogPostOut)
-def get_blog_post(slug_or_id: str):
-    return get_post_by_slug_or_id(slug_or_id)
+async def get_blog_post(slug_or_id: str, request: Request):
+    post = await get_post_by_slug_or_id(slug_or_id)
+
+    last_modified = post.updated_at or post.created_at
+    etag = make_etag(post.post_id, last_modified.isoformat())
+    headers = cache_headers(etag, last_modified, [post_surrogate_key(post.post_id)], config.BLOG_POST_CACHE_CONTROL)
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    # El post viene validado del caché: se serializa directo, sin re-validar contra BlogPostOut
+    return ORJSONResponse(model_to_response(post, BlogPostOut), headers=headers)
 
 
 # Obtener posts paginados
 @router.get("/posts", response_model=dict)
-def list_paginated_posts(
+async def list_paginated_posts(
+    request: Request,
     page_token: Optional[str] = Query(None, alias="page"),
-    limit: int = Query(10, ge=1, le=100)
+    limit: int = Query(10, ge=1, le=100),
+    author_id: Optional[str] = Query(None, alias="author"),
+    full: bool = Query(False, description="Incluir el contenido completo de cada post")
+):
+    page = await get_paginated_posts(limit=limit, last_evaluated_key=page_token, author_id=author_id, full=full)
+
+    # La página cambia si cambia cualquiera de sus posts o el cursor siguiente.
+    # Los ítems son dicts con las fechas en ISO, tal como están en DynamoDB
+    versions = [(p["post_id"], p.get("updated_at") or p["created_at"]) for p in page["items"]]
+    latest = max((modified for _, modified in versions), default=None)
+    last_modified = datetime.fromisoformat(latest) if latest else None
+    etag = make_etag(versions, page["next_token"], full)
+    surrogate_keys = [LISTING_SURROGATE_KEY] + [post_surrogate_key(p["post_id"]) for p in page["items"]]
+    headers = cache_headers(etag, last_modified, surrogate_keys, config.BLOG_LIST_CACHE_CONTROL)
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return ORJSONResponse(page, headers=headers)
+
+
+# Búsqueda de texto completo, ordenada por relevancia
+@router.get("/search", response_model=dict)
+async def search_blog_posts(
+    q: str = Query(..., min_length=2, max_length=200),
+    page_token: Optional[str] = Query(None, alias="page"),
+    limit: int = Query(10, ge=1, le=50),
+):
+    return ORJSONResponse(await search_posts(q, limit=limit, page_token=page_token))
+
+
+# Obtener varios posts por ID o slug en una sola llamada (?ids=a,b,c o ?ids=a&ids=b)
+@router.get("/posts/batch", response_model=dict)
+async def get_blog_posts_batch(
+    request: Request,
+    ids: List[str] = Query(..., description="IDs o slugs, separados por coma o repetidos"),
+    full: bool = Query(False, description="Incluir el contenido completo de cada post"),
 ):
-    return get_paginated_posts(limit=limit, last_evaluated_key=page_token)
+    values = [value.strip() for raw in ids for value in raw.split(",") if value.strip()]
+    if not values:
+        raise HTTPException(status_code=400, detail="Indica al menos un ID o slug")
+    if len(values) > MAX_BATCH_IDS:
+        raise HTTPException(status_code=400, detail=f"Máximo {MAX_BATCH_IDS} posts por llamada")
+
+    result = await get_posts_by_slugs_or_ids(values)
+
+    versions = [(p.post_id, (p.updated_at or p.created_at).isoformat()) for p in result["items"]]
+    last_modified = max((p.updated_at or p.created_at for p in result["items"]), default=None)
+    etag = make_etag(versions, result["missing"], full)
+    surrogate_keys = [post_surrogate_key(p.post_id) for p in result["items"]]
+    headers = cache_headers(etag, last_modified, surrogate_keys, config.BLOG_LIST_CACHE_CONTROL)
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    # Misma proyección que /posts: resumen por defecto, sin campos internos del post
+    model = BlogPost if full else BlogPostSummary
+    items = [model_to_response(post, model) for post in result["items"]]
+    return ORJSONResponse({"items": items, "missing": result["missing"]}, headers=headers)
+
+
+# Obtener un POST prefirmado para subir la imagen directo a S3 (sin pasar por la API).
+# La key retornada se envía luego como `cover_key`/`thumbnail_key` al crear o editar el post.
+@router.post("/upload/presign", response_model=PresignedUploadOut)
+async def presign_image_upload(
+    payload: PresignedUploadRequest,
+    user=Depends(get_current_user)
+):
+    if payload.content_type not in ALLOWED_IMAGE_TYPES:
+        raise HTTPException(status_code=415, detail=f"Tipo de imagen no soportado: {payload.content_type}")
+    return await create_presigned_upload(user["id"], payload.folder, payload.content_type)
+
+
+# Subir una imagen por streaming (el cuerpo es la imagen en binario, Content-Type: image/*).
+# Retorna la URL, que se envía luego como `cover`/`thumbnail` al crear o editar el post.
+@router.post("/upload/{folder}", status_code=status.HTTP_201_CREATED)
+async def upload_image(
+    folder: Literal["cover", "thumbnail"],
+    request: Request,
+    user=Depends(get_current_user)
+):
+    mime_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if mime_type not in ALLOWED_IMAGE_TYPES:
+        raise HTTPException(status_code=415, detail=f"Tipo de imagen no soportado: {mime_type or 'ninguno'}")
+
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > config.MAX_IMAGE_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail=f"La imagen supera el máximo de {config.MAX_IMAGE_UPLOAD_BYTES} bytes")
+
+    url = await upload_image_stream(request.stream(), mime_type)
+    return {"url": url}
 
 
 # Eliminar un post
 @router.delete("/delete/{post_id}", status_code=200)
-def delete_blog_post(post_id: str, user=Depends(get_current_user)):
-    return delete_post(post_id, user["id"])
\ No newline at end of file
+async def delete_blog_post(post_id: str, user=Depends(get_current_user)):
+    return await delete_post(post_id, user["id"])
+
+
+# Eliminar varios posts (moderación)
+@router.post("/delete/batch", status_code=200)
+async def delete_blog_posts(payload: BlogPostBatchDelete, user=Depends(get_current_user)):
+    if user["role"] not in MODERATION_ROLES:
+        raise HTTPException(status_code=403, detail="Forbidden")
+    return await delete_posts(payload.post_ids)
+
+
+# Métricas del caché de lecturas (solo admin)
+@router.get("/metrics/cache")
+async def cache_metrics(user=Depends(get_current_user)):
+    if user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Forbidden")
+    return posts_cache.stats()
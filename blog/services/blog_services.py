@@ -1,84 +1,279 @@
 # blog/services/blog_services.py
 
+import asyncio
 from datetime import datetime
 from fastapi import HTTPException
 import uuid
 import logging
-from fastapi.encoders import jsonable_encoder
-from blog.db.models.blog_models import BlogPost
+from blog.db.models.blog_models import BlogPost, BlogPostSummary
 from blog.db.schemas.blog_schemas import BlogPostCreate, BlogPostUpdate
-from blog.utils.s3_utils import upload_base64_image
-from core.client import dynamodb  # wrapper para DynamoDB
+from blog.utils.s3_utils import finalize_upload, upload_base64_image
+from blog.services.image_pipeline import schedule_derivatives
+from blog.services import search_services
+from core import config
+from core.batch import batch_get
+from core.cache import MemoryCache, ReadThroughCache, build_shared_backend
+from core.http_cache import emit_purge
+from core.responses import item_to_response, model_to_response
+from core.client import adynamodbClient, dynamodbClient, table, to_dynamo_item  # wrapper para DynamoDB
+from core.schema import BLOG_POSTS_TABLE, BLOG_SLUGS_TABLE, POSTS_BY_AUTHOR_INDEX, POSTS_BY_DATE_INDEX
+from blog.utils.pagination_utils import decode_cursor, encode_cursor
+from blog.utils.text_utils import slugify
+from boto3.dynamodb.conditions import Key
 import re
-import unicodedata
-from typing import Optional, Any
+from typing import List, Optional, Any
 
 logger = logging.getLogger(__name__)
 
-blogposts_table = dynamodb.Table("blog_posts")
+blogposts_table = table(BLOG_POSTS_TABLE)
+slugs_table = table(BLOG_SLUGS_TABLE)  # slug -> post_id (unicidad y búsqueda O(1))
 
-def slugify(text: str) -> str:
-    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
-    text = re.sub(r"[^\w\s-]", "", text.lower())
-    text = re.sub(r"[\s_-]+", "-", text).strip("-")
-    return text
+# Valor constante de la partición del índice por fecha: todos los posts la comparten
+LISTING_PARTITION = "POST"
 
-def safe_upload(image_base64, author_id, folder):
+BULK_DELETE_CONCURRENCY = 25  # Posts borrados en paralelo por delete_posts
+
+# Caché de lecturas: "post:{post_id}" -> BlogPost y "slug:{slug}" -> post_id.
+# Toda escritura de un post debe invalidar su key de id y las de sus slugs.
+posts_cache = ReadThroughCache(
+    "blog_posts",
+    MemoryCache(config.CACHE_MAX_ENTRIES, config.CACHE_TTL_SECONDS),
+    build_shared_backend("blog:"),
+    serialize=lambda value: value.model_dump(mode="json") if isinstance(value, BlogPost) else value,
+    deserialize=lambda raw: BlogPost(**raw) if isinstance(raw, dict) else raw,
+)
+
+def post_cache_key(post_id: str) -> str:
+    return f"post:{post_id}"
+
+def slug_cache_key(slug: str) -> str:
+    return f"slug:{slug}"
+
+# Surrogate keys del CDN: una por post y una para todas las páginas de listado
+LISTING_SURROGATE_KEY = "posts"
+
+def post_surrogate_key(post_id: str) -> str:
+    return f"post-{post_id}"
+
+async def invalidate_post(post_id: str, *slugs: Optional[str]) -> None:
+    """Invalida el caché local/compartido del post y pide al CDN purgarlo (y los listados)."""
+    await posts_cache.invalidate(post_cache_key(post_id), *(slug_cache_key(slug) for slug in slugs if slug))
+    await emit_purge([post_surrogate_key(post_id), LISTING_SURROGATE_KEY])
+
+# Atributos de la vista de listado (BlogPostSummary); el content no sale de DynamoDB
+SUMMARY_ATTRIBUTES = tuple(BlogPostSummary.model_fields)
+EXCERPT_LENGTH = 200
+
+def make_excerpt(content: str, length: int = EXCERPT_LENGTH) -> str:
+    """Resumen en texto plano: sin HTML/markdown básico, cortado en el último espacio."""
+    text = re.sub(r"<[^>]+>", " ", content)
+    text = re.sub(r"[#*_`>\[\]]+", "", text)
+    text = re.sub(r"\s+", " ", text).strip()
+    if len(text) <= length:
+        return text
+    return text[:length].rsplit(" ", 1)[0].rstrip(",.;:") + "…"
+
+async def safe_upload(image_base64):
     try:
         if image_base64:
-            return upload_base64_image(image_base64, author_id, folder)
+            return (await upload_base64_image(image_base64)).url
     except Exception as e:
         raise ValueError("Error al subir la imagen. Asegúrate de que esté en base64 válido.") from e
     return None
 
-def create_post(data: BlogPostCreate, author_id: str, author_name: str) -> BlogPost:
+async def resolve_image(value: Optional[str], upload_key: Optional[str], author_id: str, folder: str) -> Optional[str]:
+    """
+    URL final de una imagen del post: subida prefirmada (verificada), imagen
+    en base64 (se sube) o URL existente (se usa tal cual).
+    """
+    if upload_key:
+        return await finalize_upload(upload_key, author_id, folder)
+    if value and not value.startswith("http"):
+        return await safe_upload(value)
+    return value
+
+async def run_all(*aws) -> list:
+    """
+    Ejecuta las corrutinas en paralelo y retorna sus resultados en orden.
+    Si una falla, cancela las demás, espera a que terminen y relanza el error.
+    """
+    tasks = [asyncio.ensure_future(aw) for aw in aws]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+async def save_derivatives(post_id: str, cover_url: str, fields: dict):
+    """
+    Guarda srcset/miniatura generados, solo si la portada no cambió mientras tanto.
+    La miniatura generada no pisa una que el autor haya subido entretanto: en
+    ese caso se guarda solo el srcset.
+    """
+    # updated_at cambia con la representación del post: invalida ETag/Last-Modified
+    fields = {**fields, "updated_at": datetime.utcnow().isoformat()}
+    values = {":cover_url_val": cover_url}
+    condition = "cover_url = :cover_url_val"
+    if "thumbnail_url" in fields:
+        fields["thumbnail_generated"] = True
+        condition += " AND (attribute_not_exists(thumbnail_url) OR thumbnail_url = :null_val OR thumbnail_generated = :true_val)"
+        values.update({":null_val": None, ":true_val": True})
+    try:
+        await blogposts_table.update_item(
+            Key={"post_id": post_id},
+            UpdateExpression="SET " + ", ".join(f"{k}=:{k}" for k in fields),
+            ConditionExpression=condition,
+            ExpressionAttributeValues={**{f":{k}": v for k, v in fields.items()}, **values},
+        )
+        await invalidate_post(post_id)
+    except dynamodbClient.exceptions.ConditionalCheckFailedException:
+        if "thumbnail_url" in fields:
+            # Puede haber fallado solo por la miniatura: reintentar con el srcset
+            srcset = {k: v for k, v in fields.items() if k not in ("thumbnail_url", "thumbnail_generated", "updated_at")}
+            await save_derivatives(post_id, cover_url, srcset)
+            return
+        logger.info(f"Derivados descartados: la portada del post {post_id} cambió o el post fue eliminado")
+
+
+def needs_generated_thumbnail(post: dict) -> bool:
+    """Se genera miniatura si el post no tiene una o si la que tiene también era generada."""
+    return not post.get("thumbnail_url") or bool(post.get("thumbnail_generated"))
+
+async def get_slug_owner(slug: str) -> Optional[str]:
+    """Retorna el post_id que tiene reservado el slug, o None si está libre."""
+    item = (await slugs_table.get_item(Key={"slug": slug})).get("Item")
+    return item["post_id"] if item else None
+
+async def ensure_slug_available(slug: Optional[str], post_id: str, detail: str) -> None:
+    """Lanza 400 si el slug está reservado por otro post."""
+    if slug:
+        owner = await get_slug_owner(slug)
+        if owner and owner != post_id:
+            raise HTTPException(status_code=400, detail=detail)
+
+def slug_put(slug: str, post_id: str) -> dict:
+    """Operación transaccional que reserva un slug solo si está libre."""
+    return {
+        "Put": {
+            "TableName": BLOG_SLUGS_TABLE,
+            "Item": to_dynamo_item({"slug": slug, "post_id": post_id}),
+            "ConditionExpression": "attribute_not_exists(slug)",
+        }
+    }
+
+def slug_delete(slug: str, post_id: str) -> dict:
+    """Operación transaccional que libera un slug solo si pertenece al post (o ya no existe)."""
+    return {
+        "Delete": {
+            "TableName": BLOG_SLUGS_TABLE,
+            "Key": to_dynamo_item({"slug": slug}),
+            "ConditionExpression": "attribute_not_exists(slug) OR post_id = :post_id_val",
+            "ExpressionAttributeValues": to_dynamo_item({":post_id_val": post_id}),
+        }
+    }
+
+async def create_post(data: BlogPostCreate, author_id: str, author_name: str) -> BlogPost:
     post_id = str(uuid.uuid4())
     created_at = datetime.utcnow()
 
     # Validación y creación del slug
-    slug = slugify(data.slug) or slugify(data.title)
-
-    # Validar que no esté repetido
-    existing = blogposts_table.scan(
-        FilterExpression="slug = :slug_val",
-        ExpressionAttributeValues={":slug_val": slug}
+    slug = slugify(data.slug or "") or slugify(data.title)
+
+    # Chequeo del slug y subida de imágenes en paralelo (la unicidad real del
+    # slug la garantiza la transacción de abajo). Si algo falla, las imágenes
+    # ya subidas no se borran aquí: con la deduplicación otro request puede
+    # estar usando la misma key; las que queden sin referencias las borra el
+    # barrido de huérfanas (scripts/sweep_orphan_images.py).
+    _, cover_url, thumbnail_url = await run_all(
+        ensure_slug_available(slug, post_id, "Slug ya está en uso. Usa otro o cambia el título."),
+        resolve_image(data.cover, data.cover_key, author_id, "cover"),
+        resolve_image(data.thumbnail, data.thumbnail_key, author_id, "thumbnail"),
     )
-    if existing.get("Count", 0) > 0:
-        raise HTTPException(status_code=400, detail="Slug ya está en uso. Usa otro o cambia el título.")
-    
-    cover_url = None
-    thumbnail_url = None
-    if data.cover and not data.cover.startswith("http"):
-        cover_url = safe_upload(data.cover, author_id, "cover")
-    if data.thumbnail and not data.thumbnail.startswith("http"):
-        thumbnail_url = safe_upload(data.thumbnail, author_id, "thumbnail")
-    
 
     post = BlogPost(
         post_id=post_id,
         slug=slug,
         title=data.title,
         content=data.content,
+        excerpt=make_excerpt(data.content),
         cover_url=cover_url,
         thumbnail_url=thumbnail_url,
         author_id=author_id,
         author_name=author_name,
         created_at=created_at,
+        version=1,
     )
     try:
-        blogposts_table.put_item(Item=jsonable_encoder(post))
+        await adynamodbClient.transact_write_items(
+            TransactItems=[
+                slug_put(slug, post_id),
+                {
+                    "Put": {
+                        "TableName": BLOG_POSTS_TABLE,
+                        "Item": to_dynamo_item({**post.model_dump(mode="json"), "listing": LISTING_PARTITION}),
+                    }
+                },
+            ]
+        )
         logger.info(f"Nuevo post creado por {author_name} (ID: {author_id}) con ID {post_id}")
+    except dynamodbClient.exceptions.TransactionCanceledException:
+        raise HTTPException(status_code=400, detail="Slug ya está en uso. Usa otro o cambia el título.")
     except Exception as e:
         logger.error(f"Error al crear el post: {e}")
         raise ValueError("Error al crear el post en la base de datos.") from e
-    
+
+    await emit_purge([LISTING_SURROGATE_KEY])
+
+    # Miniatura (si no la enviaron) y tamaños responsive, fuera del request
+    schedule_derivatives(post_id, cover_url, not thumbnail_url, save_derivatives)
+    search_services.schedule_index(post_id, post.title, post.content, post.version)
     return post
 
 
-def update_post(post_id: str, data: BlogPostUpdate, user_id: str) -> dict:
-    existing = blogposts_table.get_item(Key={"post_id": post_id}).get("Item")
-    if not existing:
-        raise HTTPException(status_code=404, detail="Post no encontrado")
+def version_condition(version: int) -> str:
+    """Condición de versión esperada; los posts previos al versionado cuentan como versión 0."""
+    return "attribute_not_exists(version)" if version == 0 else "version = :expected_version"
+
+
+async def update_post(post_id: str, data: BlogPostUpdate, user_id: str) -> dict:
+    """
+    Edita el post con control de concurrencia optimista: cada edición
+    incrementa `version` y, si el cliente envía la versión que editó
+    (data.version), la escritura solo se aplica si nadie la cambió antes (409).
+
+    Sin cambio de slug es una sola escritura condicional que retorna el
+    estado guardado (ALL_NEW), sin leer antes. Un cambio de slug necesita
+    el slug anterior para liberarlo: lee el post y escribe en una
+    transacción condicionada a la versión leída.
+    """
+    new_slug = slugify(data.slug) if data.slug else None
+
+    # Lectura (solo si cambia el slug), chequeo del slug y subida de imágenes en paralelo;
+    # si algo falla, las imágenes subidas quedan para el barrido de huérfanas
+    existing, _, cover_url, thumbnail_url = await run_all(
+        blogposts_table.get_item(Key={"post_id": post_id}) if new_slug else asyncio.sleep(0, {}),
+        ensure_slug_available(new_slug, post_id, "Este slug ya está en uso por otro post."),
+        resolve_image(data.cover, data.cover_key, user_id, "cover"),
+        resolve_image(data.thumbnail, data.thumbnail_key, user_id, "thumbnail"),
+    )
+
+    expected_version = data.version
+    old_slug = None
+    if new_slug:
+        existing = existing.get("Item")
+        if not existing:
+            raise HTTPException(status_code=404, detail="Post no encontrado")
+        current_version = int(existing.get("version", 0))
+        if expected_version is not None and expected_version != current_version:
+            raise HTTPException(status_code=409, detail="El post fue modificado por otra edición. Recárgalo e intenta de nuevo.")
+        # Lo escrito se basa en esta lectura: la transacción exige que la versión no haya cambiado
+        expected_version = current_version
+        # ✅ Slug nuevo (ya validado arriba); si es el mismo que tenía, no hay cambio
+        old_slug = existing.get("slug")
+        if new_slug == old_slug:
+            new_slug = None
 
     update_data = {}
 
@@ -88,52 +283,86 @@ def update_post(post_id: str, data: BlogPostUpdate, user_id: str) -> dict:
 
     if data.content:
         update_data["content"] = data.content
+        update_data["excerpt"] = make_excerpt(data.content)
 
-    if data.cover:
-        update_data["cover_url"] = (
-            safe_upload(data.cover, user_id, "cover")
-            if not data.cover.startswith("http")
-            else data.cover
-        )
+    # Base64, URL existente o subida prefirmada (ya verificada por resolve_image)
+    if cover_url:
+        update_data["cover_srcset"] = None  # Se regenera en segundo plano para la portada nueva
+        update_data["cover_url"] = cover_url
 
-    if data.thumbnail:
-        update_data["thumbnail_url"] = (
-            safe_upload(data.thumbnail, user_id, "thumbnail")
-            if not data.thumbnail.startswith("http")
-            else data.thumbnail
-        )
-
-    # ✅ Validación del slug si lo envía
-    if data.slug:
-        # Normalizar y validar
-        new_slug = slugify(data.slug)
-
-        # Si el nuevo slug ya existe en otro post, rechazar
-        response = blogposts_table.scan(
-            FilterExpression="slug = :slug_val AND post_id <> :post_id_val",
-            ExpressionAttributeValues={
-                ":slug_val": new_slug,
-                ":post_id_val": post_id
-            }
-        )
-
-        if response.get("Count", 0) > 0:
-            raise HTTPException(status_code=400, detail="Este slug ya está en uso por otro post.")
+    if thumbnail_url:
+        update_data["thumbnail_url"] = thumbnail_url
+        update_data["thumbnail_generated"] = False
 
+    if new_slug:
         update_data["slug"] = new_slug
 
     update_data["updated_at"] = datetime.utcnow().isoformat()
 
     update_expr = "SET " + ", ".join(f"{k}=:{k}" for k in update_data)
+    update_expr += ", version = if_not_exists(version, :zero) + :one"
     expr_values = {f":{k}": v for k, v in update_data.items()}
+    expr_values.update({":zero": 0, ":one": 1})
+
+    condition = "attribute_exists(post_id)"
+    if expected_version is not None:
+        condition += " AND " + version_condition(expected_version)
+        if expected_version != 0:
+            expr_values[":expected_version"] = expected_version
+
+    if not new_slug:
+        try:
+            saved = (await blogposts_table.update_item(
+                Key={"post_id": post_id},
+                UpdateExpression=update_expr,
+                ConditionExpression=condition,
+                ExpressionAttributeValues=expr_values,
+                ReturnValues="ALL_NEW",
+                ReturnValuesOnConditionCheckFailure="ALL_OLD",
+            ))["Attributes"]
+        except dynamodbClient.exceptions.ConditionalCheckFailedException as e:
+            # Con ALL_OLD el error trae el ítem si existe: existe = conflicto de versión
+            if "Item" not in e.response:
+                raise HTTPException(status_code=404, detail="Post no encontrado")
+            raise HTTPException(status_code=409, detail="El post fue modificado por otra edición. Recárgalo e intenta de nuevo.")
+    else:
+        # Cambio de slug: reservar el nuevo, liberar el anterior y actualizar el post de forma atómica
+        transact_items = [slug_put(new_slug, post_id)]
+        if old_slug:
+            transact_items.append(slug_delete(old_slug, post_id))
+        transact_items.append({
+            "Update": {
+                "TableName": BLOG_POSTS_TABLE,
+                "Key": to_dynamo_item({"post_id": post_id}),
+                "UpdateExpression": update_expr,
+                "ConditionExpression": condition,
+                "ExpressionAttributeValues": to_dynamo_item(expr_values),
+                "ReturnValuesOnConditionCheckFailure": "ALL_OLD",
+            }
+        })
+        try:
+            await adynamodbClient.transact_write_items(TransactItems=transact_items)
+        except dynamodbClient.exceptions.TransactionCanceledException as e:
+            reasons = e.response.get("CancellationReasons") or []
+            if len(reasons) == len(transact_items) and reasons[-1].get("Code") == "ConditionalCheckFailed":
+                # Igual que sin cambio de slug: sin ítem en el motivo, el post se eliminó después de leerlo
+                if "Item" not in reasons[-1]:
+                    raise HTTPException(status_code=404, detail="Post no encontrado")
+                raise HTTPException(status_code=409, detail="El post fue modificado por otra edición. Recárgalo e intenta de nuevo.")
+            raise HTTPException(status_code=400, detail="Este slug ya está en uso por otro post.")
+        # La condición de versión garantiza que el post era exactamente el leído
+        saved = {**existing, **update_data, "version": expected_version + 1}
 
-    blogposts_table.update_item(
-        Key={"post_id": post_id},
-        UpdateExpression=update_expr,
-        ExpressionAttributeValues=expr_values
-    )
+    await invalidate_post(post_id, old_slug, new_slug)
+
+    # Portada nueva: regenerar srcset, y la miniatura solo si el autor no subió una
+    if "cover_url" in update_data:
+        schedule_derivatives(post_id, update_data["cover_url"], needs_generated_thumbnail(saved), save_derivatives)
 
-    return {**existing, **update_data}
+    if "title" in update_data or "content" in update_data:
+        search_services.schedule_index(post_id, saved.get("title"), saved.get("content"), int(saved["version"]))
+
+    return saved
 
 
 
@@ -144,76 +373,155 @@ def is_uuid(value: str) -> bool:
     except ValueError:
         return False
 
-def get_post_by_slug_or_id(slug_or_id: str) -> BlogPost:
+async def load_post(post_id: str) -> Optional[BlogPost]:
+    item = (await blogposts_table.get_item(Key={"post_id": post_id})).get("Item")
+    return BlogPost(**item) if item else None
+
+async def get_post_by_slug_or_id(slug_or_id: str) -> BlogPost:
     try:
         if is_uuid(slug_or_id):
             # Buscar por post_id
-            response = blogposts_table.get_item(Key={"post_id": slug_or_id})
-            item = response.get("Item")
-            if not item:
-                raise HTTPException(status_code=404, detail="Post no encontrado")
-            return BlogPost(**item)
+            post_id = slug_or_id
         else:
-            # Buscar por slug
-            response = blogposts_table.scan(
-                FilterExpression="slug = :slug_val",
-                ExpressionAttributeValues={":slug_val": slug_or_id}
+            # Buscar por slug: reserva slug -> post_id y luego lectura por clave
+            post_id = await posts_cache.get_or_load(
+                slug_cache_key(slug_or_id), lambda: get_slug_owner(slug_or_id)
             )
-            items = response.get("Items", [])
-            if not items:
-                raise HTTPException(status_code=404, detail="Post no encontrado")
-            return BlogPost(**items[0])  # slugs son únicos
+
+        post = await posts_cache.get_or_load(post_cache_key(post_id), lambda: load_post(post_id)) if post_id else None
+        if not post:
+            raise HTTPException(status_code=404, detail="Post no encontrado")
+        return post  # slugs son únicos
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al obtener el post: {e}")
-    
 
-    
-def get_paginated_posts(limit: int = 10, last_evaluated_key: Optional[str] = None) -> dict:
-    scan_kwargs: dict[str, Any] = {"Limit": limit}
 
-    if last_evaluated_key:
-        scan_kwargs["ExclusiveStartKey"] = {"post_id": last_evaluated_key}
+async def get_posts_by_slugs_or_ids(values: List[str]) -> dict:
+    """
+    Varios posts por id o slug con lecturas por lotes: como máximo una ronda
+    de BatchGetItem para los slugs y otra para los posts (más el caché).
+    Retorna {"items": [...], "missing": [...]} en el orden pedido.
+    """
+    values = list(dict.fromkeys(values))
+    slugs = [value for value in values if not is_uuid(value)]
 
-    try:
-        response = blogposts_table.scan(**scan_kwargs)
-        items = response.get("Items", [])
-        posts = [BlogPost(**item) for item in items]
+    async def load_slugs(keys: List[str]) -> dict:
+        items = await batch_get(BLOG_SLUGS_TABLE, [{"slug": key.removeprefix("slug:")} for key in keys])
+        return {slug_cache_key(item["slug"]): item["post_id"] for item in items}
 
-        return {
-            "items": posts,
-            "next_token": response.get("LastEvaluatedKey", {}).get("post_id"),  # Para usar como cursor
-            "has_more": "LastEvaluatedKey" in response
-        }
+    async def load_posts(keys: List[str]) -> dict:
+        items = await batch_get(BLOG_POSTS_TABLE, [{"post_id": key.removeprefix("post:")} for key in keys])
+        return {post_cache_key(item["post_id"]): BlogPost(**item) for item in items}
 
+    try:
+        owners = await posts_cache.get_many_or_load([slug_cache_key(slug) for slug in slugs], load_slugs) if slugs else {}
+        post_ids = {value: value if is_uuid(value) else owners.get(slug_cache_key(value)) for value in values}
+        wanted = [post_cache_key(post_id) for post_id in dict.fromkeys(filter(None, post_ids.values()))]
+        posts = await posts_cache.get_many_or_load(wanted, load_posts) if wanted else {}
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error al obtener posts paginados: {e}")
-    
+        raise HTTPException(status_code=500, detail=f"Error al obtener los posts: {e}")
 
+    items, missing = [], []
+    for value, post_id in post_ids.items():
+        post = posts.get(post_cache_key(post_id)) if post_id else None
+        if post:
+            items.append(post)
+        else:
+            missing.append(value)
+    return {"items": items, "missing": missing}
+
+
+async def search_posts(query: str, limit: int = 10, page_token: Optional[str] = None) -> dict:
+    """
+    Búsqueda de texto completo: ids ordenados por relevancia desde el índice
+    invertido y los posts de la página leídos por lotes (con caché).
+    El token de página es un offset firmado, válido solo para la misma búsqueda.
+    Con términos muy frecuentes `total` es una cota inferior (total_exact = False).
+    """
+    offset = 0
+    if page_token:
+        try:
+            cursor = decode_cursor(page_token)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Token de página inválido")
+        if cursor.get("q") != query:
+            raise HTTPException(status_code=400, detail="Token de página inválido")
+        offset = int(cursor.get("offset", 0))
 
-def get_paginated_posts(limit: int = 10, last_evaluated_key: Optional[str] = None) -> dict:
-    scan_kwargs: dict[str, Any] = {"Limit": limit}
+    try:
+        post_ids, total, total_exact = await search_services.search(query, limit, offset)
+        found = await get_posts_by_slugs_or_ids(post_ids) if post_ids else {"items": []}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al buscar posts: {e}")
+
+    next_offset = offset + limit
+    has_more = next_offset < total
+    return {
+        "items": [model_to_response(post, BlogPostSummary) for post in found["items"]],
+        "total": total,
+        "total_exact": total_exact,
+        "next_token": encode_cursor({"q": query, "offset": next_offset}) if has_more else None,
+        "has_more": has_more,
+    }
+
+
+async def get_paginated_posts(
+    limit: int = 10,
+    last_evaluated_key: Optional[str] = None,
+    author_id: Optional[str] = None,
+    full: bool = False,
+) -> dict:
+    """
+    Lista posts del más nuevo al más antiguo con un Query acotado sobre el
+    índice por fecha (o por autor si se indica author_id).
+    Por defecto solo lee los atributos del resumen (BlogPostSummary); con
+    full=True retorna los posts completos. Los ítems se retornan como dicts
+    de respuesta, sin validarlos con pydantic (los escribió la app).
+    El cursor es el LastEvaluatedKey completo, firmado y opaco para el cliente.
+    """
+    query_kwargs: dict[str, Any] = {"Limit": limit, "ScanIndexForward": False}
+    if not full:
+        # Nombres con alias: algunos atributos podrían ser palabras reservadas de DynamoDB
+        query_kwargs["ProjectionExpression"] = ", ".join(f"#a{i}" for i in range(len(SUMMARY_ATTRIBUTES)))
+        query_kwargs["ExpressionAttributeNames"] = {f"#a{i}": name for i, name in enumerate(SUMMARY_ATTRIBUTES)}
+
+    if author_id:
+        query_kwargs["IndexName"] = POSTS_BY_AUTHOR_INDEX
+        query_kwargs["KeyConditionExpression"] = Key("author_id").eq(author_id)
+    else:
+        query_kwargs["IndexName"] = POSTS_BY_DATE_INDEX
+        query_kwargs["KeyConditionExpression"] = Key("listing").eq(LISTING_PARTITION)
 
     if last_evaluated_key:
-        scan_kwargs["ExclusiveStartKey"] = {"post_id": last_evaluated_key}
+        try:
+            query_kwargs["ExclusiveStartKey"] = decode_cursor(last_evaluated_key)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Token de página inválido")
 
     try:
-        response = blogposts_table.scan(**scan_kwargs)
+        response = await blogposts_table.query(**query_kwargs)
         items = response.get("Items", [])
-        posts = [BlogPost(**item) for item in items]
+        model = BlogPost if full else BlogPostSummary
+        posts = [item_to_response(item, model) for item in items]
+        last_key = response.get("LastEvaluatedKey")
 
         return {
             "items": posts,
-            "next_token": response.get("LastEvaluatedKey", {}).get("post_id"),  # Para usar como cursor
-            "has_more": "LastEvaluatedKey" in response
+            "next_token": encode_cursor(last_key) if last_key else None,  # Para usar como cursor
+            "has_more": last_key is not None
         }
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al obtener posts paginados: {e}")
 
 
-def delete_post(post_id: str, user_id: str):
+async def delete_post(post_id: str, user_id: str):
     # Verifica si el post existe y pertenece al usuario
-    response = blogposts_table.get_item(Key={"post_id": post_id})
+    response = await blogposts_table.get_item(Key={"post_id": post_id})
     item = response.get("Item")
 
     if not item:
@@ -222,7 +530,61 @@ def delete_post(post_id: str, user_id: str):
     # if item["author_id"] != user_id:
     #     raise HTTPException(status_code=403, detail="No tienes permiso para eliminar este post.")
 
-    # Eliminar de DynamoDB
-    blogposts_table.delete_item(Key={"post_id": post_id})
+    # Eliminar de DynamoDB junto con la reserva del slug
+    if item.get("slug"):
+        await adynamodbClient.transact_write_items(
+            TransactItems=[
+                {"Delete": {"TableName": BLOG_POSTS_TABLE, "Key": to_dynamo_item({"post_id": post_id})}},
+                slug_delete(item["slug"], post_id),
+            ]
+        )
+    else:
+        await blogposts_table.delete_item(Key={"post_id": post_id})
+
+    await invalidate_post(post_id, item.get("slug"))
+    search_services.schedule_remove(post_id)
+
+    return {"message": f"Post {post_id} eliminado correctamente"}
+
+
+async def delete_posts(post_ids: List[str]) -> dict:
+    """
+    Borrado masivo (moderación): cada post se borra con DeleteItem y ALL_OLD,
+    que retorna el slug que tenía al borrarse; esa reserva se libera con un
+    borrado condicional a que siga siendo del post (como slug_delete), así un
+    slug que entretanto pasó a otro post no se toca.
+    No es transaccional: cada post es independiente, hasta
+    BULK_DELETE_CONCURRENCY en paralelo.
+    """
+    post_ids = list(dict.fromkeys(post_ids))
+    slots = asyncio.Semaphore(BULK_DELETE_CONCURRENCY)
+
+    async def delete_one(post_id: str) -> Optional[dict]:
+        async with slots:
+            old = (await blogposts_table.delete_item(Key={"post_id": post_id}, ReturnValues="ALL_OLD")).get("Attributes")
+            if old and old.get("slug"):
+                try:
+                    await slugs_table.delete_item(
+                        Key={"slug": old["slug"]},
+                        ConditionExpression="post_id = :post_id_val",
+                        ExpressionAttributeValues={":post_id_val": post_id},
+                    )
+                except dynamodbClient.exceptions.ConditionalCheckFailedException:
+                    logger.info(f"Borrado masivo: el slug {old['slug']} ya no pertenece al post {post_id}")
+            return old
+
+    deleted = await asyncio.gather(*(delete_one(post_id) for post_id in post_ids))
+    found = {post_id: old.get("slug") for post_id, old in zip(post_ids, deleted) if old}
+
+    await posts_cache.invalidate(
+        *(post_cache_key(post_id) for post_id in found),
+        *(slug_cache_key(slug) for slug in found.values() if slug),
+    )
+    if found:
+        await emit_purge([post_surrogate_key(post_id) for post_id in found] + [LISTING_SURROGATE_KEY])
+
+    for post_id in found:
+        search_services.schedule_remove(post_id)
 
-    return {"message": f"Post {post_id} eliminado correctamente"}
\ No newline at end of file
+    logger.info(f"Borrado masivo: {len(found)} posts eliminados")
+    return {"deleted": list(found), "not_found": [post_id for post_id in post_ids if post_id not in found]}
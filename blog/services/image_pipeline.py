@@ -0,0 +1,111 @@
+# blog/services/image_pipeline.py
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from typing import List, Optional, Tuple
+
+from blog.utils.s3_utils import key_from_url, upload_image_bytes
+from core import config
+from core.client import run_io
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:  # Pillow es opcional: sin él no se generan derivados
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+# Anchos del srcset de la portada y caja máxima de la miniatura
+RESPONSIVE_WIDTHS = (320, 640, 1024, 1600)
+THUMBNAIL_SIZE = (400, 400)
+ENCODE_QUALITY = 80
+
+# Pillow libera el GIL al redimensionar y codificar; un pool pequeño y propio
+# evita que un lote de portadas ocupe el pool de I/O de AWS
+_image_executor = ThreadPoolExecutor(max_workers=config.IMAGE_PIPELINE_WORKERS, thread_name_prefix="images")
+
+# Trabajos en curso: se guarda la referencia para que el GC no cancele la tarea
+_pipeline_tasks = set()
+
+
+def derivative_format() -> Tuple[str, str]:
+    """Formato de salida (nombre Pillow, MIME); AVIF solo si Pillow lo soporta."""
+    if config.IMAGE_DERIVATIVE_FORMAT == "avif" and features.check("avif"):
+        return "AVIF", "image/avif"
+    return "WEBP", "image/webp"
+
+
+def build_derivatives(image_data: bytes) -> Tuple[List[Tuple[int, bytes]], bytes, str]:
+    """
+    Genera los tamaños responsive y la miniatura de una portada.
+    Re-codificar sin pasar `exif` elimina los metadatos (EXIF, GPS, etc.).
+    Retorna ([(ancho, bytes), ...], miniatura, MIME).
+    """
+    pil_format, mime_type = derivative_format()
+
+    with Image.open(BytesIO(image_data)) as original:
+        image = ImageOps.exif_transpose(original)
+        image = image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+
+    def encode(img) -> bytes:
+        output = BytesIO()
+        img.save(output, format=pil_format, quality=ENCODE_QUALITY)
+        return output.getvalue()
+
+    # Solo anchos menores al original (sin agrandar) y siempre el original re-codificado
+    widths = [w for w in RESPONSIVE_WIDTHS if w < image.width] + [image.width]
+    sizes = []
+    for width in widths:
+        resized = image if width == image.width else image.resize(
+            (width, round(image.height * width / image.width)), Image.LANCZOS
+        )
+        sizes.append((width, encode(resized)))
+
+    thumbnail = image.copy()
+    thumbnail.thumbnail(THUMBNAIL_SIZE, Image.LANCZOS)
+    return sizes, encode(thumbnail), mime_type
+
+
+async def generate_derivatives(cover_url: str, generate_thumbnail: bool) -> Optional[dict]:
+    """
+    Descarga la portada, genera los derivados en el pool de imágenes y los sube.
+    Retorna {"cover_srcset": ..., "thumbnail_url": ...} o None si no aplica.
+    """
+    key = key_from_url(cover_url)
+    if Image is None or not key:
+        return None
+
+    obj = await run_io(config.s3_client.get_object, Bucket=config.AWS_S3_BUCKET_NAME, Key=key)
+    image_data = await run_io(obj["Body"].read)
+
+    loop = asyncio.get_running_loop()
+    sizes, thumbnail, mime_type = await loop.run_in_executor(_image_executor, build_derivatives, image_data)
+
+    urls = await asyncio.gather(*(upload_image_bytes(data, mime_type) for _, data in sizes))
+    result = {"cover_srcset": ", ".join(f"{url} {width}w" for url, (width, _) in zip(urls, sizes))}
+    if generate_thumbnail:
+        result["thumbnail_url"] = await upload_image_bytes(thumbnail, mime_type)
+    return result
+
+
+def schedule_derivatives(post_id: str, cover_url: Optional[str], generate_thumbnail: bool, save) -> None:
+    """
+    Lanza la generación de derivados fuera del request.
+    `save(post_id, cover_url, fields)` es la corrutina que guarda los campos en el post.
+    """
+    if Image is None or not key_from_url(cover_url or ""):
+        return
+
+    async def run():
+        try:
+            fields = await generate_derivatives(cover_url, generate_thumbnail)
+            if fields:
+                await save(post_id, cover_url, fields)
+        except Exception as e:
+            logger.error(f"Error generando derivados de la portada del post {post_id}: {e}")
+
+    task = asyncio.create_task(run())
+    _pipeline_tasks.add(task)
+    task.add_done_callback(_pipeline_tasks.discard)
@@ -0,0 +1,276 @@
+# blog/services/search_services.py
+"""
+Búsqueda de texto completo sobre los posts con un índice invertido en
+DynamoDB (BLOG_SEARCH_TABLE):
+  - (término, post_id) -> peso del término en el post
+  - ("DOC#<post_id>", post_id) -> {término: peso} indexados del post y la
+    versión del post que representan, para saber qué postings borrar o
+    reescribir cuando el post cambia. Al borrar el post queda como lápida
+    (removed) para que un indexado atrasado no lo reviva
+  - ("STATS", "docs") -> total de posts indexados (para el idf)
+  - GSI por (término, peso): al buscar se leen los postings de más peso
+    primero, así que el tope por término descarta los de menor peso
+
+Los términos salen de la misma normalización que los slugs (slugify), así
+que la búsqueda ignora mayúsculas y tildes. El índice se actualiza en
+segundo plano al crear, editar y borrar posts; scripts/rebuild_search_index.py
+lo reconstruye desde cero.
+
+Dos workers pueden reindexar el mismo post a la vez, así que el orden lo dan
+escrituras condicionales y no locks en memoria:
+  1. el trabajo reclama el ítem DOC# con su versión del post (condición:
+     versión más nueva que la indexada); si pierde, no escribe nada
+  2. escribe los postings que cambiaron, cada uno con esa versión y sin
+     pisar uno de una versión más nueva
+  3. relee el DOC#: si otro trabajo lo reclamó mientras escribía, borra los
+     postings que escribió y que la versión nueva no usa (solo si siguen
+     siendo de su versión)
+"""
+
+import asyncio
+import logging
+import math
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from boto3.dynamodb.conditions import Key
+
+from blog.utils.text_utils import slugify
+from core.batch import batch_write
+from core.client import dynamodbClient, table
+from core.schema import BLOG_SEARCH_TABLE, SEARCH_POSTINGS_BY_WEIGHT_INDEX
+
+logger = logging.getLogger(__name__)
+
+search_table = table(BLOG_SEARCH_TABLE)
+
+TITLE_WEIGHT = 3  # Una aparición en el título vale como tres en el contenido
+MAX_TERMS_PER_POST = 300  # Los de más peso; acota las escrituras por post
+MAX_QUERY_TERMS = 8
+MAX_POSTINGS_PER_TERM = 2000  # Postings leídos por término al buscar (los de más peso)
+BM25_K1 = 1.2
+
+STATS_KEY = {"term": "STATS", "post_id": "docs"}
+
+STOPWORDS = frozenset(
+    # Español
+    "de la el en y a los las del se un una por con no es para al lo como mas o pero sus le ya este esta "
+    "si porque entre cuando muy sin sobre tambien me hasta hay donde desde todo nos durante todos uno les "
+    "ni contra otros ese eso ante ellos e esto mi antes algunos que unos yo otro otras otra tanto esa estos "
+    "mucho quienes nada muchos cual poco ella estar estas algunas algo nosotros su son fue ha"
+    # Inglés
+    " the and of to in is it that for on with as was at by an be this are from or have not but"
+    .split()
+)
+
+# Trabajos de indexado en curso (referencias para el GC)
+_index_tasks = set()
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return [token for token in slugify(text or "").split("-") if len(token) > 1 and token not in STOPWORDS]
+
+
+def term_weights(title: Optional[str], content: Optional[str]) -> Dict[str, int]:
+    weights = Counter(tokenize(content))
+    for token in tokenize(title):
+        weights[token] += TITLE_WEIGHT
+    return dict(weights.most_common(MAX_TERMS_PER_POST))
+
+
+def doc_key(post_id: str) -> dict:
+    return {"term": f"DOC#{post_id}", "post_id": post_id}
+
+
+def index_requests(post_id: str, weights: Dict[str, int], old_weights: Dict[str, int], version: int = 0) -> List[dict]:
+    """
+    Escrituras sin condición que llevan los postings del post de `old_weights`
+    a `weights` (reconstrucción del índice y borrado de posts).
+    """
+    requests = [
+        {"DeleteRequest": {"Key": {"term": term, "post_id": post_id}}}
+        for term in old_weights.keys() - weights.keys()
+    ]
+    requests += [
+        {"PutRequest": {"Item": {"term": term, "post_id": post_id, "weight": weight, "version": version}}}
+        for term, weight in weights.items()
+        if old_weights.get(term) != weight
+    ]
+    return requests
+
+
+async def _count_docs(delta: int) -> None:
+    await search_table.update_item(
+        Key=STATS_KEY,
+        UpdateExpression="ADD doc_count :delta",
+        ExpressionAttributeValues={":delta": delta},
+    )
+
+
+async def _claim(post_id: str, item: dict, condition: str, values: Optional[dict] = None) -> Optional[dict]:
+    """Escribe el DOC# del post si se cumple `condition`; retorna el anterior ({} si no había) o None."""
+    try:
+        response = await search_table.put_item(
+            Item={**doc_key(post_id), **item},
+            ConditionExpression=condition,
+            ReturnValues="ALL_OLD",
+            **({"ExpressionAttributeValues": values} if values else {}),
+        )
+    except dynamodbClient.exceptions.ConditionalCheckFailedException:
+        return None
+    return response.get("Attributes", {})
+
+
+async def _conditional(write, **kwargs) -> None:
+    try:
+        await write(**kwargs)
+    except dynamodbClient.exceptions.ConditionalCheckFailedException:
+        pass  # Lo escribió una versión más nueva
+
+
+def _put_posting(post_id: str, term: str, weight: int, version: int):
+    return _conditional(
+        search_table.put_item,
+        Item={"term": term, "post_id": post_id, "weight": weight, "version": version},
+        ConditionExpression="attribute_not_exists(version) OR version <= :version",
+        ExpressionAttributeValues={":version": version},
+    )
+
+
+def _delete_posting(post_id: str, term: str, condition: str, version: int):
+    return _conditional(
+        search_table.delete_item,
+        Key={"term": term, "post_id": post_id},
+        ConditionExpression=condition,
+        ExpressionAttributeValues={":version": version},
+    )
+
+
+async def index_post(post_id: str, title: Optional[str], content: Optional[str], version: int) -> None:
+    """
+    Indexa (o reindexa) la versión `version` del post escribiendo solo los
+    postings que cambiaron. No hace nada si ya está indexada esa versión o una
+    más nueva, o si el post se borró.
+    """
+    weights = term_weights(title, content)
+    doc = await _claim(
+        post_id,
+        {"terms": weights, "version": version},
+        "attribute_not_exists(post_id) OR (attribute_not_exists(removed) AND "
+        "(attribute_not_exists(version) OR version < :version))",
+        {":version": version},
+    )
+    if doc is None:
+        return
+    if not doc:
+        await _count_docs(1)
+
+    old_weights = {term: int(weight) for term, weight in doc.get("terms", {}).items()}
+    removed = old_weights.keys() - weights.keys()
+    written = [term for term, weight in weights.items() if old_weights.get(term) != weight]
+    await asyncio.gather(
+        *(_delete_posting(post_id, term, "attribute_not_exists(version) OR version < :version", version) for term in removed),
+        *(_put_posting(post_id, term, weights[term], version) for term in written),
+    )
+
+    # Si otro trabajo reclamó el post mientras escribíamos, pudo borrar antes de que llegaran nuestros puts
+    current = (await search_table.get_item(Key=doc_key(post_id), ConsistentRead=True)).get("Item") or {}
+    if current.get("version") != version or current.get("removed"):
+        keep = current.get("terms", {}).keys() if not current.get("removed") else set()
+        await asyncio.gather(*(
+            _delete_posting(post_id, term, "version = :version", version)
+            for term in written if term not in keep
+        ))
+
+
+async def remove_post(post_id: str) -> None:
+    # La lápida queda aunque el post nunca se haya indexado: un indexado atrasado ya no lo reclama
+    doc = await _claim(post_id, {"terms": {}, "removed": True}, "attribute_not_exists(removed)")
+    if not doc:
+        return
+    requests = index_requests(post_id, {}, doc.get("terms", {}))
+    if requests:
+        await batch_write({BLOG_SEARCH_TABLE: requests})
+    await _count_docs(-1)
+
+
+def _schedule(post_id: str, make_job) -> None:
+    """Ejecuta el trabajo fuera del request. El orden entre trabajos del mismo post lo dan las versiones."""
+
+    async def run():
+        try:
+            await make_job()
+        except Exception as e:
+            logger.error(f"Error actualizando el índice de búsqueda del post {post_id}: {e}")
+
+    task = asyncio.create_task(run())
+    _index_tasks.add(task)
+    task.add_done_callback(_index_tasks.discard)
+
+
+def schedule_index(post_id: str, title: Optional[str], content: Optional[str], version: int) -> None:
+    _schedule(post_id, lambda: index_post(post_id, title, content, version))
+
+
+def schedule_remove(post_id: str) -> None:
+    _schedule(post_id, lambda: remove_post(post_id))
+
+
+async def postings(term: str) -> Tuple[List[Tuple[str, int]], bool]:
+    """
+    (post_id, peso) del término, de mayor a menor peso, hasta
+    MAX_POSTINGS_PER_TERM. El segundo valor indica si quedaron postings sin
+    leer (el término aparece en más posts que el tope).
+    """
+    query_kwargs = {
+        "IndexName": SEARCH_POSTINGS_BY_WEIGHT_INDEX,
+        "KeyConditionExpression": Key("term").eq(term),
+        "ScanIndexForward": False,
+    }
+    found = []
+    # Uno más que el tope: si llega, hay más postings de los que se usan
+    while len(found) <= MAX_POSTINGS_PER_TERM:
+        query_kwargs["Limit"] = MAX_POSTINGS_PER_TERM + 1 - len(found)
+        response = await search_table.query(**query_kwargs)
+        found += [(item["post_id"], int(item["weight"])) for item in response.get("Items", [])]
+        if "LastEvaluatedKey" not in response:
+            break
+        query_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+    return found[:MAX_POSTINGS_PER_TERM], len(found) > MAX_POSTINGS_PER_TERM
+
+
+async def search(query: str, limit: int, offset: int = 0) -> Tuple[List[str], int, bool]:
+    """
+    Retorna (post_ids de la página, total de resultados, total exacto). Primero
+    los posts que contienen más términos de la búsqueda; a igualdad, por
+    puntaje BM25 (sin normalizar por largo del post).
+
+    Si algún término supera MAX_POSTINGS_PER_TERM, de ese término solo entran
+    los posts donde más pesa: el total es una cota inferior (exacto = False)
+    y su df también, así que su idf queda algo sobreestimado.
+    """
+    terms = list(dict.fromkeys(tokenize(query)))[:MAX_QUERY_TERMS]
+    if not terms:
+        return [], 0, True
+
+    stats, *term_postings = await asyncio.gather(
+        search_table.get_item(Key=STATS_KEY),
+        *(postings(term) for term in terms),
+    )
+    total_docs = max(int(stats.get("Item", {}).get("doc_count", 0)), 1)
+
+    scores = defaultdict(float)
+    matched = Counter()
+    truncated = False
+    for found, more in term_postings:
+        truncated = truncated or more
+        if not found:
+            continue
+        df = len(found)
+        idf = math.log(1 + (total_docs - df + 0.5) / (df + 0.5))
+        for post_id, weight in found:
+            scores[post_id] += idf * weight * (BM25_K1 + 1) / (weight + BM25_K1)
+            matched[post_id] += 1
+
+    ranked = sorted(scores, key=lambda post_id: (-matched[post_id], -scores[post_id], post_id))
+    return ranked[offset:offset + limit], len(ranked), not truncated
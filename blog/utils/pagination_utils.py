@@ -0,0 +1,46 @@
+# blog/utils/pagination_utils.py
+
+import base64
+import hashlib
+import hmac
+import json
+from core import config
+
+
+def _sign(payload: bytes) -> str:
+    digest = hmac.new(config.SECRET_KEY.encode("utf-8"), payload, hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest).decode("ascii").rstrip("=")
+
+
+def _b64decode(value: str) -> bytes:
+    return base64.urlsafe_b64decode(value + "=" * (-len(value) % 4))
+
+
+def encode_cursor(last_evaluated_key: dict) -> str:
+    """
+    Convierte el LastEvaluatedKey completo de DynamoDB en un token opaco y firmado.
+    El cliente no puede leerlo ni manipularlo para saltar a claves arbitrarias.
+    """
+    payload = json.dumps(last_evaluated_key, separators=(",", ":"), sort_keys=True, default=str).encode("utf-8")
+    body = base64.urlsafe_b64encode(payload).decode("ascii").rstrip("=")
+    return f"{body}.{_sign(payload)}"
+
+
+def decode_cursor(token: str) -> dict:
+    """
+    Valida la firma del token y retorna el LastEvaluatedKey original.
+    Lanza ValueError si el token está malformado o fue alterado.
+    """
+    try:
+        body, signature = token.split(".", 1)
+        payload = _b64decode(body)
+    except Exception as e:
+        raise ValueError("Token de página malformado") from e
+
+    if not hmac.compare_digest(signature, _sign(payload)):
+        raise ValueError("Firma del token de página inválida")
+
+    key = json.loads(payload)
+    if not isinstance(key, dict):
+        raise ValueError("Token de página malformado")
+    return key
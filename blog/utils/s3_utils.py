@@ -1,14 +1,42 @@
 # blog/utils/s3_utils.py
 
-import boto3
 import base64
 import uuid
-from io import BytesIO
 from fastapi import HTTPException
 from core import config  
+from core.client import run_io
+import hashlib
 import re
-import base64
-from typing import Tuple
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, NamedTuple, Optional, Tuple
+from botocore.exceptions import ClientError
+
+logger = logging.getLogger(__name__)
+
+# Tipos de imagen aceptados en las subidas por streaming
+ALLOWED_IMAGE_TYPES = {"image/jpeg", "image/png", "image/webp", "image/gif", "image/avif"}
+
+# Firmas (magic bytes) para verificar que el contenido coincide con el MIME declarado
+IMAGE_SIGNATURES = (
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+)
+
+PRESIGNED_UPLOAD_EXPIRES = 600  # segundos
+
+# Imágenes direccionadas por contenido y subidas temporales por streaming
+IMAGES_PREFIX = "images/"
+INCOMING_PREFIX = "incoming/"
+
+# S3 exige partes de al menos 5 MB (salvo la última); es también el máximo
+# que se mantiene en memoria por request al subir por streaming
+MULTIPART_PART_SIZE = 5 * 1024 * 1024
+
+# Bytes necesarios para reconocer el tipo de imagen (sniff_image_type)
+SNIFF_BYTES = 16
 
 def decode_base64_image(data_url: str) -> Tuple[bytes, str]:
     """
@@ -25,27 +53,311 @@ def decode_base64_image(data_url: str) -> Tuple[bytes, str]:
     return image_data, mime_type
 
 
-def upload_base64_image(image_base64: str, author_id: str, folder: str = "posts") -> str:
+class StoredImage(NamedTuple):
+    url: str
+    key: str
+    created: bool  # False si la imagen ya existía (deduplicada)
+
+
+async def upload_base64_image(image_base64: str) -> StoredImage:
     try:
-        image_data, mime_type = decode_base64_image(image_base64)
-        extension = mime_type.split("/")[-1]
-        key = f"{folder}/{author_id}/{uuid.uuid4().hex}.{extension}"
+        # Decodificar también fuera del event loop: con imágenes grandes no es gratis
+        image_data, mime_type = await run_io(decode_base64_image, image_base64)
+        key, created = await store_image(image_data, mime_type)
+        return StoredImage(await build_object_url(key), key, created)
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al subir la imagen a S3: {e}")
+
+
+def content_key(digest: str, mime_type: str) -> str:
+    """Key direccionada por contenido: la misma imagen siempre cae en la misma key."""
+    return f"{IMAGES_PREFIX}{digest}.{mime_type.split('/')[-1]}"
+
+
+def sha256_hex(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+# El barrido de huérfanas (scripts/sweep_orphan_images.py) no borra objetos con
+# LastModified dentro del período de gracia. Al reutilizar un objeto existente
+# (deduplicación o subida prefirmada) se renueva su LastModified si es más viejo
+# que esto, para que un barrido en curso no lo borre aunque su marca sea anterior
+TOUCH_AFTER = timedelta(hours=1)
+
+
+def is_not_found(error: ClientError) -> bool:
+    return error.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound")
 
-        config.s3_client.upload_fileobj(
-            Fileobj=BytesIO(image_data),
+
+async def touch_if_stale(key: str, head: dict) -> bool:
+    """
+    Renueva el LastModified del objeto copiándolo sobre sí mismo (sin
+    transferir bytes al cliente). Retorna False si el objeto ya no existe.
+    """
+    if head["LastModified"] > datetime.now(timezone.utc) - TOUCH_AFTER:
+        return True
+    bucket = config.AWS_S3_BUCKET_NAME
+    try:
+        await run_io(
+            config.s3_client.copy_object,
+            Bucket=bucket,
+            Key=key,
+            CopySource={"Bucket": bucket, "Key": key},
+            ContentType=head.get("ContentType", "application/octet-stream"),
+            Metadata={**head.get("Metadata", {}), "last-used": datetime.now(timezone.utc).isoformat()},
+            MetadataDirective="REPLACE",  # Copiar sobre sí mismo exige cambiar algo
+        )
+    except ClientError as e:
+        if is_not_found(e):
+            return False
+        raise
+    return True
+
+
+async def reuse_existing(key: str) -> bool:
+    """True si el objeto existe (y queda protegido del barrido de huérfanas)."""
+    try:
+        head = await run_io(config.s3_client.head_object, Bucket=config.AWS_S3_BUCKET_NAME, Key=key)
+    except ClientError as e:
+        if is_not_found(e):
+            return False
+        raise
+    return await touch_if_stale(key, head)
+
+
+async def store_image(image_data: bytes, mime_type: str) -> Tuple[str, bool]:
+    """
+    Guarda la imagen bajo su hash SHA-256. Si ya existe (misma imagen subida
+    antes, por cualquier post o autor) no se vuelve a escribir.
+    Retorna (key, creado) donde `creado` indica si el objeto es nuevo.
+    """
+    key = content_key(await run_io(sha256_hex, image_data), mime_type)
+
+    # HEAD antes del PUT para no transferir bytes que ya están en S3
+    if await reuse_existing(key):
+        return key, False
+
+    try:
+        # PUT condicional: si otro request subió la misma imagen entre el HEAD y
+        # el PUT, S3 lo rechaza y simplemente reutilizamos ese objeto
+        await run_io(
+            config.s3_client.put_object,
             Bucket=config.AWS_S3_BUCKET_NAME,
             Key=key,
-            ExtraArgs={"ContentType": mime_type}
+            Body=image_data,
+            ContentType=mime_type,
+            IfNoneMatch="*",
         )
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") in ("PreconditionFailed", "ConditionalRequestConflict"):
+            return key, False
+        raise
+    return key, True
+
+
+async def upload_image_bytes(image_data: bytes, mime_type: str) -> str:
+    key, _ = await store_image(image_data, mime_type)
+    return await build_object_url(key)
 
-        if config.AWS_S3_PUBLIC:
-            return f"https://{config.AWS_S3_BUCKET_NAME}.s3.{config.AWS_REGION}.amazonaws.com/{key}"
-        else:
-            return config.s3_client.generate_presigned_url(
-                "get_object",
-                Params={"Bucket": config.AWS_S3_BUCKET_NAME, "Key": key},
-                ExpiresIn=3600
+
+def key_from_url(url: str) -> Optional[str]:
+    """
+    Key de S3 a partir de una URL de nuestro bucket (pública o prefirmada).
+    Retorna None si la URL apunta a otro sitio.
+    """
+    prefix = f"https://{config.AWS_S3_BUCKET_NAME}.s3."
+    if not url or not url.startswith(prefix) or ".amazonaws.com/" not in url:
+        return None
+    return url.split(".amazonaws.com/", 1)[1].split("?", 1)[0]
+
+
+async def build_object_url(key: str) -> str:
+    """URL pública del objeto, o URL prefirmada si el bucket es privado."""
+    if config.AWS_S3_PUBLIC:
+        return f"https://{config.AWS_S3_BUCKET_NAME}.s3.{config.AWS_REGION}.amazonaws.com/{key}"
+    return await run_io(
+        config.s3_client.generate_presigned_url,
+        "get_object",
+        Params={"Bucket": config.AWS_S3_BUCKET_NAME, "Key": key},
+        ExpiresIn=3600
+    )
+
+
+async def upload_image_stream(
+    chunks: AsyncIterator[bytes],
+    mime_type: str,
+    max_bytes: int = config.MAX_IMAGE_UPLOAD_BYTES,
+) -> str:
+    """
+    Sube una imagen a S3 a medida que llegan los bytes del request, con un
+    multipart upload. En memoria solo se mantiene la parte en construcción
+    (MULTIPART_PART_SIZE), sin importar el tamaño total de la imagen.
+    Si algo falla, el multipart upload se aborta para no dejar partes huérfanas.
+
+    Como el hash recién se conoce al final, se sube a una key temporal y
+    luego se copia a la key direccionada por contenido (si no existía ya).
+    """
+    key = f"{INCOMING_PREFIX}{uuid.uuid4().hex}"
+    bucket = config.AWS_S3_BUCKET_NAME
+    chunks = aiter(chunks)
+
+    # Los primeros bytes se leen antes de iniciar el multipart upload para
+    # verificar el contenido contra el MIME declarado, igual que finalize_upload
+    buffer = bytearray()
+    async for chunk in chunks:
+        buffer += chunk
+        if len(buffer) >= SNIFF_BYTES:
+            break
+    if not buffer:
+        raise HTTPException(status_code=400, detail="El cuerpo del request está vacío")
+    if len(buffer) > max_bytes:
+        raise HTTPException(status_code=413, detail=f"La imagen supera el máximo de {max_bytes} bytes")
+    if sniff_image_type(bytes(buffer[:SNIFF_BYTES])) != mime_type:
+        raise HTTPException(status_code=400, detail="El contenido de la imagen no coincide con su tipo declarado.")
+    hasher = hashlib.sha256(buffer)
+    total = len(buffer)
+
+    upload = await run_io(
+        config.s3_client.create_multipart_upload, Bucket=bucket, Key=key, ContentType=mime_type
+    )
+    upload_id = upload["UploadId"]
+    parts = []
+
+    async def flush():
+        part_number = len(parts) + 1
+        response = await run_io(
+            config.s3_client.upload_part,
+            Bucket=bucket, Key=key, UploadId=upload_id, PartNumber=part_number, Body=bytes(buffer),
+        )
+        parts.append({"PartNumber": part_number, "ETag": response["ETag"]})
+        buffer.clear()
+
+    try:
+        async for chunk in chunks:
+            total += len(chunk)
+            if total > max_bytes:
+                raise HTTPException(status_code=413, detail=f"La imagen supera el máximo de {max_bytes} bytes")
+            buffer += chunk
+            hasher.update(chunk)
+            if len(buffer) >= MULTIPART_PART_SIZE:
+                await flush()
+
+        if buffer:
+            await flush()
+
+        await run_io(
+            config.s3_client.complete_multipart_upload,
+            Bucket=bucket, Key=key, UploadId=upload_id, MultipartUpload={"Parts": parts},
+        )
+    except BaseException:
+        await run_io(config.s3_client.abort_multipart_upload, Bucket=bucket, Key=key, UploadId=upload_id)
+        raise
+
+    final_key = content_key(hasher.hexdigest(), mime_type)
+    try:
+        if not await reuse_existing(final_key):
+            await run_io(
+                config.s3_client.copy_object,
+                Bucket=bucket,
+                Key=final_key,
+                CopySource={"Bucket": bucket, "Key": key},
+                ContentType=mime_type,
+                MetadataDirective="REPLACE",
             )
+    finally:
+        await run_io(config.s3_client.delete_object, Bucket=bucket, Key=key)
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error al subir la imagen a S3: {e}")
+    return await build_object_url(final_key)
+
+
+
+def sniff_image_type(header: bytes) -> Optional[str]:
+    """Detecta el tipo de imagen a partir de los primeros bytes del archivo."""
+    for signature, mime_type in IMAGE_SIGNATURES:
+        if header.startswith(signature):
+            return mime_type
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "image/webp"
+    if header[4:8] == b"ftyp" and header[8:12] in (b"avif", b"avis"):
+        return "image/avif"
+    return None
+
+
+def pending_upload_prefix(author_id: str, folder: str) -> str:
+    """Prefijo de las subidas directas de un autor: solo él puede vincularlas a un post."""
+    return f"uploads/{author_id}/{folder}/"
+
+
+async def create_presigned_upload(
+    author_id: str,
+    folder: str,
+    mime_type: str,
+    max_bytes: int = config.MAX_IMAGE_UPLOAD_BYTES,
+) -> dict:
+    """
+    Genera un POST prefirmado para que el cliente suba la imagen directo a S3.
+    S3 aplica las condiciones de tipo y tamaño; luego el post se vincula con
+    `cover_key`/`thumbnail_key` y finalize_upload verifica el objeto.
+    """
+    extension = mime_type.split("/")[-1]
+    key = f"{pending_upload_prefix(author_id, folder)}{uuid.uuid4().hex}.{extension}"
+
+    presigned = await run_io(
+        config.s3_client.generate_presigned_post,
+        Bucket=config.AWS_S3_BUCKET_NAME,
+        Key=key,
+        Fields={"Content-Type": mime_type},
+        Conditions=[
+            {"Content-Type": mime_type},
+            ["content-length-range", 1, max_bytes],
+        ],
+        ExpiresIn=PRESIGNED_UPLOAD_EXPIRES,
+    )
+    return {
+        "url": presigned["url"],
+        "fields": presigned["fields"],
+        "key": key,
+        "expires_in": PRESIGNED_UPLOAD_EXPIRES,
+    }
+
+
+async def finalize_upload(
+    key: str,
+    author_id: str,
+    folder: str,
+    max_bytes: int = config.MAX_IMAGE_UPLOAD_BYTES,
+) -> str:
+    """
+    Verifica una imagen subida con URL prefirmada antes de vincularla a un post:
+    que pertenezca al autor, que exista (HEAD), su tamaño y que el MIME
+    declarado coincida con el contenido real. Retorna la URL del objeto.
+    """
+    if not key.startswith(pending_upload_prefix(author_id, folder)):
+        raise HTTPException(status_code=400, detail="La imagen indicada no pertenece a este usuario.")
+
+    bucket = config.AWS_S3_BUCKET_NAME
+    try:
+        head = await run_io(config.s3_client.head_object, Bucket=bucket, Key=key)
+    except ClientError as e:
+        if is_not_found(e):
+            raise HTTPException(status_code=400, detail="La imagen indicada no existe. Súbela antes de crear el post.")
+        # Permisos, throttling o caída de S3: no es un error del cliente
+        logger.error(f"Error al verificar la imagen subida {key}: {e}")
+        raise
+
+    content_type = head.get("ContentType", "")
+    if content_type not in ALLOWED_IMAGE_TYPES:
+        raise HTTPException(status_code=415, detail=f"Tipo de imagen no soportado: {content_type}")
+    if not 0 < head["ContentLength"] <= max_bytes:
+        raise HTTPException(status_code=413, detail=f"La imagen supera el máximo de {max_bytes} bytes")
+
+    header = await run_io(config.s3_client.get_object, Bucket=bucket, Key=key, Range=f"bytes=0-{SNIFF_BYTES - 1}")
+    sniffed = sniff_image_type(await run_io(header["Body"].read))
+    if sniffed != content_type:
+        await run_io(config.s3_client.delete_object, Bucket=bucket, Key=key)
+        raise HTTPException(status_code=415, detail="El contenido de la imagen no coincide con su tipo declarado.")
+
+    if not await touch_if_stale(key, head):
+        raise HTTPException(status_code=400, detail="La imagen indicada no existe. Súbela antes de crear el post.")
+    return await build_object_url(key)
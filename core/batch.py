@@ -0,0 +1,112 @@
+# core/batch.py
+"""
+Lecturas y escrituras por lotes en DynamoDB (BatchGetItem / BatchWriteItem).
+
+Las listas de keys se parten en lotes del máximo que acepta DynamoDB (100
+lecturas, 25 escrituras) que se envían en paralelo. Lo que DynamoDB deja
+sin procesar (UnprocessedKeys / UnprocessedItems, típicamente por throttling)
+se reintenta con backoff exponencial y jitter.
+"""
+
+import asyncio
+import logging
+import random
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from core.client import aio, dynamodb
+
+logger = logging.getLogger(__name__)
+
+BATCH_GET_LIMIT = 100
+BATCH_WRITE_LIMIT = 25
+BATCH_MAX_ATTEMPTS = 8
+BATCH_BACKOFF_BASE = 0.05  # segundos
+BATCH_BACKOFF_MAX = 2.0
+
+# Las operaciones del recurso (de)serializan los tipos de DynamoDB como las tablas
+_adynamodb = aio(dynamodb)
+
+
+def chunks(items: list, size: int) -> List[list]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+async def backoff(attempt: int) -> None:
+    """Espera con backoff exponencial y full jitter antes del reintento `attempt`."""
+    await asyncio.sleep(random.uniform(0, min(BATCH_BACKOFF_MAX, BATCH_BACKOFF_BASE * 2 ** attempt)))
+
+
+def _dedupe_keys(keys: Iterable[dict]) -> List[dict]:
+    # DynamoDB rechaza el lote entero si una key aparece dos veces
+    unique = {}
+    for key in keys:
+        unique.setdefault(tuple(sorted(key.items())), key)
+    return list(unique.values())
+
+
+async def _get_chunk(table_name: str, keys: List[dict], projection: Optional[str], names: Optional[dict]) -> List[dict]:
+    request = {"Keys": keys}
+    if projection:
+        request["ProjectionExpression"] = projection
+    if names:
+        request["ExpressionAttributeNames"] = names
+
+    items = []
+    pending = {table_name: request}
+    for attempt in range(BATCH_MAX_ATTEMPTS):
+        response = await _adynamodb.batch_get_item(RequestItems=pending)
+        items.extend(response.get("Responses", {}).get(table_name, []))
+        pending = response.get("UnprocessedKeys") or {}
+        if not pending:
+            return items
+        await backoff(attempt)
+    raise RuntimeError(
+        f"BatchGetItem en {table_name}: {len(pending[table_name]['Keys'])} keys sin procesar "
+        f"después de {BATCH_MAX_ATTEMPTS} intentos"
+    )
+
+
+async def batch_get(
+    table_name: str,
+    keys: Iterable[dict],
+    projection: Optional[str] = None,
+    names: Optional[dict] = None,
+) -> List[dict]:
+    """
+    Lee los ítems de `keys` (p. ej. [{"post_id": "..."}]). Las keys que no
+    existen simplemente no aparecen; el orden del resultado no está garantizado.
+    """
+    keys = _dedupe_keys(keys)
+    results = await asyncio.gather(
+        *(_get_chunk(table_name, chunk, projection, names) for chunk in chunks(keys, BATCH_GET_LIMIT))
+    )
+    return [item for items in results for item in items]
+
+
+async def _write_chunk(requests: List[Tuple[str, dict]]) -> None:
+    pending: Dict[str, list] = {}
+    for table_name, request in requests:
+        pending.setdefault(table_name, []).append(request)
+
+    for attempt in range(BATCH_MAX_ATTEMPTS):
+        response = await _adynamodb.batch_write_item(RequestItems=pending)
+        pending = response.get("UnprocessedItems") or {}
+        if not pending:
+            return
+        await backoff(attempt)
+    remaining = sum(len(requests) for requests in pending.values())
+    raise RuntimeError(f"BatchWriteItem: {remaining} escrituras sin procesar después de {BATCH_MAX_ATTEMPTS} intentos")
+
+
+async def batch_write(requests: Dict[str, List[dict]]) -> None:
+    """
+    Ejecuta escrituras por lotes, p. ej.
+    {"tabla": [{"DeleteRequest": {"Key": {...}}}, {"PutRequest": {"Item": {...}}}]}.
+    Un mismo lote puede mezclar tablas. Sin condiciones: cada escritura es incondicional.
+    """
+    flat = [(table_name, request) for table_name, table_requests in requests.items() for request in table_requests]
+    await asyncio.gather(*(_write_chunk(chunk) for chunk in chunks(flat, BATCH_WRITE_LIMIT)))
+
+
+async def batch_delete(table_name: str, keys: Iterable[dict]) -> None:
+    await batch_write({table_name: [{"DeleteRequest": {"Key": key}} for key in _dedupe_keys(keys)]})
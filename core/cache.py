@@ -0,0 +1,415 @@
+# core/cache.py
+"""
+Caché read-through con dos niveles:
+  - local: LRU en memoria del proceso, con TTL y tamaño máximo
+  - compartido (opcional): cualquier backend con get/set/delete y versiones
+    por key asíncronos, p. ej. Redis (CACHE_REDIS_URL), que un servidor local
+    puede reemplazar
+
+Las cargas concurrentes de una misma key se agrupan en una sola llamada al
+loader (evita estampidas en keys frías).
+
+Invalidación entre procesos:
+  - los workers de gunicorn (fork tras preload_app) comparten contadores de
+    invalidación en memoria (InvalidationEpochs): una invalidación en un
+    worker descarta la entrada local en todos los demás del mismo host
+  - con backend compartido, cada key tiene además una versión en el backend
+    que invalidate() incrementa. El valor compartido se guarda bajo
+    "<key>@<versión>" con la versión leída antes de cargarlo: un worker que
+    cargó el valor viejo mientras otro invalidaba lo escribe bajo la versión
+    anterior, que nadie vuelve a leer. Las entradas locales guardan la versión
+    con la que se cargaron y se descartan cuando cambia; cada proceso relee la
+    versión como máximo cada CACHE_EPOCH_RECHECK_SECONDS, así que otra
+    instancia puede servir una entrada vieja durante ese intervalo
+  - sin backend compartido, entre instancias distintas (o con workers que no
+    nacen por fork) no hay aviso y una entrada puede quedar vieja hasta
+    CACHE_TTL_SECONDS
+"""
+
+import asyncio
+import json
+import logging
+import multiprocessing
+import time
+import zlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from core import config
+
+logger = logging.getLogger(__name__)
+
+
+class CacheBackend(ABC):
+    """Interfaz de un backend de caché compartido."""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Any]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, *keys: str) -> None:
+        ...
+
+    @abstractmethod
+    async def get_versions(self, keys: List[str]) -> List[int]:
+        """Versión actual de cada key (0 si nunca se invalidó)."""
+
+    @abstractmethod
+    async def bump_versions(self, *keys: str) -> None:
+        ...
+
+
+class MemoryCache(CacheBackend):
+    """LRU en memoria con expiración por TTL. Sin locks: se usa desde un solo event loop."""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (expira_en, valor)
+        self._versions = {}
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self._entries[key] = (time.monotonic() + (ttl or self.ttl), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._entries.pop(key, None)
+
+    # Versiones: solo para usar un MemoryCache como backend compartido en pruebas
+    async def get_versions(self, keys: List[str]) -> List[int]:
+        return [self._versions.get(key, 0) for key in keys]
+
+    async def bump_versions(self, *keys: str) -> None:
+        for key in keys:
+            self._versions[key] = self._versions.get(key, 0) + 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisCache(CacheBackend):
+    """Backend compartido sobre Redis; los valores se guardan como JSON."""
+
+    VERSION_TTL_SECONDS = 7 * 24 * 3600
+
+    def __init__(self, url: str, prefix: str = "cache:"):
+        import redis.asyncio as redis  # Dependencia opcional: solo si se configura CACHE_REDIS_URL
+        self._redis = redis.from_url(url)
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[Any]:
+        raw = await self._redis.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        await self._redis.set(self.prefix + key, json.dumps(value), ex=max(1, int(ttl)))
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            await self._redis.delete(*(self.prefix + key for key in keys))
+
+    def _version_key(self, key: str) -> str:
+        return f"{self.prefix}version:{key}"
+
+    async def get_versions(self, keys: List[str]) -> List[int]:
+        if not keys:
+            return []
+        raws = await self._redis.mget([self._version_key(key) for key in keys])
+        return [int(raw) if raw is not None else 0 for raw in raws]
+
+    async def bump_versions(self, *keys: str) -> None:
+        # Viven mucho más que los valores: si una versión expira y vuelve a 0,
+        # los valores guardados bajo "@0" ya expiraron hace rato
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.incr(self._version_key(key))
+                pipe.expire(self._version_key(key), self.VERSION_TTL_SECONDS)
+            await pipe.execute()
+
+
+class InvalidationEpochs:
+    """
+    Contadores de invalidación por slot (hash de la key) en memoria
+    compartida. Se crean al importar, así que con preload_app los workers de
+    gunicorn heredan la misma memoria. Una entrada local guarda el contador
+    de su slot al empezar la carga; si al leerla el contador cambió, alguien
+    invalidó la key (o otra del mismo slot) y se descarta.
+    """
+
+    def __init__(self, slots: int):
+        self.slots = slots
+        try:
+            self._counters = multiprocessing.RawArray("Q", slots)
+        except OSError as e:
+            # Sin memoria compartida (p. ej. sin /dev/shm): solo cubre al propio proceso
+            logger.warning(f"Contadores de invalidación sin memoria compartida: {e}")
+            self._counters = [0] * slots
+
+    def _slot(self, key: str) -> int:
+        # crc32 y no hash(): tiene que dar lo mismo en todos los procesos
+        return zlib.crc32(key.encode()) % self.slots
+
+    def current(self, key: str) -> int:
+        return self._counters[self._slot(key)]
+
+    def bump(self, key: str) -> None:
+        # No es atómico entre procesos, pero dos incrementos simultáneos igual cambian el valor
+        slot = self._slot(key)
+        self._counters[slot] += 1
+
+
+invalidation_epochs = InvalidationEpochs(config.CACHE_INVALIDATION_SLOTS)
+
+
+class ReadThroughCache:
+    """
+    Caché de lectura con invalidación explícita.
+
+    `serialize`/`deserialize` convierten el valor al formato JSON del backend
+    compartido; en el nivel local se guarda el objeto tal cual, junto con la
+    versión con la que se cargó (ver el docstring del módulo).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        local: MemoryCache,
+        shared: Optional[CacheBackend] = None,
+        serialize: Callable[[Any], Any] = lambda value: value,
+        deserialize: Callable[[Any], Any] = lambda value: value,
+    ):
+        self.name = name
+        self.local = local
+        self.shared = shared
+        self.serialize = serialize
+        self.deserialize = deserialize
+        self.epochs = invalidation_epochs
+        # Versiones del backend compartido ya leídas: se releen cada CACHE_EPOCH_RECHECK_SECONDS
+        self._versions = MemoryCache(local.max_entries, config.CACHE_EPOCH_RECHECK_SECONDS)
+        self._inflight = {}  # key -> Future de la carga en curso
+        self._stale = set()  # keys invalidadas mientras su carga estaba en curso
+        self._counts = {"hits": 0, "shared_hits": 0, "misses": 0, "loads": 0, "coalesced": 0, "invalidations": 0}
+
+    async def _current_epochs(self, keys: List[str]) -> Dict[str, tuple]:
+        """
+        Versión de cada key: (contador local del host, versión compartida). La
+        versión compartida es None sin backend o si el backend no responde;
+        en ese caso el valor no se lee ni se escribe en el compartido.
+        """
+        shared_versions = dict.fromkeys(keys)
+        if self.shared is not None:
+            recheck = config.CACHE_EPOCH_RECHECK_SECONDS > 0
+            pending = []
+            for key in keys:
+                version = await self._versions.get(key) if recheck else None
+                if version is None:
+                    pending.append(key)
+                else:
+                    shared_versions[key] = version
+            if pending:
+                try:
+                    for key, version in zip(pending, await self.shared.get_versions(pending)):
+                        shared_versions[key] = version
+                        if recheck:
+                            await self._versions.set(key, version)
+                except Exception as e:
+                    logger.warning(f"Caché compartido no disponible ({self.name}): {e}")
+        return {key: (self.epochs.current(key), shared_versions[key]) for key in keys}
+
+    async def _local_get(self, key: str, epoch: tuple) -> Optional[Any]:
+        entry = await self.local.get(key)
+        if entry is None:
+            return None
+        loaded_epoch, value = entry
+        if loaded_epoch != epoch:
+            # Invalidada en otro worker o instancia
+            await self.local.delete(key)
+            return None
+        return value
+
+    @staticmethod
+    def _shared_key(key: str, epoch: tuple) -> str:
+        return f"{key}@{epoch[1]}"
+
+    async def _shared_get(self, key: str, epoch: tuple) -> Optional[Any]:
+        if self.shared is None or epoch[1] is None:
+            return None
+        try:
+            raw = await self.shared.get(self._shared_key(key, epoch))
+        except Exception as e:
+            logger.warning(f"Caché compartido no disponible ({self.name}): {e}")
+            return None
+        if raw is None:
+            return None
+        self._counts["shared_hits"] += 1
+        return self.deserialize(raw)
+
+    async def _store(self, key: str, value: Any, epoch: tuple, loaded: bool) -> None:
+        # Si la key se invalidó en este proceso mientras cargábamos, el valor puede estar viejo: no guardarlo.
+        # Si la invalidó otro proceso, la versión cambió y el valor queda bajo la anterior
+        if value is None or key in self._stale:
+            return
+        await self.local.set(key, (epoch, value))
+        if loaded and self.shared is not None and epoch[1] is not None:
+            try:
+                await self.shared.set(self._shared_key(key, epoch), self.serialize(value), self.local.ttl)
+            except Exception as e:
+                logger.warning(f"Caché compartido no disponible ({self.name}): {e}")
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        epoch = (await self._current_epochs([key]))[key]
+        value = await self._local_get(key, epoch)
+        if value is not None:
+            self._counts["hits"] += 1
+            return value
+
+        # Si ya hay una carga de esta key en curso, esperar su resultado
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self._counts["coalesced"] += 1
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await self._load(key, loader, epoch)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # Marcar como leída si nadie más la esperaba
+            raise
+        finally:
+            del self._inflight[key]
+            self._stale.discard(key)
+
+    async def _load(self, key: str, loader, epoch: tuple) -> Any:
+        # `epoch` se lee antes de cargar: si alguien invalida durante la carga, el valor nace viejo
+        value = await self._shared_get(key, epoch)
+        if value is not None:
+            await self._store(key, value, epoch, loaded=False)
+            return value
+
+        self._counts["misses"] += 1
+        self._counts["loads"] += 1
+        value = await loader()
+        await self._store(key, value, epoch, loaded=True)
+        return value
+
+    async def get_many_or_load(
+        self,
+        keys: Iterable[str],
+        loader: Callable[[List[str]], Awaitable[Dict[str, Any]]],
+    ) -> Dict[str, Any]:
+        """
+        Versión por lotes de get_or_load: `loader(keys)` recibe todas las keys
+        que faltan en ambos niveles y retorna {key: valor} (las ausentes no se
+        incluyen). Retorna solo las keys encontradas.
+        """
+        keys = list(dict.fromkeys(keys))
+        epochs = await self._current_epochs(keys)
+        results, waiting, missing = {}, {}, []
+        for key in keys:
+            value = await self._local_get(key, epochs[key])
+            if value is not None:
+                self._counts["hits"] += 1
+                results[key] = value
+            elif key in self._inflight:
+                self._counts["coalesced"] += 1
+                waiting[key] = self._inflight[key]
+            else:
+                missing.append(key)
+
+        if missing:
+            loop = asyncio.get_running_loop()
+            futures = {key: loop.create_future() for key in missing}
+            self._inflight.update(futures)
+            try:
+                loaded = await self._load_many(missing, loader, epochs)
+                for key, future in futures.items():
+                    future.set_result(loaded.get(key))
+                results.update(loaded)
+            except BaseException as e:
+                for future in futures.values():
+                    future.set_exception(e)
+                    future.exception()
+                raise
+            finally:
+                for key in missing:
+                    del self._inflight[key]
+                    self._stale.discard(key)
+
+        for key, future in waiting.items():
+            results[key] = await asyncio.shield(future)
+        return {key: value for key, value in results.items() if value is not None}
+
+    async def _load_many(self, keys: List[str], loader, epochs: Dict[str, tuple]) -> Dict[str, Any]:
+        found = {}
+        for key, value in zip(keys, await asyncio.gather(*(self._shared_get(key, epochs[key]) for key in keys))):
+            if value is not None:
+                found[key] = value
+                await self._store(key, value, epochs[key], loaded=False)
+
+        pending = [key for key in keys if key not in found]
+        if not pending:
+            return found
+
+        self._counts["misses"] += len(pending)
+        self._counts["loads"] += 1
+        loaded = await loader(pending)
+        for key, value in loaded.items():
+            await self._store(key, value, epochs[key], loaded=True)
+        return {**found, **loaded}
+
+    async def invalidate(self, *keys: str) -> None:
+        keys = [key for key in keys if key]
+        self._stale.update(key for key in keys if key in self._inflight)
+        self._counts["invalidations"] += len(keys)
+        for key in keys:
+            self.epochs.bump(key)
+        await self.local.delete(*keys)
+        # Este proceso relee la versión en su próxima lectura, sin esperar CACHE_EPOCH_RECHECK_SECONDS
+        await self._versions.delete(*keys)
+        if self.shared is not None:
+            try:
+                await self.shared.bump_versions(*keys)
+            except Exception as e:
+                logger.error(f"No se pudo invalidar el caché compartido ({self.name}): {e}")
+
+    def stats(self) -> dict:
+        lookups = self._counts["hits"] + self._counts["shared_hits"] + self._counts["misses"]
+        return {
+            "name": self.name,
+            "size": len(self.local),
+            "max_entries": self.local.max_entries,
+            "ttl_seconds": self.local.ttl,
+            "hit_ratio": round((self._counts["hits"] + self._counts["shared_hits"]) / lookups, 3) if lookups else 0.0,
+            **self._counts,
+        }
+
+
+def build_shared_backend(prefix: str) -> Optional[CacheBackend]:
+    """Backend compartido según la configuración (None si no hay)."""
+    if not config.CACHE_REDIS_URL:
+        return None
+    return RedisCache(config.CACHE_REDIS_URL, prefix=prefix)
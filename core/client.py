@@ -1,29 +1,226 @@
+import asyncio
+import contextvars
+import functools
+import threading
 import boto3
+from boto3.dynamodb.types import TypeSerializer
+from botocore.config import Config
+from concurrent.futures import ThreadPoolExecutor
 import os
+from core import config, metrics
+from core.resources import LazyProxy, resources
+
+
+# ================================
+# 🔌 Fábrica de clientes: todos comparten pool, reintentos, timeouts y keep-alive
+# ================================
+def client_config(**overrides) -> Config:
+    """Config de botocore de la app; `overrides` pisa campos puntuales (p. ej. retries)."""
+    base = Config(
+        max_pool_connections=config.AWS_MAX_POOL_CONNECTIONS,
+        retries={"mode": config.AWS_RETRY_MODE, "total_max_attempts": config.AWS_MAX_ATTEMPTS},
+        connect_timeout=config.AWS_CONNECT_TIMEOUT,
+        read_timeout=config.AWS_READ_TIMEOUT,
+        tcp_keepalive=config.AWS_TCP_KEEPALIVE,
+    )
+    return base.merge(Config(**overrides)) if overrides else base
+
+
+class PoolStats:
+    """Requests en curso y totales de un cliente, contados con los eventos de botocore."""
+
+    def __init__(self, name: str, client):
+        self.name = name
+        self.client = client
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.attempts = 0  # cada reintento cuenta como un intento
+        self.errors = 0  # errores de conexión y respuestas 5xx / throttling
+        client.meta.events.register("before-send", self._on_send)
+        client.meta.events.register("response-received", self._on_response)
+
+    def _on_send(self, **kwargs):
+        with self._lock:
+            self.attempts += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def _on_response(self, response_dict=None, exception=None, **kwargs):
+        with self._lock:
+            self.in_flight -= 1
+            status = (response_dict or {}).get("status_code", 0)
+            if exception is not None or status >= 500 or status == 429:
+                self.errors += 1
+
+    def pools(self) -> list:
+        """Pools de urllib3 por host: conexiones creadas vs. tamaño máximo."""
+        try:
+            manager = self.client._endpoint.http_session._manager
+            pools = [manager.pools[key] for key in manager.pools.keys()]
+        except Exception:  # Atributos internos de botocore/urllib3: no romper si cambian
+            return []
+        return [
+            {
+                "host": pool.host,
+                "maxsize": pool.maxsize,
+                "connections_created": pool.num_connections,
+                "requests": pool.num_requests,
+            }
+            for pool in pools
+        ]
+
+    def snapshot(self) -> dict:
+        return {
+            "max_pool_connections": self.client.meta.config.max_pool_connections,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "attempts": self.attempts,
+            "errors": self.errors,
+            "pools": self.pools(),
+        }
+
+
+_pool_stats = {}
+
+
+def build_client(service: str, name: str = None, session=None, **kwargs):
+    """
+    Crea un cliente de boto3 con la config compartida y registra sus
+    estadísticas de pool bajo `name` (por defecto el nombre del servicio).
+    Los kwargs de Config (retries, read_timeout, ...) se aplican sobre la base.
+    """
+    config_overrides = {key: kwargs.pop(key) for key in list(kwargs) if key in Config.OPTION_DEFAULTS}
+    session = session or boto3.session.Session()
+    client = session.client(service, config=client_config(**config_overrides), **kwargs)
+    _pool_stats[name or service] = PoolStats(name or service, client)
+    metrics.instrument_client(client)
+    return client
+
+
+def build_resource(service: str, name: str = None, session=None, **kwargs):
+    """Como build_client, para recursos de boto3 (p. ej. tablas de DynamoDB)."""
+    session = session or boto3.session.Session()
+    resource = session.resource(service, config=client_config(), **kwargs)
+    _pool_stats[name or service] = PoolStats(name or service, resource.meta.client)
+    metrics.instrument_client(resource.meta.client)
+    return resource
+
+
+def pool_stats() -> dict:
+    """Estadísticas de pool de cada cliente creado con la fábrica."""
+    return {name: stats.snapshot() for name, stats in _pool_stats.items()}
+
+
+def _pool_metrics():
+    gauges = {
+        "in_flight": metrics.Gauge("aws_client_requests_in_flight", "Requests HTTP en curso por cliente", ("client",)),
+        "peak_in_flight": metrics.Gauge("aws_client_peak_requests_in_flight", "Máximo de requests en curso por cliente", ("client",)),
+        "max_pool_connections": metrics.Gauge("aws_client_max_pool_connections", "Tamaño del pool de conexiones por cliente", ("client",)),
+    }
+    for name, stats in list(_pool_stats.items()):
+        snapshot = stats.snapshot()
+        for field, gauge in gauges.items():
+            gauge.inc(snapshot[field], client=name)
+    return gauges.values()
+
+metrics.REGISTRY.register_collector(_pool_metrics)
+
 
 # Cargar variables de entorno si existen
 region = os.getenv("AWS_REGION", "ap-southeast-2")
 endpoint_url = os.getenv("DYNAMODB_ENDPOINT")  # será None en producción
 
-# Configurar recursos y clientes según entorno
-if endpoint_url:
-    # LOCAL
-    dynamodb = boto3.resource(
-        'dynamodb',
-        region_name=region,
-        endpoint_url=endpoint_url,
-        aws_access_key_id='test',
-        aws_secret_access_key='test'
-    )
-
-    dynamodbClient = boto3.client(
-        'dynamodb',
-        region_name=region,
-        endpoint_url=endpoint_url,
-        aws_access_key_id='test',
-        aws_secret_access_key='test'
-    )
-else:
+def _dynamodb_kwargs() -> dict:
+    if endpoint_url:
+        # LOCAL
+        return {
+            "region_name": region,
+            "endpoint_url": endpoint_url,
+            "aws_access_key_id": "test",
+            "aws_secret_access_key": "test",
+        }
     # PRODUCCIÓN EN AWS
-    dynamodb = boto3.resource('dynamodb', region_name=region)
-    dynamodbClient = boto3.client('dynamodb', region_name=region)
+    return {"region_name": region}
+
+# Se crean en el primer uso o en el warm del arranque, con una sesión propia
+# (la sesión por defecto de boto3 no es segura entre hilos). Recurso y cliente
+# comparten la sesión para que las excepciones (dynamodbClient.exceptions.X)
+# sean las mismas clases que lanzan las tablas; el cliente se crea después del
+# recurso porque crear clientes de una misma sesión en paralelo no es seguro
+resources.register("dynamodb_session", boto3.session.Session)
+resources.register(
+    "dynamodb",
+    lambda: build_resource("dynamodb", "dynamodb_resource", resources.get("dynamodb_session"), **_dynamodb_kwargs()),
+)
+
+def _build_dynamodb_client():
+    resources.get("dynamodb")
+    return build_client("dynamodb", "dynamodb", resources.get("dynamodb_session"), **_dynamodb_kwargs())
+
+resources.register("dynamodbClient", _build_dynamodb_client)
+
+dynamodb = resources.proxy("dynamodb")
+dynamodbClient = resources.proxy("dynamodbClient")
+
+
+# Serializador para operaciones del cliente de bajo nivel (transacciones)
+_serializer = TypeSerializer()
+
+def to_dynamo_item(item: dict) -> dict:
+    """Convierte un dict de Python al formato tipado ({"S": ...}) del cliente de bajo nivel."""
+    return {key: _serializer.serialize(value) for key, value in item.items()}
+
+
+# ================================
+# ⚡ Acceso asíncrono (pool de hilos acotado para las llamadas bloqueantes de boto3)
+# ================================
+AWS_IO_MAX_WORKERS = config.AWS_IO_MAX_WORKERS
+
+_io_executor = ThreadPoolExecutor(max_workers=AWS_IO_MAX_WORKERS, thread_name_prefix="aws-io")
+
+async def run_io(func, *args, **kwargs):
+    """
+    Ejecuta una llamada bloqueante (boto3) en el pool de I/O y la espera sin
+    bloquear el event loop. Como máximo AWS_IO_MAX_WORKERS llamadas corren a
+    la vez; el resto espera turno en la cola del pool. La llamada corre con
+    el contexto de la petición (para las métricas de core.metrics).
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(_io_executor, functools.partial(context.run, func, *args, **kwargs))
+
+
+class AsyncBoto:
+    """
+    Envoltorio asíncrono para tablas y clientes de boto3: cada método se
+    ejecuta con run_io y se debe esperar con await. Los atributos que no son
+    métodos (p. ej. `exceptions`) se devuelven tal cual.
+    """
+
+    def __init__(self, target):
+        self.sync = target
+
+    def __getattr__(self, name):
+        attr = getattr(self.sync, name)
+        if not callable(attr) or isinstance(attr, type):
+            return attr
+
+        async def call(*args, **kwargs):
+            return await run_io(attr, *args, **kwargs)
+
+        call.__name__ = name
+        return call
+
+
+def aio(target) -> AsyncBoto:
+    """Atajo: aio(dynamodb.Table("x")) o aio(dynamodbClient)."""
+    return AsyncBoto(target)
+
+
+def table(name: str) -> AsyncBoto:
+    """Tabla asíncrona que no crea el recurso de DynamoDB hasta la primera llamada."""
+    return aio(LazyProxy(lambda: dynamodb.Table(name)))
+
+
+adynamodbClient = aio(dynamodbClient)
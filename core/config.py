@@ -1,17 +1,55 @@
 # core/config.py
 
 import logging
+import math
 import os
 import json
-import boto3
 from dotenv import load_dotenv
 from botocore.exceptions import ClientError
+from core.resources import resources
 
 # ================================
 # 🌍 Cargar variables desde .env (solo en desarrollo)
 # ================================
 load_dotenv()
 
+# ================================
+# 🚀 Arranque (los secretos y clientes se crean en el lifespan, no al importar)
+# ================================
+STARTUP_TIMEOUT_SECONDS = float(os.getenv("STARTUP_TIMEOUT_SECONDS", "10"))
+SECRET_REFRESH_SECONDS = float(os.getenv("SECRET_REFRESH_SECONDS", "3600"))  # 0 = no renovar
+
+# ================================
+# 🖥️ Servidor (gunicorn.conf.py y `python application.py`)
+# ================================
+PORT = int(os.getenv("PORT", "8080"))
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1)))  # Procesos worker; cada uno usa un core
+WORKER_MAX_REQUESTS = int(os.getenv("WORKER_MAX_REQUESTS", "20000"))  # Reciclar el worker tras N requests (0 = nunca)
+WORKER_MAX_REQUESTS_JITTER = int(os.getenv("WORKER_MAX_REQUESTS_JITTER", "2000"))  # Para que no se reinicien todos juntos
+WORKER_GRACEFUL_TIMEOUT = int(os.getenv("WORKER_GRACEFUL_TIMEOUT", "30"))  # Segundos para terminar los requests en curso
+SERVER_KEEPALIVE_SECONDS = int(os.getenv("SERVER_KEEPALIVE_SECONDS", "75"))  # Mayor que el idle timeout del balanceador
+LAMBDA_BACKGROUND_TIMEOUT = float(os.getenv("LAMBDA_BACKGROUND_TIMEOUT", "10"))  # lambda_handler: espera de tareas en segundo plano
+
+# ================================
+# 🔌 Clientes de AWS (compartido por todos los clientes de core.client.build_client)
+# ================================
+AWS_IO_MAX_WORKERS = int(os.getenv("AWS_IO_MAX_WORKERS", "32"))  # Llamadas bloqueantes de boto3 en paralelo
+# Cada hilo de I/O usa como máximo una conexión por cliente: con menos conexiones que
+# hilos, los hilos sobrantes esperan o abren conexiones que urllib3 descarta
+AWS_MAX_POOL_CONNECTIONS = int(os.getenv("AWS_MAX_POOL_CONNECTIONS", str(AWS_IO_MAX_WORKERS)))
+AWS_RETRY_MODE = os.getenv("AWS_RETRY_MODE", "adaptive")  # adaptive | standard | legacy
+AWS_MAX_ATTEMPTS = int(os.getenv("AWS_MAX_ATTEMPTS", "3"))  # Incluye el primer intento
+AWS_CONNECT_TIMEOUT = float(os.getenv("AWS_CONNECT_TIMEOUT", "3"))
+AWS_READ_TIMEOUT = float(os.getenv("AWS_READ_TIMEOUT", "10"))
+AWS_TCP_KEEPALIVE = os.getenv("AWS_TCP_KEEPALIVE", "True").lower() in ("true", "1", "yes")
+
+# ================================
+# 📈 Métricas (GET /metrics en formato Prometheus/OpenMetrics)
+# ================================
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")  # Si se define, /metrics exige "Authorization: Bearer <token>"
+METRICS_SERVER_TIMING = os.getenv("METRICS_SERVER_TIMING", "False").lower() in ("true", "1", "yes")
+METRICS_DYNAMODB_CAPACITY = os.getenv("METRICS_DYNAMODB_CAPACITY", "True").lower() in ("true", "1", "yes")
+
 # ================================
 # 🔐 SECRET KEY desde Secrets Manager o .env
 # ================================
@@ -20,7 +58,10 @@ def get_secret_key() -> str:
         secret_name = os.getenv("SECRET_NAME", "CleaningApp")
         region_name = os.getenv("AWS_REGION", "ap-southeast-2")
 
-        client = boto3.client("secretsmanager", region_name=region_name)
+        from core.client import build_client  # core.client importa config
+
+        # Pocos reintentos: sin red, el arranque no debe quedar colgado
+        client = build_client("secretsmanager", region_name=region_name, retries={"mode": "standard", "total_max_attempts": 2})
         response = client.get_secret_value(SecretId=secret_name)
         secret = json.loads(response["SecretString"])
         return secret["SECRET_KEY"]
@@ -38,10 +79,27 @@ def get_secret_key() -> str:
 # ================================
 # 🔐 JWT Config
 # ================================
-SECRET_KEY = get_secret_key()
+resources.register("secret_key", get_secret_key, refresh_seconds=SECRET_REFRESH_SECONDS)
+
+def __getattr__(name):
+    # config.SECRET_KEY se resuelve en cada acceso: refleja las renovaciones del secreto
+    if name == "SECRET_KEY":
+        return resources.get("secret_key")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 REFRESH_TOKEN_EXPIRE_DAYS = 7
+JWT_VERIFIER = os.getenv("JWT_VERIFIER", "jose").lower()  # jose | pyjwt
+JWT_CACHE_MAX_ENTRIES = int(os.getenv("JWT_CACHE_MAX_ENTRIES", "10000"))  # Tokens ya verificados, válidos hasta su exp
+
+# ================================
+# 🔑 Hash de contraseñas (bcrypt)
+# ================================
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))  # Factor de costo; al cambiarlo se re-hashea en el login
+# Por proceso: con varios workers, los cores se reparten entre ellos
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(max(1, (os.cpu_count() or 1) // WEB_CONCURRENCY))))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))  # En cola + en curso; más allá se rechaza con 503
 
 # ================================
 # 🗄️ DynamoDB Config
@@ -54,25 +112,72 @@ DYNAMODB_ENDPOINT = os.getenv("DYNAMODB_ENDPOINT")  # Solo se usa en local
 # ================================
 AWS_S3_BUCKET_NAME = os.getenv("AWS_S3_BUCKET_NAME")
 AWS_S3_PUBLIC = os.getenv("AWS_S3_PUBLIC", "True").lower() in ("true", "1", "yes")
+MAX_IMAGE_UPLOAD_BYTES = int(os.getenv("MAX_IMAGE_UPLOAD_BYTES", str(10 * 1024 * 1024)))  # 10 MB
+
+# Derivados de imágenes (miniatura y tamaños responsive), generados en segundo plano
+IMAGE_PIPELINE_WORKERS = int(os.getenv("IMAGE_PIPELINE_WORKERS", "2"))
+IMAGE_DERIVATIVE_FORMAT = os.getenv("IMAGE_DERIVATIVE_FORMAT", "webp").lower()  # webp | avif
 
 # Crear cliente S3
-if os.getenv("AWS_ACCESS_KEY_ID") and os.getenv("AWS_SECRET_ACCESS_KEY"):
-    # 🧪 Modo local con .env
-    s3_client = boto3.client(
-        "s3",
-        region_name=AWS_REGION,
-        aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-        aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY")
-    )
-else:
+def build_s3_client():
+    from core.client import build_client
+
+    if os.getenv("AWS_ACCESS_KEY_ID") and os.getenv("AWS_SECRET_ACCESS_KEY"):
+        # 🧪 Modo local con .env
+        return build_client(
+            "s3",
+            region_name=AWS_REGION,
+            aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
+            aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY")
+        )
     try:
         # ☁️ Modo producción: usa IAM Role del contenedor (App Runner)
-        s3_client = boto3.client("s3", region_name=AWS_REGION)
-        print("[INFO] Cliente S3 configurado en modo PRODUCCIÓN con IAM Role. {s3_client}")
+        client = build_client("s3", region_name=AWS_REGION)
+        print(f"[INFO] Cliente S3 configurado en modo PRODUCCIÓN con IAM Role. {client}")
+        return client
     except Exception as e:
         logging.error(f"[ERROR] Fallo al configurar cliente S3 en App Runner: {e} ")
         raise RuntimeError("No se pudo configurar el cliente S3 en producción")
 
+resources.register("s3_client", build_s3_client)
+s3_client = resources.proxy("s3_client")  # Se crea en el primer uso (o en el warm del arranque)
+
+# ================================
+# 🧠 Caché de lecturas
+# ================================
+CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", "60"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "2000"))
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL")  # Opcional: caché compartido entre workers/instancias
+CACHE_INVALIDATION_SLOTS = int(os.getenv("CACHE_INVALIDATION_SLOTS", "16384"))  # Contadores compartidos entre workers (8 bytes c/u)
+CACHE_EPOCH_RECHECK_SECONDS = float(os.getenv("CACHE_EPOCH_RECHECK_SECONDS", "1"))  # Con Redis: cada cuánto se relee la versión de una key (0 = en cada lectura)
+
+# ================================
+# 🌐 Caché HTTP / CDN
+# ================================
+BLOG_POST_CACHE_CONTROL = os.getenv("BLOG_POST_CACHE_CONTROL", "public, max-age=60, stale-while-revalidate=300")
+BLOG_LIST_CACHE_CONTROL = os.getenv("BLOG_LIST_CACHE_CONTROL", "public, max-age=30, stale-while-revalidate=120")
+SURROGATE_KEY_HEADER = os.getenv("SURROGATE_KEY_HEADER", "Surrogate-Key")  # Fastly: Surrogate-Key, Cloudflare: Cache-Tag
+
+# ================================
+# 🚦 Límites de tráfico (login, registro y creación de posts)
+# ================================
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_REDIS_URL = os.getenv("RATE_LIMIT_REDIS_URL", CACHE_REDIS_URL or "")  # Opcional: buckets compartidos entre workers/instancias
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))  # Buckets en memoria por proceso
+RATE_LIMIT_TRUSTED_PROXY_HOPS = int(os.getenv("RATE_LIMIT_TRUSTED_PROXY_HOPS", "0"))  # Proxies delante de la app (ALB, CDN) que agregan X-Forwarded-For
+# "N/segundos": N requests por ventana, con ráfagas de hasta N. Vacío o "0" = sin límite
+RATE_LIMIT_LOGIN_IP = os.getenv("RATE_LIMIT_LOGIN_IP", "30/60")
+RATE_LIMIT_LOGIN_IP_EMAIL = os.getenv("RATE_LIMIT_LOGIN_IP_EMAIL", "5/60")  # Por IP + email: un tercero no bloquea la cuenta de otro
+RATE_LIMIT_REGISTER_IP = os.getenv("RATE_LIMIT_REGISTER_IP", "10/600")
+RATE_LIMIT_CREATE_POST_USER = os.getenv("RATE_LIMIT_CREATE_POST_USER", "10/60")
+# Requests en curso por ruta y por proceso (0 = sin límite)
+LOGIN_MAX_CONCURRENCY = int(os.getenv("LOGIN_MAX_CONCURRENCY", "32"))
+REGISTER_MAX_CONCURRENCY = int(os.getenv("REGISTER_MAX_CONCURRENCY", "16"))
+CREATE_POST_MAX_CONCURRENCY = int(os.getenv("CREATE_POST_MAX_CONCURRENCY", "8"))
+# Tamaño máximo del cuerpo del request. Crear/editar posts admite dos imágenes en base64 (compatibilidad)
+MAX_REQUEST_BODY_BYTES = int(os.getenv("MAX_REQUEST_BODY_BYTES", str(256 * 1024)))
+MAX_POST_BODY_BYTES = int(os.getenv("MAX_POST_BODY_BYTES", str(2 * math.ceil(MAX_IMAGE_UPLOAD_BYTES * 4 / 3) + 256 * 1024)))
+
 # ================================
 # 🛢️ PostgreSQL o RDS (opcional)
 # ================================
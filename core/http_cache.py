@@ -0,0 +1,91 @@
+# core/http_cache.py
+"""
+Cabeceras de caché HTTP para endpoints de lectura: ETag / Last-Modified,
+respuestas 304 a peticiones condicionales, Cache-Control configurable y
+surrogate keys para purgar el CDN por post.
+
+Los eventos de purga se emiten a los hooks registrados con
+register_purge_hook (p. ej. una llamada a la API del CDN); por defecto
+solo se registran en el log.
+"""
+
+import asyncio
+import hashlib
+import logging
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Awaitable, Callable, Iterable, List, Optional
+
+from fastapi import Request
+
+from core import config
+
+logger = logging.getLogger(__name__)
+
+_purge_hooks: List[Callable[[List[str]], Optional[Awaitable[None]]]] = []
+
+
+def make_etag(*parts) -> str:
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+    return f'"{digest[:20]}"'
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def http_date(value: datetime) -> str:
+    return format_datetime(_as_utc(value), usegmt=True)
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    """True si la copia del cliente sigue vigente (If-None-Match tiene prioridad)."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in candidates or etag in candidates
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        # Last-Modified tiene resolución de segundos
+        return _as_utc(last_modified).replace(microsecond=0) <= _as_utc(since)
+    return False
+
+
+def cache_headers(
+    etag: str,
+    last_modified: Optional[datetime],
+    surrogate_keys: Iterable[str],
+    cache_control: str,
+) -> dict:
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified:
+        headers["Last-Modified"] = http_date(last_modified)
+    keys = " ".join(surrogate_keys)
+    if keys:
+        headers[config.SURROGATE_KEY_HEADER] = keys
+    return headers
+
+
+def register_purge_hook(hook: Callable[[List[str]], Optional[Awaitable[None]]]) -> None:
+    """Registra una función (síncrona o corrutina) que recibe las surrogate keys a purgar."""
+    _purge_hooks.append(hook)
+
+
+async def emit_purge(keys: Iterable[str]) -> None:
+    """Notifica que las respuestas con estas surrogate keys quedaron obsoletas."""
+    keys = list(keys)
+    if not keys:
+        return
+    logger.info(f"Purga de CDN: {' '.join(keys)}")
+    for hook in _purge_hooks:
+        try:
+            result = hook(keys)
+            if asyncio.iscoroutine(result):
+                await result
+        except Exception as e:
+            logger.error(f"Error en hook de purga {hook}: {e}")
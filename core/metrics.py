@@ -0,0 +1,344 @@
+# core/metrics.py
+"""
+Métricas de la app en formato de texto de Prometheus/OpenMetrics (GET /metrics):
+  - latencia por ruta (plantilla, no la URL) con MetricsMiddleware
+  - latencia y resultado de cada operación de AWS (servicio + operación),
+    medidas con los eventos de botocore de los clientes de la fábrica
+  - capacidad consumida de DynamoDB por tabla y operación
+  - tiempos de operaciones propias de la app (p. ej. bcrypt) con record_timing
+
+Cada proceso (worker) tiene su propio registro; Prometheus agrega por instancia.
+Con METRICS_SERVER_TIMING la respuesta incluye la cabecera Server-Timing con
+el tiempo total y el de cada dependencia llamada durante la petición.
+"""
+
+import contextvars
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from starlette.datastructures import MutableHeaders
+
+from core import config
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric(ABC):
+    """Base de las métricas: nombre, ayuda y valores por combinación de labels."""
+
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()  # Se actualizan desde el event loop y desde los hilos de I/O
+        self._values = {}
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    @abstractmethod
+    def samples(self) -> List[Tuple[str, str, float]]:
+        """(nombre, labels formateados, valor) de cada serie."""
+
+    def render(self, openmetrics: bool = True) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        lines += [f"{name}{labels} {_format_value(value)}" for name, labels, value in self.samples()]
+        return lines
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def total(self, **labels) -> float:
+        """Suma de las series que coinciden con `labels` (todas si no se indican)."""
+        positions = [(self.labelnames.index(name), str(value)) for name, value in labels.items()]
+        with self._lock:
+            return sum(
+                value for key, value in self._values.items()
+                if all(key[i] == expected for i, expected in positions)
+            )
+
+    def samples(self):
+        with self._lock:
+            values = list(self._values.items())
+        return [(f"{self.name}_total", _format_labels(self.labelnames, key), value) for key, value in values]
+
+    def render(self, openmetrics: bool = True) -> List[str]:
+        # OpenMetrics declara el counter sin _total; el formato de texto 0.0.4, con _total
+        lines = super().render(openmetrics)
+        if not openmetrics:
+            lines[0] = f"# HELP {self.name}_total {self.documentation}"
+            lines[1] = f"# TYPE {self.name}_total counter"
+        return lines
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def samples(self):
+        with self._lock:
+            values = list(self._values.items())
+        return [(self.name, _format_labels(self.labelnames, key), value) for key, value in values]
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key) or ([0] * len(self.buckets), 0.0)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            self._values[key] = (counts, total + value)
+
+    def samples(self):
+        with self._lock:
+            values = [(key, list(counts), total) for key, (counts, total) in self._values.items()]
+        samples = []
+        for key, counts, total in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames + ("le",), key + (_format_value(float(bound)),))
+                samples.append((f"{self.name}_bucket", labels, cumulative))
+            labels = _format_labels(self.labelnames, key)
+            samples.append((f"{self.name}_sum", labels, total))
+            samples.append((f"{self.name}_count", labels, cumulative))
+        return samples
+
+
+class Registry:
+    """Métricas registradas más colectores que arman métricas al momento de exportar."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._collectors: List[Callable[[], Iterable[Metric]]] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def register_collector(self, collector: Callable[[], Iterable[Metric]]) -> None:
+        self._collectors.append(collector)
+
+    def render(self, openmetrics: bool = True) -> str:
+        metrics = list(self._metrics.values())
+        for collector in self._collectors:
+            metrics += list(collector())
+        lines = [line for metric in metrics for line in metric.render(openmetrics)]
+        if openmetrics:
+            lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def exposition(accept: Optional[str]) -> Tuple[str, str]:
+    """(cuerpo, content-type) según lo que acepte el scraper."""
+    openmetrics = "application/openmetrics-text" in (accept or "")
+    body = REGISTRY.render(openmetrics)
+    return body, OPENMETRICS_CONTENT_TYPE if openmetrics else PROMETHEUS_CONTENT_TYPE
+
+
+http_request_duration = REGISTRY.register(Histogram(
+    "http_request_duration_seconds", "Latencia de las peticiones HTTP por ruta", ("method", "route", "status"),
+))
+http_requests_in_progress = REGISTRY.register(Gauge(
+    "http_requests_in_progress", "Peticiones HTTP en curso", ("method",),
+))
+aws_request_duration = REGISTRY.register(Histogram(
+    "aws_request_duration_seconds", "Latencia de las llamadas a AWS (incluye reintentos)", ("service", "operation"),
+))
+aws_requests = REGISTRY.register(Counter(
+    "aws_requests", "Llamadas a AWS por resultado (ok, error HTTP o de conexión)", ("service", "operation", "outcome"),
+))
+dynamodb_consumed_capacity = REGISTRY.register(Counter(
+    "dynamodb_consumed_capacity_units", "Unidades de capacidad consumidas en DynamoDB", ("table", "operation"),
+))
+app_operation_duration = REGISTRY.register(Histogram(
+    "app_operation_duration_seconds", "Duración de operaciones propias de la app", ("operation",),
+))
+admission_rejections = REGISTRY.register(Counter(
+    "admission_rejections", "Requests rechazados por rate limit, concurrencia o tamaño del cuerpo", ("limit",),
+))
+
+
+# ================================
+# ⏱️ Tiempos por petición (para Server-Timing)
+# ================================
+# {nombre: [llamadas, segundos]} de la petición en curso. run_io copia el contexto
+# al hilo de I/O, así que los hooks de botocore escriben en el dict de la petición
+_request_timings: contextvars.ContextVar[Optional[dict]] = contextvars.ContextVar("request_timings", default=None)
+
+
+def _add_request_timing(name: str, seconds: float) -> None:
+    timings = _request_timings.get()
+    if timings is not None:
+        entry = timings.setdefault(name, [0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+
+
+def record_timing(operation: str, seconds: float) -> None:
+    """Registra la duración de una operación de la app (histograma y Server-Timing)."""
+    app_operation_duration.observe(seconds, operation=operation)
+    _add_request_timing(operation, seconds)
+
+
+def server_timing_header(total: float, timings: dict) -> str:
+    entries = [f"total;dur={total * 1000:.1f}"]
+    entries += [
+        f'{name};dur={seconds * 1000:.1f};desc="{count}x"'
+        for name, (count, seconds) in sorted(timings.items(), key=lambda item: -item[1][1])
+    ]
+    return ", ".join(entries)
+
+
+# ================================
+# 🔌 Instrumentación de clientes de boto3
+# ================================
+def _record_capacity(operation: str, consumed) -> None:
+    for entry in consumed if isinstance(consumed, list) else [consumed]:
+        if entry and "CapacityUnits" in entry:
+            dynamodb_consumed_capacity.inc(float(entry["CapacityUnits"]), table=entry.get("TableName", ""), operation=operation)
+
+
+def instrument_client(client) -> None:
+    """
+    Registra en el cliente los hooks de latencia por operación y, en DynamoDB,
+    pide ReturnConsumedCapacity=TOTAL (si la llamada no lo pidió) para contarla.
+    """
+    service = client.meta.service_model.service_id.hyphenize()
+    events = client.meta.events
+
+    def on_params(params, model, **kwargs):
+        if "ReturnConsumedCapacity" in model.input_shape.members:
+            params.setdefault("ReturnConsumedCapacity", "TOTAL")
+
+    def on_before_call(model, context, **kwargs):
+        context["metrics_operation"] = model.name
+        context["metrics_start"] = time.perf_counter()
+
+    def finish(model, context, outcome: str) -> None:
+        start = context.pop("metrics_start", None)
+        if start is None:
+            return
+        elapsed = time.perf_counter() - start
+        aws_request_duration.observe(elapsed, service=service, operation=model.name)
+        aws_requests.inc(service=service, operation=model.name, outcome=outcome)
+        _add_request_timing(f"{service}-{model.name}", elapsed)
+
+    def on_after_call(http_response, parsed, model, context, **kwargs):
+        finish(model, context, "ok" if http_response.status_code < 300 else f"http_{http_response.status_code}")
+        if service == "dynamodb" and "ConsumedCapacity" in parsed:
+            _record_capacity(model.name, parsed["ConsumedCapacity"])
+
+    def on_after_call_error(exception, context, **kwargs):
+        start = context.pop("metrics_start", None)
+        if start is not None:
+            operation = context.get("metrics_operation", "unknown")
+            aws_request_duration.observe(time.perf_counter() - start, service=service, operation=operation)
+            aws_requests.inc(service=service, operation=operation, outcome="connection_error")
+
+    if service == "dynamodb" and config.METRICS_DYNAMODB_CAPACITY:
+        events.register(f"provide-client-params.{service}", on_params)
+    events.register(f"before-call.{service}", on_before_call)
+    events.register(f"after-call.{service}", on_after_call)
+    events.register(f"after-call-error.{service}", on_after_call_error)
+
+
+# ================================
+# 🌐 Middleware HTTP
+# ================================
+def route_template(scope) -> str:
+    """Plantilla de la ruta ("/blog/posts/{post_id}") para no crear una serie por URL."""
+    template = getattr(scope.get("route"), "path", None)
+    if not template:
+        return "unmatched"
+    path = scope["path"]
+    if path == template or not template.startswith("/"):
+        return template
+    # Versiones recientes de FastAPI dejan en scope["route"] la ruta del router
+    # incluido, sin el prefijo de include_router: se toma de la URL (los
+    # prefijos de la app no tienen parámetros)
+    depth = path.count("/") - template.count("/")
+    return "/".join(path.split("/")[:depth + 1]) + template if depth > 0 else template
+
+
+class MetricsMiddleware:
+    """Middleware ASGI: latencia por ruta y, opcionalmente, cabecera Server-Timing."""
+
+    def __init__(self, app, server_timing: bool = False):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        start = time.perf_counter()
+        timings = {}
+        token = _request_timings.set(timings)
+        status = 500
+
+        async def send_with_metrics(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.server_timing:
+                    headers = MutableHeaders(raw=list(message.get("headers", [])))
+                    headers.append("Server-Timing", server_timing_header(time.perf_counter() - start, timings))
+                    message["headers"] = headers.raw
+            await send(message)
+
+        http_requests_in_progress.inc(method=method)
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            http_requests_in_progress.dec(method=method)
+            _request_timings.reset(token)
+            http_request_duration.observe(time.perf_counter() - start, method=method, route=route_template(scope), status=status)
@@ -0,0 +1,316 @@
+# core/rate_limit.py
+"""
+Control de admisión para las rutas caras (login, registro, creación de posts):
+  - RateLimiter: token buckets por clave (IP, usuario, email), guardados en
+    memoria del proceso o en un backend compartido (RATE_LIMIT_REDIS_URL),
+    que un Redis local puede reemplazar
+  - ConcurrencyLimit: máximo de requests en curso por ruta y por proceso
+  - BodySizeLimitMiddleware: rechaza cuerpos más grandes que el máximo de la
+    ruta antes de leerlos
+  - RateLimitMiddleware: corre los chequeos de admisión de cada ruta antes de
+    que FastAPI lea y valide el cuerpo
+
+Los rechazos son 429 con Retry-After (413 para el tamaño del cuerpo) y se
+cuentan en core.metrics.admission_rejections.
+"""
+
+import logging
+import math
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi import HTTPException, Request
+from starlette.responses import JSONResponse
+
+from core import config, metrics
+
+logger = logging.getLogger(__name__)
+
+
+class Rate:
+    """`limit` requests cada `period` segundos; se permiten ráfagas de hasta `limit`."""
+
+    def __init__(self, limit: int, period: float):
+        self.limit = limit
+        self.period = period
+        self.per_second = limit / period
+
+    @classmethod
+    def parse(cls, value: Optional[str]) -> Optional["Rate"]:
+        """"10/60" = 10 requests por minuto. Vacío o "0" = sin límite."""
+        if not value or value.strip() in ("0", "off"):
+            return None
+        limit, _, period = value.partition("/")
+        return cls(int(limit), float(period or 1))
+
+    def __repr__(self) -> str:
+        return f"Rate({self.limit}/{self.period:g}s)"
+
+
+class RateLimitBackend(ABC):
+    """Interfaz de un almacén de token buckets."""
+
+    @abstractmethod
+    async def take(self, key: str, rate: Rate, cost: float = 1) -> float:
+        """Consume `cost` tokens; retorna 0 si se admitió o los segundos hasta que haya tokens."""
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """
+    Buckets en memoria del proceso (con varios workers, cada uno tiene los
+    suyos). Sin locks: se usa desde un solo event loop. Con más de
+    `max_keys` claves se descartan las menos usadas, que vuelven llenas.
+    """
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()  # key -> (tokens, actualizado_en)
+
+    async def take(self, key: str, rate: Rate, cost: float = 1) -> float:
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.get(key, (rate.limit, now))
+        tokens = min(rate.limit, tokens + (now - updated_at) * rate.per_second)
+        retry_after = 0.0
+        if tokens >= cost:
+            tokens -= cost
+        else:
+            retry_after = (cost - tokens) / rate.per_second
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return retry_after
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+# Mismo algoritmo que MemoryRateLimitBackend, atómico en Redis y con su reloj
+# (los workers e instancias no comparten reloj). Retorna un string porque Redis
+# trunca a entero los números de Lua.
+_TAKE_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local per_second = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(state[1]) or limit
+local updated_at = tonumber(state[2]) or now
+tokens = math.min(limit, tokens + math.max(0, now - updated_at) * per_second)
+local retry_after = 0
+if tokens >= cost then
+    tokens = tokens - cost
+else
+    retry_after = (cost - tokens) / per_second
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated_at', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(limit / per_second * 1000))
+return tostring(retry_after)
+"""
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """Buckets compartidos entre workers e instancias, en Redis."""
+
+    def __init__(self, url: str, prefix: str = "ratelimit:"):
+        import redis.asyncio as redis  # Dependencia opcional: solo si se configura RATE_LIMIT_REDIS_URL
+        self._redis = redis.from_url(url)
+        self._take = self._redis.register_script(_TAKE_SCRIPT)
+        self.prefix = prefix
+
+    async def take(self, key: str, rate: Rate, cost: float = 1) -> float:
+        retry_after = await self._take(keys=[self.prefix + key], args=[rate.limit, rate.per_second, cost])
+        return float(retry_after)
+
+
+def build_rate_limit_backend() -> Optional[RateLimitBackend]:
+    """Backend compartido según la configuración (None si no hay)."""
+    if not config.RATE_LIMIT_REDIS_URL:
+        return None
+    return RedisRateLimitBackend(config.RATE_LIMIT_REDIS_URL)
+
+
+local_backend = MemoryRateLimitBackend(config.RATE_LIMIT_MAX_KEYS)
+shared_backend = build_rate_limit_backend()
+
+
+def too_many_requests(limit: str, retry_after: float) -> HTTPException:
+    metrics.admission_rejections.inc(limit=limit)
+    return HTTPException(
+        status_code=429,
+        detail="Demasiadas solicitudes, intenta de nuevo más tarde",
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+
+def client_ip(request: Request) -> str:
+    """
+    IP del cliente. Detrás de un balanceador o CDN, la IP de la conexión es la
+    del proxy: con RATE_LIMIT_TRUSTED_PROXY_HOPS = N se toma la N-ésima
+    dirección desde la derecha de X-Forwarded-For (las anteriores las puede
+    inventar el cliente).
+    """
+    hops = config.RATE_LIMIT_TRUSTED_PROXY_HOPS
+    if hops:
+        forwarded = [ip.strip() for ip in request.headers.get("x-forwarded-for", "").split(",") if ip.strip()]
+        if forwarded:
+            return forwarded[-min(hops, len(forwarded))]
+    return request.client.host if request.client else "unknown"
+
+
+class RateLimiter:
+    """
+    Token buckets de una ruta, uno por tipo de clave:
+
+        register_limiter = RateLimiter("register", ip=Rate.parse("10/600"))
+        await register_limiter.hit(ip=client_ip(request))
+
+    `hit` lanza 429 con Retry-After si algún bucket está vacío. Las claves que
+    no dependen del cuerpo se chequean en RateLimitMiddleware, antes de leerlo.
+    """
+
+    def __init__(self, name: str, backend: Optional[RateLimitBackend] = None, **rates: Optional[Rate]):
+        self.name = name
+        self.backend = backend or shared_backend
+        self.rates: Dict[str, Rate] = {kind: rate for kind, rate in rates.items() if rate is not None}
+
+    async def hit(self, **keys: Optional[str]) -> None:
+        if not config.RATE_LIMIT_ENABLED:
+            return
+        for kind, value in keys.items():
+            rate = self.rates.get(kind)
+            if rate is None or not value:
+                continue
+            key = f"{self.name}:{kind}:{str(value).lower()}"
+            retry_after = await self._take(key, rate)
+            if retry_after > 0:
+                raise too_many_requests(f"{self.name}:{kind}", retry_after)
+
+    async def _take(self, key: str, rate: Rate) -> float:
+        if self.backend is not None:
+            try:
+                return await self.backend.take(key, rate)
+            except Exception as e:
+                # Sin el backend compartido se sigue limitando, por proceso
+                logger.warning(f"Backend de rate limit no disponible ({self.name}): {e}")
+        return await local_backend.take(key, rate)
+
+
+class ConcurrencyLimit:
+    """
+    Máximo de requests en curso de una ruta, por proceso. Sin cola: con el
+    límite alcanzado se rechaza con 429 en vez de acumular requests que
+    llegarían tarde igual. `limit` 0 = sin límite.
+
+        async with create_post_slots:
+            ...
+    """
+
+    def __init__(self, name: str, limit: int, retry_after: float = 1):
+        self.name = name
+        self.limit = limit
+        self.retry_after = retry_after
+        self.in_flight = 0
+
+    async def __aenter__(self):
+        if self.limit and config.RATE_LIMIT_ENABLED and self.in_flight >= self.limit:
+            raise too_many_requests(f"{self.name}:concurrency", self.retry_after)
+        self.in_flight += 1
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.in_flight -= 1
+
+
+class BodySizeLimitMiddleware:
+    """
+    Middleware ASGI: rechaza con 413 los cuerpos más grandes que el máximo de
+    la ruta (`limits`, por prefijo de path; `max_bytes` para el resto).
+    Con Content-Length se rechaza sin leer el cuerpo; sin él (chunked), se
+    cuentan los bytes a medida que la app los lee.
+    """
+
+    def __init__(self, app, max_bytes: int, limits: Optional[Dict[str, int]] = None):
+        self.app = app
+        self.max_bytes = max_bytes
+        # El prefijo más largo primero: "/blog/upload/" antes que "/blog/"
+        self.limits = sorted((limits or {}).items(), key=lambda item: len(item[0]), reverse=True)
+
+    def limit_for(self, path: str) -> int:
+        for prefix, max_bytes in self.limits:
+            if path.startswith(prefix):
+                return max_bytes
+        return self.max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        max_bytes = self.limit_for(scope["path"])
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                if value.isdigit() and int(value) > max_bytes:
+                    await self._reject(scope, receive, send, max_bytes)
+                    return
+                break
+
+        received = 0
+
+        async def receive_limited():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_bytes:
+                    # Como HTTPException: FastAPI la deja pasar al leer el cuerpo y responde 413
+                    metrics.admission_rejections.inc(limit="body_size")
+                    raise HTTPException(status_code=413, detail=self._detail(max_bytes))
+            return message
+
+        await self.app(scope, receive_limited, send)
+
+    @staticmethod
+    def _detail(max_bytes: int) -> str:
+        return f"El cuerpo del request supera el máximo de {max_bytes} bytes"
+
+    async def _reject(self, scope, receive, send, max_bytes: int) -> None:
+        metrics.admission_rejections.inc(limit="body_size")
+        response = JSONResponse(
+            {"detail": self._detail(max_bytes)},
+            status_code=413,
+            headers={"Connection": "close"},  # No se lee el resto del cuerpo: la conexión no se reutiliza
+        )
+        await response(scope, receive, send)
+
+
+AdmissionCheck = Callable[[Request], Awaitable[None]]
+
+
+class RateLimitMiddleware:
+    """
+    Middleware ASGI: corre el chequeo de admisión de la ruta (`checks`, por
+    (método, path)) antes de que la app lea el cuerpo. FastAPI lee y parsea
+    el cuerpo antes de resolver las dependencias, así que un límite en el
+    endpoint o en una dependencia llega tarde: el cliente rechazado ya costó
+    el parseo y la validación. El chequeo recibe el Request (sin cuerpo) y
+    lanza HTTPException (429) para rechazar.
+    """
+
+    def __init__(self, app, checks: Dict[Tuple[str, str], AdmissionCheck]):
+        self.app = app
+        self.checks = checks
+
+    async def __call__(self, scope, receive, send):
+        check = self.checks.get((scope.get("method"), scope.get("path"))) if scope["type"] == "http" else None
+        if check is not None:
+            try:
+                await check(Request(scope))
+            except HTTPException as e:
+                response = JSONResponse({"detail": e.detail}, status_code=e.status_code, headers=e.headers)
+                await response(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
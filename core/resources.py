@@ -0,0 +1,214 @@
+# core/resources.py
+"""
+Contenedor de recursos costosos de crear (secretos y clientes de AWS).
+
+Nada se crea al importar: cada recurso se construye la primera vez que se
+usa y queda cacheado. En el arranque de la app (lifespan) `warm()` los crea
+todos a la vez en hilos, con un timeout, para que el primer request no pague
+la latencia; si alguno falla o tarda demasiado, se reintenta en su primer uso.
+
+Con `fail_fast` (la app sirviendo requests) un recurso que falta no se crea
+en el event loop, donde la llamada bloqueante (Secrets Manager, boto3)
+frenaría todos los requests del worker: se lanza ResourceNotReady (503 con
+Retry-After) y el recurso se crea en un hilo. Fuera del event loop (hilos de
+I/O, scripts) se crea en el momento, como siempre.
+
+Los recursos registrados con `refresh_seconds` (p. ej. el SECRET_KEY) se
+vuelven a obtener en segundo plano con `start_refresh()`; si la renovación
+falla se sigue usando el último valor.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from fastapi import HTTPException
+
+logger = logging.getLogger(__name__)
+
+_builder = ThreadPoolExecutor(max_workers=4, thread_name_prefix="resources")
+
+
+class ResourceNotReady(HTTPException):
+    """Un recurso sin crear pedido desde el event loop: 503 mientras se crea en un hilo."""
+
+    def __init__(self, name: str):
+        super().__init__(
+            status_code=503,
+            detail="Servicio inicializándose, intenta de nuevo en unos segundos",
+            headers={"Retry-After": "1"},
+        )
+        self.name = name
+
+
+def _on_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+class Resources:
+    def __init__(self):
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._refresh: Dict[str, float] = {}
+        self._values: Dict[str, Any] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._timings: Dict[str, float] = {}  # segundos que tardó la última creación
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._building: Dict[str, Future] = {}
+        self.fail_fast = False  # Ver docstring del módulo; lo activa el lifespan de la app
+
+    def register(self, name: str, factory: Callable[[], Any], refresh_seconds: Optional[float] = None) -> None:
+        self._factories[name] = factory
+        self._locks.setdefault(name, threading.Lock())
+        if refresh_seconds:
+            self._refresh[name] = refresh_seconds
+
+    @property
+    def factories(self) -> Dict[str, Callable[[], Any]]:
+        return dict(self._factories)
+
+    def override(self, name: str, factory: Callable[[], Any]) -> None:
+        """Reemplaza la fábrica de un recurso (entornos locales, benchmarks) y descarta el valor creado."""
+        self._factories[name] = factory
+        self._values.pop(name, None)
+
+    def _build(self, name: str) -> Any:
+        start = time.perf_counter()
+        value = self._factories[name]()
+        self._timings[name] = time.perf_counter() - start
+        return value
+
+    def get(self, name: str) -> Any:
+        """
+        Valor del recurso; lo crea si todavía no existe. Seguro desde cualquier
+        hilo. Con `fail_fast`, en el event loop lanza ResourceNotReady en vez de
+        crearlo ahí.
+        """
+        try:
+            return self._values[name]
+        except KeyError:
+            pass
+        if self.fail_fast and _on_event_loop():
+            self.build_in_background(name)
+            raise ResourceNotReady(name)
+        with self._locks[name]:
+            if name not in self._values:
+                self._values[name] = self._build(name)
+            return self._values[name]
+
+    def is_ready(self, name: str) -> bool:
+        return name in self._values
+
+    def build_in_background(self, name: str) -> None:
+        """Crea el recurso en un hilo sin esperarlo; una sola creación en curso por recurso."""
+        building = self._building.get(name)
+        if name in self._values or (building is not None and not building.done()):
+            return
+
+        def build():
+            try:
+                self.get(name)
+            except Exception as e:
+                logger.error(f"No se pudo crear el recurso {name}: {e}")
+
+        self._building[name] = _builder.submit(build)
+
+    def proxy(self, name: str) -> "LazyProxy":
+        # Sin cachear en el proxy: si el recurso se reemplaza (override), el proxy lo ve
+        return LazyProxy(lambda: self.get(name), cache=False)
+
+    async def warm(self, names: Optional[Iterable[str]] = None, timeout: float = 10.0) -> Dict[str, Optional[str]]:
+        """
+        Crea los recursos en paralelo (cada uno en un hilo). Retorna
+        {nombre: None si quedó listo, o el error}. No lanza excepciones.
+        """
+        names = list(names or self._factories)
+        loop = asyncio.get_running_loop()
+
+        async def build(name: str) -> Optional[str]:
+            try:
+                await asyncio.wait_for(loop.run_in_executor(None, self.get, name), timeout)
+                return None
+            except asyncio.TimeoutError:
+                # El hilo sigue corriendo; si termina, el valor queda cacheado igual
+                logger.error(f"Timeout creando el recurso {name} ({timeout}s); se reintentará en su primer uso")
+                return "timeout"
+            except Exception as e:
+                logger.error(f"No se pudo crear el recurso {name}: {e}")
+                return str(e)
+
+        results = await asyncio.gather(*(build(name) for name in names))
+        return dict(zip(names, results))
+
+    async def refresh(self, name: str, timeout: float = 10.0) -> bool:
+        """Vuelve a crear el recurso; si falla, conserva el valor anterior."""
+        loop = asyncio.get_running_loop()
+        try:
+            value = await asyncio.wait_for(loop.run_in_executor(None, self._build, name), timeout)
+        except Exception as e:
+            logger.error(f"No se pudo renovar el recurso {name}; se mantiene el anterior: {e}")
+            return False
+        self._values[name] = value
+        return True
+
+    def start_refresh(self, timeout: float = 10.0) -> None:
+        """Lanza la tarea que renueva periódicamente los recursos con refresh_seconds."""
+        if not self._refresh or self._refresh_task is not None:
+            return
+
+        async def run(name: str, every: float):
+            while True:
+                await asyncio.sleep(every)
+                await self.refresh(name, timeout)
+
+        async def run_all():
+            await asyncio.gather(*(run(name, every) for name, every in self._refresh.items()))
+
+        self._refresh_task = asyncio.create_task(run_all())
+
+    async def stop_refresh(self) -> None:
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+
+    def stats(self) -> dict:
+        return {
+            name: {"ready": name in self._values, "build_seconds": round(self._timings.get(name, 0.0), 4)}
+            for name in self._factories
+        }
+
+
+class LazyProxy:
+    """
+    Se comporta como el objeto que crea `factory`, pero lo crea recién en el
+    primer acceso a un atributo. Permite mantener `from core.client import
+    dynamodb` y `aio(...)` a nivel de módulo sin crear clientes al importar.
+    """
+
+    def __init__(self, factory: Callable[[], Any], cache: bool = True):
+        self._factory = factory
+        self._cache = cache
+        self._target = None
+
+    def resolve(self) -> Any:
+        if not self._cache:
+            return self._factory()
+        if self._target is None:
+            self._target = self._factory()
+        return self._target
+
+    def __getattr__(self, name):
+        return getattr(self.resolve(), name)
+
+
+resources = Resources()
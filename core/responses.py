@@ -0,0 +1,56 @@
+# core/responses.py
+"""
+Respuestas JSON sin pasar por la validación de response_model:
+  - ORJSONResponse: serializa con orjson, incluidos los Decimal que retorna
+    boto3 y los modelos de pydantic
+  - item_to_response / model_to_response: arman el dict de respuesta con los
+    campos de un modelo de salida directamente desde el ítem de DynamoDB (o
+    el modelo cacheado), sin volver a validar datos que escribió la app
+
+Un endpoint que retorna un Response se salta la validación y serialización
+de FastAPI; el response_model del decorador queda solo para el OpenAPI.
+"""
+
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Tuple, Type
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+
+def _default(value: Any) -> Any:
+    # Tipos que orjson no serializa por sí solo
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Tipo no serializable: {type(value).__name__}")
+
+
+class ORJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default)
+
+
+@lru_cache(maxsize=None)
+def response_fields(model: Type[BaseModel]) -> Tuple[Tuple[str, Any], ...]:
+    """(campo, valor por defecto) del modelo de salida; None para los requeridos."""
+    return tuple(
+        (name, None if field.is_required() else field.get_default(call_default_factory=True))
+        for name, field in model.model_fields.items()
+    )
+
+
+def item_to_response(item: dict, model: Type[BaseModel]) -> dict:
+    """Campos de `model` tomados del ítem tal cual (los Decimal se convierten al serializar)."""
+    return {name: item.get(name, default) for name, default in response_fields(model)}
+
+
+def model_to_response(obj: BaseModel, model: Type[BaseModel]) -> dict:
+    """Campos de `model` tomados de otro modelo ya validado (p. ej. BlogPost -> BlogPostOut)."""
+    values = obj.__dict__
+    return {name: values.get(name, default) for name, default in response_fields(model)}
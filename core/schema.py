@@ -0,0 +1,164 @@
+# core/schema.py
+"""
+Definiciones de las tablas DynamoDB que usa la aplicación.
+
+Las tablas se crean fuera de la app (consola / IaC); estas definiciones
+sirven para los scripts de migración y para levantar entornos locales
+(DynamoDB Local o moto) con el mismo esquema que producción.
+"""
+
+import time
+
+USERS_TABLE = "cleaning_users_users"
+USER_EMAILS_TABLE = "cleaning_users_emails"
+BLOG_POSTS_TABLE = "blog_posts"
+BLOG_SLUGS_TABLE = "blog_slugs"
+REFRESH_TOKENS_TABLE = "cleaning_users_refresh_tokens"
+BLOG_SEARCH_TABLE = "blog_search_index"
+
+# Índices de listado de posts (más nuevos primero)
+POSTS_BY_DATE_INDEX = "posts-by-date"
+POSTS_BY_AUTHOR_INDEX = "posts-by-author"
+
+# Postings de un término ordenados por peso (búsqueda: los mejores primero)
+SEARCH_POSTINGS_BY_WEIGHT_INDEX = "postings-by-weight"
+
+TABLE_DEFINITIONS = {
+    USERS_TABLE: {
+        "KeySchema": [{"AttributeName": "id", "KeyType": "HASH"}],
+        "AttributeDefinitions": [{"AttributeName": "id", "AttributeType": "S"}],
+    },
+    # Ítem de unicidad email -> id, escrito en la misma transacción que el usuario
+    USER_EMAILS_TABLE: {
+        "KeySchema": [{"AttributeName": "email", "KeyType": "HASH"}],
+        "AttributeDefinitions": [{"AttributeName": "email", "AttributeType": "S"}],
+    },
+    BLOG_POSTS_TABLE: {
+        "KeySchema": [{"AttributeName": "post_id", "KeyType": "HASH"}],
+        "AttributeDefinitions": [
+            {"AttributeName": "post_id", "AttributeType": "S"},
+            {"AttributeName": "listing", "AttributeType": "S"},
+            {"AttributeName": "author_id", "AttributeType": "S"},
+            {"AttributeName": "created_at", "AttributeType": "S"},
+        ],
+        "GlobalSecondaryIndexes": [
+            # Partición constante ("listing") + created_at: listado global ordenado por fecha
+            {
+                "IndexName": POSTS_BY_DATE_INDEX,
+                "KeySchema": [
+                    {"AttributeName": "listing", "KeyType": "HASH"},
+                    {"AttributeName": "created_at", "KeyType": "RANGE"},
+                ],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+            {
+                "IndexName": POSTS_BY_AUTHOR_INDEX,
+                "KeySchema": [
+                    {"AttributeName": "author_id", "KeyType": "HASH"},
+                    {"AttributeName": "created_at", "KeyType": "RANGE"},
+                ],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+        ],
+    },
+    # Reserva de slug -> post_id, escrita con condición para garantizar unicidad
+    BLOG_SLUGS_TABLE: {
+        "KeySchema": [{"AttributeName": "slug", "KeyType": "HASH"}],
+        "AttributeDefinitions": [{"AttributeName": "slug", "AttributeType": "S"}],
+    },
+    # Índice invertido de búsqueda: (término, post_id) -> peso, más un ítem por post
+    # con sus términos ("DOC#<post_id>") y el total de posts indexados ("STATS")
+    BLOG_SEARCH_TABLE: {
+        "KeySchema": [
+            {"AttributeName": "term", "KeyType": "HASH"},
+            {"AttributeName": "post_id", "KeyType": "RANGE"},
+        ],
+        "AttributeDefinitions": [
+            {"AttributeName": "term", "AttributeType": "S"},
+            {"AttributeName": "post_id", "AttributeType": "S"},
+            {"AttributeName": "weight", "AttributeType": "N"},
+        ],
+        "GlobalSecondaryIndexes": [
+            # Solo los postings tienen "weight": los ítems DOC# y STATS no entran al índice
+            {
+                "IndexName": SEARCH_POSTINGS_BY_WEIGHT_INDEX,
+                "KeySchema": [
+                    {"AttributeName": "term", "KeyType": "HASH"},
+                    {"AttributeName": "weight", "KeyType": "RANGE"},
+                ],
+                "Projection": {"ProjectionType": "KEYS_ONLY"},
+            },
+        ],
+    },
+    # Refresh tokens emitidos (por jti) y familias revocadas ("FAMILY#<id>")
+    REFRESH_TOKENS_TABLE: {
+        "KeySchema": [{"AttributeName": "jti", "KeyType": "HASH"}],
+        "AttributeDefinitions": [{"AttributeName": "jti", "AttributeType": "S"}],
+    },
+}
+
+# Atributo (epoch en segundos) con el que DynamoDB borra los ítems vencidos
+TIME_TO_LIVE_ATTRIBUTES = {
+    REFRESH_TOKENS_TABLE: "expires_at",
+}
+
+
+def _wait_until_active(client, name: str, poll_seconds: float):
+    while True:
+        table = client.describe_table(TableName=name)["Table"]
+        indexes = table.get("GlobalSecondaryIndexes", [])
+        if table["TableStatus"] == "ACTIVE" and all(i["IndexStatus"] == "ACTIVE" for i in indexes):
+            return
+        time.sleep(poll_seconds)
+
+
+def create_missing_indexes(client, name: str, poll_seconds: float = 5.0) -> list:
+    """
+    Agrega a una tabla existente los GSI definidos que le falten.
+    DynamoDB solo permite crear un índice por llamada, así que se crean
+    de a uno esperando a que cada uno quede ACTIVE.
+    Retorna la lista de índices creados.
+    """
+    definition = TABLE_DEFINITIONS[name]
+    table = client.describe_table(TableName=name)["Table"]
+    existing = {i["IndexName"] for i in table.get("GlobalSecondaryIndexes", [])}
+    created = []
+    for index in definition.get("GlobalSecondaryIndexes", []):
+        if index["IndexName"] in existing:
+            continue
+        key_names = {k["AttributeName"] for k in index["KeySchema"]}
+        client.update_table(
+            TableName=name,
+            AttributeDefinitions=[
+                a for a in definition["AttributeDefinitions"] if a["AttributeName"] in key_names
+            ],
+            GlobalSecondaryIndexUpdates=[{"Create": index}],
+        )
+        _wait_until_active(client, name, poll_seconds)
+        created.append(index["IndexName"])
+    return created
+
+
+def create_tables(client, names=None) -> list:
+    """
+    Crea las tablas indicadas (o todas) si no existen.
+    Retorna la lista de tablas creadas.
+    """
+    existing = set(client.list_tables().get("TableNames", []))
+    created = []
+    for name in names or TABLE_DEFINITIONS:
+        if name in existing:
+            continue
+        client.create_table(
+            TableName=name,
+            BillingMode="PAY_PER_REQUEST",
+            **TABLE_DEFINITIONS[name],
+        )
+        client.get_waiter("table_exists").wait(TableName=name)
+        if name in TIME_TO_LIVE_ATTRIBUTES:
+            client.update_time_to_live(
+                TableName=name,
+                TimeToLiveSpecification={"Enabled": True, "AttributeName": TIME_TO_LIVE_ATTRIBUTES[name]},
+            )
+        created.append(name)
+    return created
@@ -1,29 +1,90 @@
+import hashlib
+import time
 from datetime import datetime, timedelta
 from fastapi import Depends, HTTPException
 from jose import JWTError, jwt
-from core.config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES, REFRESH_TOKEN_EXPIRE_DAYS
+from core import config
+from core.cache import MemoryCache
+from core.config import ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES, REFRESH_TOKEN_EXPIRE_DAYS
 from fastapi.security import OAuth2PasswordBearer
 
 def create_access_token(data: dict) -> str:
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire, "type": "access"})
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    return jwt.encode(to_encode, config.SECRET_KEY, algorithm=ALGORITHM)
 
 def create_refresh_token(data: dict) -> str:
-    to_encode = {"sub": data.get("sub")}
+    # jti identifica el token en la tabla de refresh tokens y fam la cadena de rotaciones
+    to_encode = {"sub": data.get("sub"), "jti": data.get("jti"), "fam": data.get("fam")}
     expire = datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
     to_encode.update({"exp": expire, "type": "refresh"})
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    return jwt.encode(to_encode, config.SECRET_KEY, algorithm=ALGORITHM)
+
+
+# ================================
+# 🔎 Verificación de tokens
+# ================================
+class JoseVerifier:
+    """Verificador por defecto (python-jose)."""
+    name = "jose"
+
+    def decode(self, token: str) -> dict:
+        return jwt.decode(token, config.SECRET_KEY, algorithms=[ALGORITHM])
+
+
+class PyJWTVerifier:
+    """Verificador con PyJWT (más rápido); requiere `pip install pyjwt`."""
+    name = "pyjwt"
+
+    def __init__(self):
+        import jwt as pyjwt  # Dependencia opcional
+        self._jwt = pyjwt
+
+    def decode(self, token: str) -> dict:
+        try:
+            return self._jwt.decode(token, config.SECRET_KEY, algorithms=[ALGORITHM])
+        except self._jwt.PyJWTError as e:
+            raise JWTError(str(e)) from e
+
+
+VERIFIERS = {"jose": JoseVerifier, "pyjwt": PyJWTVerifier}
+
+def build_verifier(name: str):
+    if name not in VERIFIERS:
+        raise RuntimeError(f"JWT_VERIFIER desconocido: {name} (opciones: {', '.join(VERIFIERS)})")
+    return VERIFIERS[name]()
+
+token_verifier = build_verifier(config.JWT_VERIFIER)
+
+# Claims de tokens ya verificados, por hash del token; cada entrada vive hasta el exp del token
+verified_tokens = MemoryCache(max_entries=config.JWT_CACHE_MAX_ENTRIES, ttl=ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+
+async def verify_token(token: str) -> dict:
+    """
+    Verifica firma y expiración del token y retorna sus claims.
+    Un token ya verificado se sirve desde el caché hasta su exp, sin volver a decodificarlo.
+    """
+    digest = hashlib.sha256(token.encode("utf-8")).hexdigest()
+    claims = await verified_tokens.get(digest)
+    if claims is not None:
+        return claims
+
+    claims = token_verifier.decode(token)
+    remaining = claims.get("exp", 0) - time.time()
+    if remaining > 0:
+        await verified_tokens.set(digest, claims, ttl=remaining)
+    return claims
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/users/login")
 
-def get_current_user(token: str = Depends(oauth2_scheme)):
+async def get_current_user(token: str = Depends(oauth2_scheme)):
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = await verify_token(token)
         user_id = payload.get("sub")
-        if user_id is None:
+        # Solo tokens de acceso: un refresh token no autentica requests
+        if user_id is None or payload.get("type") != "access":
             raise HTTPException(status_code=401, detail="Credenciales inválidas")
         return {
             "id": user_id,
@@ -31,4 +92,4 @@ def get_current_user(token: str = Depends(oauth2_scheme)):
             "name": payload.get("name", "No Name"),
         }
     except JWTError:
-        raise HTTPException(status_code=401, detail="Token inválido o expirado")
\ No newline at end of file
+        raise HTTPException(status_code=401, detail="Token inválido o expirado")
@@ -0,0 +1,60 @@
+# gunicorn.conf.py
+"""
+Modo producción: gunicorn como supervisor de varios workers de uvicorn
+(uvloop + httptools si están instalados, con uvicorn[standard]).
+
+    gunicorn -c gunicorn.conf.py application:app
+
+- WEB_CONCURRENCY workers (por defecto, uno por core): bcrypt y la
+  serialización usan CPU, y un solo proceso de Python usa un solo core.
+- La app se importa una vez en el proceso principal (preload_app) y los
+  workers la heredan al hacer fork. El SECRET_KEY también se obtiene ahí
+  (para validar el secreto antes de levantar workers), pero cada worker lo
+  vuelve a leer al nacer (post_fork): un worker reciclado tras una rotación
+  del secreto no arranca con la clave que el master leyó al iniciar. Si
+  Secrets Manager no responde, el worker se queda con la heredada. Los
+  clientes de AWS y los pools de hilos se crean en cada worker (lifespan):
+  las conexiones no se pueden compartir entre procesos.
+- Cada worker se recicla tras WORKER_MAX_REQUESTS requests (con jitter) y,
+  al reiniciar o desplegar, tiene WORKER_GRACEFUL_TIMEOUT segundos para
+  terminar los requests en curso.
+
+Las métricas de /metrics son por proceso: cada scrape las lee del worker
+que atiende el request.
+"""
+
+import asyncio
+
+from core import config as app_config  # "config" es un setting de gunicorn
+
+bind = f"0.0.0.0:{app_config.PORT}"
+workers = app_config.WEB_CONCURRENCY
+worker_class = "uvicorn_worker.UvicornWorker"
+preload_app = True
+
+max_requests = app_config.WORKER_MAX_REQUESTS
+max_requests_jitter = app_config.WORKER_MAX_REQUESTS_JITTER
+graceful_timeout = app_config.WORKER_GRACEFUL_TIMEOUT
+timeout = 60  # Un worker que no responde al heartbeat en este tiempo se reemplaza
+keepalive = app_config.SERVER_KEEPALIVE_SECONDS
+
+worker_tmp_dir = "/dev/shm"  # Heartbeat de los workers en memoria (en contenedores /tmp puede ser lento)
+accesslog = "-"
+
+
+def when_ready(server):
+    # Después de preload_app y antes del fork: los workers heredan el secreto ya obtenido
+    from core.resources import resources
+
+    failed = asyncio.run(resources.warm(["secret_key"], timeout=app_config.STARTUP_TIMEOUT_SECONDS))["secret_key"]
+    if failed:
+        server.log.warning(f"SECRET_KEY no disponible al arrancar (cada worker lo reintenta): {failed}")
+
+
+def post_fork(server, worker):
+    # El secreto heredado es el del arranque del master; tras una rotación ya no es
+    # el vigente. Se renueva antes de atender requests (si falla, queda el heredado)
+    from core.resources import resources
+
+    if not asyncio.run(resources.refresh("secret_key", timeout=app_config.STARTUP_TIMEOUT_SECONDS)):
+        server.log.warning(f"Worker {worker.pid}: no se pudo renovar el SECRET_KEY; se usa el heredado del master")
@@ -0,0 +1,49 @@
+# lambda_handler.py
+"""
+Entrada para AWS Lambda (API Gateway o Function URL) con Mangum.
+
+    Handler: lambda_handler.handler
+
+El módulo se importa una vez por entorno de ejecución (cold start), en la
+fase de init: ahí se crean los secretos y clientes de AWS, que se reutilizan
+en las invocaciones siguientes (warm start). El lifespan de la app no se
+usa: Mangum lo correría en cada invocación. Tampoco hay renovación periódica
+del SECRET_KEY; cada entorno nuevo lo vuelve a leer.
+
+Lambda congela el proceso apenas el handler retorna, así que las tareas en
+segundo plano que lanzó el request (índice de búsqueda, derivados de
+imágenes) se terminan antes de responder, con un máximo de
+LAMBDA_BACKGROUND_TIMEOUT segundos.
+"""
+
+import asyncio
+import logging
+
+from mangum import Mangum
+
+from application import app
+from core import config
+from core.resources import resources
+
+logger = logging.getLogger(__name__)
+
+_adapter = Mangum(app, lifespan="off")  # Deja configurado el event loop del proceso
+_loop = asyncio.get_event_loop()
+
+_failed = {
+    name: error
+    for name, error in _loop.run_until_complete(resources.warm(timeout=config.STARTUP_TIMEOUT_SECONDS)).items()
+    if error
+}
+if _failed:
+    logger.error(f"Recursos sin inicializar en el cold start (se reintentan en su primer uso): {_failed}")
+
+
+def handler(event, context):
+    response = _adapter(event, context)
+    pending = asyncio.all_tasks(_loop)
+    if pending:
+        _, unfinished = _loop.run_until_complete(asyncio.wait(pending, timeout=config.LAMBDA_BACKGROUND_TIMEOUT))
+        if unfinished:
+            logger.warning(f"{len(unfinished)} tareas en segundo plano siguen pendientes al responder")
+    return response
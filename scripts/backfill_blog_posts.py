@@ -0,0 +1,104 @@
+# scripts/backfill_blog_posts.py
+"""
+Migración de los posts existentes en blog_posts:
+  - reserva en blog_slugs el slug de cada post (búsqueda por slug)
+  - agrega el atributo "listing" que alimenta el índice de listado por fecha
+  - calcula el "excerpt" que muestra /blog/posts en la vista resumida
+
+Debe ejecutarse antes de desplegar la versión que usa esos índices; los
+posts sin migrar no se encuentran por slug ni aparecen en /blog/posts.
+
+Uso:
+    python -m scripts.backfill_blog_posts [--create-table] [--create-indexes] [--dry-run]
+"""
+
+import argparse
+import logging
+
+from core.client import dynamodb, dynamodbClient
+from core.schema import BLOG_POSTS_TABLE, BLOG_SLUGS_TABLE, create_missing_indexes, create_tables
+from blog.services.blog_services import LISTING_PARTITION, make_excerpt
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def iter_posts(projection: str):
+    """Recorre la tabla de posts completa, página por página."""
+    table = dynamodb.Table(BLOG_POSTS_TABLE)
+    scan_kwargs = {"ProjectionExpression": projection}
+    while True:
+        response = table.scan(**scan_kwargs)
+        yield from response.get("Items", [])
+        if "LastEvaluatedKey" not in response:
+            break
+        scan_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+def backfill(dry_run: bool = False) -> dict:
+    posts_table = dynamodb.Table(BLOG_POSTS_TABLE)
+    slugs_table = dynamodb.Table(BLOG_SLUGS_TABLE)
+    stats = {"scanned": 0, "written": 0, "conflicts": 0, "skipped": 0, "listed": 0, "excerpts": 0}
+
+    for post in iter_posts("post_id, slug, listing, excerpt, content"):
+        stats["scanned"] += 1
+
+        fields = {}
+        if post.get("listing") != LISTING_PARTITION:
+            stats["listed"] += 1
+            fields["listing"] = LISTING_PARTITION
+        if post.get("excerpt") is None and post.get("content"):
+            stats["excerpts"] += 1
+            fields["excerpt"] = make_excerpt(post["content"])
+
+        if fields and not dry_run:
+            posts_table.update_item(
+                Key={"post_id": post["post_id"]},
+                UpdateExpression="SET " + ", ".join(f"{k} = :{k}_val" for k in fields),
+                ExpressionAttributeValues={f":{k}_val": v for k, v in fields.items()},
+            )
+
+        if not post.get("slug"):
+            stats["skipped"] += 1
+            continue
+
+        if dry_run:
+            stats["written"] += 1
+            continue
+
+        try:
+            # Idempotente: se puede re-ejecutar, pero nunca roba el slug de otro post
+            slugs_table.put_item(
+                Item={"slug": post["slug"], "post_id": post["post_id"]},
+                ConditionExpression="attribute_not_exists(slug) OR post_id = :post_id_val",
+                ExpressionAttributeValues={":post_id_val": post["post_id"]},
+            )
+            stats["written"] += 1
+        except dynamodbClient.exceptions.ConditionalCheckFailedException:
+            stats["conflicts"] += 1
+            logger.warning(f"Slug duplicado '{post['slug']}': el post {post['post_id']} no quedó reservado")
+
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill de las reservas de slug de los posts")
+    parser.add_argument("--create-table", action="store_true", help="Crear la tabla de slugs si no existe")
+    parser.add_argument("--create-indexes", action="store_true", help="Crear los GSI de listado en blog_posts si faltan")
+    parser.add_argument("--dry-run", action="store_true", help="Solo contar, sin escribir")
+    args = parser.parse_args()
+
+    if args.create_table:
+        created = create_tables(dynamodbClient, [BLOG_SLUGS_TABLE])
+        logger.info(f"Tablas creadas: {created or 'ninguna'}")
+
+    if args.create_indexes:
+        created = create_missing_indexes(dynamodbClient, BLOG_POSTS_TABLE)
+        logger.info(f"Índices creados: {created or 'ninguno'}")
+
+    stats = backfill(dry_run=args.dry_run)
+    logger.info(f"Backfill terminado: {stats}")
+
+
+if __name__ == "__main__":
+    main()
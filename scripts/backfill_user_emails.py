@@ -0,0 +1,81 @@
+# scripts/backfill_user_emails.py
+"""
+Migración: llena la tabla de emails (email -> id) a partir de los usuarios
+existentes en cleaning_users_users.
+
+Debe ejecutarse antes de desplegar la versión que hace login por el índice
+de emails; los usuarios sin ítem de email no podrán iniciar sesión.
+
+Uso:
+    python -m scripts.backfill_user_emails [--create-table] [--dry-run]
+"""
+
+import argparse
+import logging
+
+from core.client import dynamodb, dynamodbClient
+from core.schema import USERS_TABLE, USER_EMAILS_TABLE, create_tables
+from users.services.users_services import email_key
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def iter_users():
+    """Recorre la tabla de usuarios completa, página por página."""
+    table = dynamodb.Table(USERS_TABLE)
+    scan_kwargs = {"ProjectionExpression": "id, email"}
+    while True:
+        response = table.scan(**scan_kwargs)
+        yield from response.get("Items", [])
+        if "LastEvaluatedKey" not in response:
+            break
+        scan_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+def backfill(dry_run: bool = False) -> dict:
+    emails_table = dynamodb.Table(USER_EMAILS_TABLE)
+    stats = {"scanned": 0, "written": 0, "conflicts": 0, "skipped": 0}
+
+    for user in iter_users():
+        stats["scanned"] += 1
+        if not user.get("email"):
+            stats["skipped"] += 1
+            continue
+
+        key = email_key(user["email"])
+        if dry_run:
+            stats["written"] += 1
+            continue
+
+        try:
+            # Idempotente: se puede re-ejecutar, pero nunca pisa el email de otro usuario
+            emails_table.put_item(
+                Item={"email": key, "user_id": user["id"]},
+                ConditionExpression="attribute_not_exists(email) OR user_id = :id",
+                ExpressionAttributeValues={":id": user["id"]},
+            )
+            stats["written"] += 1
+        except dynamodbClient.exceptions.ConditionalCheckFailedException:
+            stats["conflicts"] += 1
+            logger.warning(f"Email duplicado {key}: el usuario {user['id']} no quedó indexado")
+
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill de la tabla de emails de usuarios")
+    parser.add_argument("--create-table", action="store_true", help="Crear la tabla de emails si no existe")
+    parser.add_argument("--dry-run", action="store_true", help="Solo contar, sin escribir")
+    args = parser.parse_args()
+
+    if args.create_table:
+        created = create_tables(dynamodbClient, [USER_EMAILS_TABLE])
+        logger.info(f"Tablas creadas: {created or 'ninguna'}")
+
+    stats = backfill(dry_run=args.dry_run)
+    logger.info(f"Backfill terminado: {stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# scripts/rebuild_search_index.py
+"""
+Reconstruye el índice de búsqueda (blog_search_index) desde blog_posts:
+  1. borra todos los ítems del índice
+  2. indexa cada post (título y contenido) y guarda el total de posts
+
+Sirve para la carga inicial y para corregir desvíos (p. ej. si un
+indexado en segundo plano falló). Mientras corre, las búsquedas pueden
+devolver resultados incompletos.
+
+Con --create-indexes agrega a una tabla existente el GSI por peso que usa
+la búsqueda (los postings ya escritos entran solos al índice, sin
+reindexar); debe ejecutarse antes de desplegar la versión que lo consulta.
+
+Uso:
+    python -m scripts.rebuild_search_index [--create-table] [--create-indexes] [--dry-run]
+"""
+
+import argparse
+import asyncio
+import logging
+
+from blog.services.search_services import STATS_KEY, doc_key, index_requests, term_weights
+from core.batch import batch_delete, batch_write
+from core.client import dynamodb, dynamodbClient
+from core.schema import BLOG_SEARCH_TABLE, create_missing_indexes, create_tables
+from scripts.backfill_blog_posts import iter_posts
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+FLUSH_EVERY = 1000  # Escrituras acumuladas antes de enviarlas (en lotes de 25)
+
+
+def iter_index_keys():
+    table = dynamodb.Table(BLOG_SEARCH_TABLE)
+    scan_kwargs = {"ProjectionExpression": "term, post_id"}
+    while True:
+        response = table.scan(**scan_kwargs)
+        yield from response.get("Items", [])
+        if "LastEvaluatedKey" not in response:
+            break
+        scan_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+async def rebuild(dry_run: bool = False) -> dict:
+    stats = {"deleted": 0, "posts": 0, "postings": 0}
+
+    keys = list(iter_index_keys())
+    stats["deleted"] = len(keys)
+    if not dry_run:
+        await batch_delete(BLOG_SEARCH_TABLE, keys)
+
+    pending = []
+    for post in iter_posts("post_id, title, content, version"):
+        weights = term_weights(post.get("title"), post.get("content"))
+        version = int(post.get("version", 0))
+        stats["posts"] += 1
+        stats["postings"] += len(weights)
+        pending += index_requests(post["post_id"], weights, {}, version)
+        pending.append({"PutRequest": {"Item": {**doc_key(post["post_id"]), "terms": weights, "version": version}}})
+        if len(pending) >= FLUSH_EVERY:
+            if not dry_run:
+                await batch_write({BLOG_SEARCH_TABLE: pending})
+            pending = []
+
+    if not dry_run:
+        if pending:
+            await batch_write({BLOG_SEARCH_TABLE: pending})
+        dynamodb.Table(BLOG_SEARCH_TABLE).put_item(Item={**STATS_KEY, "doc_count": stats["posts"]})
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reconstruye el índice de búsqueda de posts")
+    parser.add_argument("--create-table", action="store_true", help="Crear la tabla del índice si no existe")
+    parser.add_argument("--create-indexes", action="store_true", help="Crear el GSI por peso del índice si falta")
+    parser.add_argument("--dry-run", action="store_true", help="Solo contar, sin escribir")
+    args = parser.parse_args()
+
+    if args.create_table:
+        created = create_tables(dynamodbClient, [BLOG_SEARCH_TABLE])
+        logger.info(f"Tablas creadas: {created or 'ninguna'}")
+
+    if args.create_indexes:
+        created = create_missing_indexes(dynamodbClient, BLOG_SEARCH_TABLE)
+        logger.info(f"Índices creados: {created or 'ninguno'}")
+
+    stats = asyncio.run(rebuild(dry_run=args.dry_run))
+    logger.info(f"Índice reconstruido: {stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+# scripts/sweep_orphan_images.py
+"""
+Barrido de imágenes huérfanas en S3 (mark & sweep).
+
+Las imágenes se guardan por hash y se comparten entre posts, así que
+delete_post y el reemplazo de portadas no pueden borrar el objeto en el
+momento: otro post podría estar usándolo. Este script:
+  1. marca: recorre blog_posts y junta todas las keys referenciadas
+     (cover_url, thumbnail_url y cada URL de cover_srcset)
+  2. barre: lista los prefijos de imágenes del bucket y borra los objetos
+     no referenciados con más antigüedad que el período de gracia
+
+El período de gracia protege las subidas recientes que todavía no se
+vincularon a un post (p. ej. subidas prefirmadas en curso). Cuenta desde
+el último uso: al reutilizar una imagen (deduplicación o subida
+prefirmada) la app renueva su LastModified (s3_utils.touch_if_stale).
+Como un post nuevo puede reutilizar una huérfana entre la marca y el
+barrido, cada candidata se vuelve a leer (HEAD) justo antes de borrarla, de
+a una, y el borrado es condicional al ETag leído (If-Match): se descartan las
+que se usaron o reemplazaron mientras tanto. El período de gracia debe ser
+bastante mayor que s3_utils.TOUCH_AFTER: una imagen reutilizada hace menos
+de TOUCH_AFTER no se renueva, y con una gracia menor se borraría en uso.
+
+Uso:
+    python -m scripts.sweep_orphan_images [--grace-hours 24] [--dry-run]
+"""
+
+import argparse
+import logging
+from datetime import datetime, timedelta, timezone
+
+from botocore.exceptions import ClientError
+
+from blog.utils import s3_utils
+from blog.utils.s3_utils import IMAGES_PREFIX, INCOMING_PREFIX, is_not_found, key_from_url
+from core import config
+from scripts.backfill_blog_posts import iter_posts
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Prefijos con imágenes de posts: los actuales y los de versiones anteriores (keys con uuid)
+SWEEP_PREFIXES = (IMAGES_PREFIX, INCOMING_PREFIX, "uploads/", "cover/", "thumbnail/", "derived/", "posts/")
+
+MIN_GRACE_FACTOR = 2  # La gracia debe ser al menos el doble de TOUCH_AFTER
+
+
+def referenced_keys() -> set:
+    keys = set()
+    for post in iter_posts("cover_url, thumbnail_url, cover_srcset"):
+        urls = [post.get("cover_url"), post.get("thumbnail_url")]
+        urls += [entry.strip().split(" ")[0] for entry in (post.get("cover_srcset") or "").split(",")]
+        keys.update(key for key in map(key_from_url, filter(None, urls)) if key)
+    return keys
+
+
+def iter_objects(prefix: str):
+    paginator = config.s3_client.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=config.AWS_S3_BUCKET_NAME, Prefix=prefix):
+        yield from page.get("Contents", [])
+
+
+def min_grace_hours() -> float:
+    return s3_utils.TOUCH_AFTER.total_seconds() / 3600 * MIN_GRACE_FACTOR
+
+
+def delete_if_orphan(key: str, cutoff: datetime) -> bool:
+    """
+    Relee el objeto y lo borra solo si sigue sin usarse desde `cutoff`. El
+    borrado exige el mismo ETag que el HEAD: si el objeto se reemplazó en el
+    medio, S3 responde 412 y no se borra. False si se reutilizó o ya no existe.
+    """
+    bucket = config.AWS_S3_BUCKET_NAME
+    try:
+        head = config.s3_client.head_object(Bucket=bucket, Key=key)
+        if head["LastModified"] > cutoff:
+            return False
+        config.s3_client.delete_object(Bucket=bucket, Key=key, IfMatch=head["ETag"])
+    except ClientError as e:
+        if is_not_found(e) or e.response.get("Error", {}).get("Code") in ("412", "PreconditionFailed"):
+            return False
+        raise
+    return True
+
+
+def sweep(grace_hours: float = 24, dry_run: bool = False) -> dict:
+    if grace_hours < min_grace_hours():
+        raise ValueError(
+            f"El período de gracia ({grace_hours:g} h) debe ser al menos {min_grace_hours():g} h "
+            f"({MIN_GRACE_FACTOR} veces s3_utils.TOUCH_AFTER)"
+        )
+    referenced = referenced_keys()
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=grace_hours)
+    stats = {"referenced": len(referenced), "listed": 0, "orphans": 0, "reused": 0, "deleted": 0}
+
+    for prefix in SWEEP_PREFIXES:
+        for obj in iter_objects(prefix):
+            stats["listed"] += 1
+            if obj["Key"] in referenced or obj["LastModified"] > cutoff:
+                continue
+            stats["orphans"] += 1
+            if dry_run:
+                continue
+            # De a una y justo antes de borrar: la ventana para que otro request
+            # la reutilice es de un round trip, no de un lote entero de HEADs
+            if delete_if_orphan(obj["Key"], cutoff):
+                stats["deleted"] += 1
+            else:
+                stats["reused"] += 1
+
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Borra imágenes de S3 que ningún post referencia")
+    parser.add_argument("--grace-hours", type=float, default=24, help="No borrar objetos más nuevos que esto")
+    parser.add_argument("--dry-run", action="store_true", help="Solo contar, sin borrar")
+    args = parser.parse_args()
+    if args.grace_hours < min_grace_hours():
+        parser.error(f"--grace-hours debe ser al menos {min_grace_hours():g} ({MIN_GRACE_FACTOR} veces TOUCH_AFTER)")
+
+    stats = sweep(grace_hours=args.grace_hours, dry_run=args.dry_run)
+    logger.info(f"Barrido terminado: {stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# tests/conftest.py
+"""
+Fixtures de los tests: DynamoDB y S3 simulados con moto, con el mismo
+esquema de tablas que producción (core/schema.py), y la app servida con el
+TestClient de FastAPI.
+
+core.* lee el entorno al importarse: las variables se definen antes de
+cualquier import de la app.
+"""
+
+import os
+from uuid import uuid4
+
+TEST_ENV = {
+    "SECRET_KEY": "test-secret",
+    "AWS_ACCESS_KEY_ID": "test",
+    "AWS_SECRET_ACCESS_KEY": "test",
+    "AWS_SECURITY_TOKEN": "test",
+    "AWS_SESSION_TOKEN": "test",
+    "AWS_REGION": "us-east-1",
+    "AWS_DEFAULT_REGION": "us-east-1",
+    "AWS_S3_BUCKET_NAME": "test-bucket",
+    "RATE_LIMIT_ENABLED": "false",  # Los tests crean muchos posts desde una sola IP
+    "BCRYPT_ROUNDS": "4",  # El mínimo de bcrypt: los tests no miden el costo del hash
+}
+os.environ.update(TEST_ENV)
+
+import boto3
+import pytest
+from moto import mock_aws
+
+
+@pytest.fixture(scope="session", autouse=True)
+def aws():
+    with mock_aws():
+        from core.schema import create_tables
+        region = os.environ["AWS_REGION"]
+        create_tables(boto3.client("dynamodb", region_name=region))
+        boto3.client("s3", region_name=region).create_bucket(Bucket=os.environ["AWS_S3_BUCKET_NAME"])
+        yield
+
+
+@pytest.fixture(scope="session")
+def client(aws):
+    from fastapi.testclient import TestClient
+    from application import app
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def s3(aws):
+    return boto3.client("s3", region_name=os.environ["AWS_REGION"])
+
+
+def unique(prefix: str) -> str:
+    """Las tablas se comparten entre tests: emails y títulos no deben repetirse."""
+    return f"{prefix}-{uuid4().hex[:8]}"
+
+
+PASSWORD = "Passw0rd!"
+
+
+def user_payload(**fields) -> dict:
+    """Body de /users/register, con un email nuevo salvo que se pase otro."""
+    return {"email": f"{unique('user')}@example.com", "name": "Test", "role": "admin", "password": PASSWORD, **fields}
+
+
+def post_payload(title: str = None, **fields) -> dict:
+    """Body de /blog/create, con un título nuevo salvo que se pase otro."""
+    return {"title": title or unique("Post"), "content": "contenido del post", "cover": None, "thumbnail": None, **fields}
+
+
+@pytest.fixture
+def register(client):
+    """Registra un usuario nuevo; retorna (body de la respuesta, headers con su access token)."""
+    def _register(**fields):
+        response = client.post("/users/register", json=user_payload(**fields))
+        assert response.status_code == 200, response.text
+        body = response.json()
+        return body, {"Authorization": f"Bearer {body['access_token']}"}
+    return _register
+
+
+@pytest.fixture
+def auth(register):
+    return register()[1]
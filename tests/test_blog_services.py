@@ -0,0 +1,134 @@
+import asyncio
+
+from blog.services import blog_services
+from blog.utils.text_utils import slugify
+from tests.conftest import post_payload, unique
+
+
+def test_create_post(client, auth):
+    title = unique("Primer post")
+    response = client.post("/blog/create", json=post_payload(title), headers=auth)
+    assert response.status_code == 201, response.text
+    post = response.json()
+    assert post["slug"] == slugify(title) and post["version"] == 1
+
+    response = client.get(f"/blog/post/{post['slug']}")
+    assert response.status_code == 200 and response.json()["post_id"] == post["post_id"]
+    assert client.get(f"/blog/post/{post['post_id']}").json()["slug"] == post["slug"]
+
+
+def test_create_requires_auth(client):
+    assert client.post("/blog/create", json=post_payload(unique("Sin auth"))).status_code == 401
+
+
+def test_duplicate_slug(client, auth):
+    title = unique("Repetido")
+    first = client.post("/blog/create", json=post_payload(title), headers=auth).json()
+    assert client.post("/blog/create", json=post_payload(title), headers=auth).status_code == 400
+
+    # Cambiar el slug de otro post a uno en uso también se rechaza
+    other = client.post("/blog/create", json=post_payload(unique("Otro")), headers=auth).json()
+    response = client.patch(f"/blog/edit/{other['post_id']}", json={"slug": first["slug"]}, headers=auth)
+    assert response.status_code == 400
+    assert client.get(f"/blog/post/{first['slug']}").json()["post_id"] == first["post_id"]
+
+
+def test_versioned_edit_conflict(client, auth):
+    post = client.post("/blog/create", json=post_payload(unique("Versionado")), headers=auth).json()
+
+    response = client.patch(f"/blog/edit/{post['post_id']}", json={"title": "Segunda", "version": 1}, headers=auth)
+    assert response.status_code == 200, response.text
+    assert response.json()["version"] == 2 and response.json()["content"] == "contenido del post"
+
+    # Otra edición basada en la versión 1 perdería la anterior: 409
+    response = client.patch(f"/blog/edit/{post['post_id']}", json={"title": "Tercera", "version": 1}, headers=auth)
+    assert response.status_code == 409, response.text
+    assert client.get(f"/blog/post/{post['post_id']}").json()["title"] == "Segunda"
+
+
+def test_pagination_cursor(client, register):
+    user, headers = register()
+    author_id = user["user"]["id"]
+    created = [
+        client.post("/blog/create", json=post_payload(unique(f"Pagina {i}")), headers=headers).json()["post_id"]
+        for i in range(5)
+    ]
+
+    seen, page_token = [], None
+    while True:
+        params = {"author": author_id, "limit": 2, **({"page": page_token} if page_token else {})}
+        response = client.get("/blog/posts", params=params)
+        assert response.status_code == 200, response.text
+        page = response.json()
+        assert len(page["items"]) <= 2
+        seen += [post["post_id"] for post in page["items"]]
+        if not page["has_more"]:
+            break
+        page_token = page["next_token"]
+
+    # Más nuevos primero, sin repetidos ni faltantes entre páginas
+    assert sorted(seen) == sorted(created) and len(seen) == len(set(seen))
+    assert seen == sorted(seen, key=created.index, reverse=True)
+
+    # El cursor va firmado: uno alterado se rechaza
+    assert client.get("/blog/posts", params={"author": author_id, "page": page_token[:-2] + "xx"}).status_code == 400
+
+
+def test_slug_change_distinguishes_deleted_from_conflict(client, auth, monkeypatch):
+    get_item = blog_services.blogposts_table.get_item
+    race = {}
+
+    async def read_then_race(**kwargs):
+        # Otro request actúa entre la lectura del post y la transacción del cambio de slug
+        response = await get_item(**kwargs)
+        await race["action"](kwargs["Key"])
+        return response
+
+    monkeypatch.setattr(blog_services.blogposts_table, "get_item", read_then_race)
+
+    post = client.post("/blog/create", json=post_payload(unique("Editado")), headers=auth).json()
+    race["action"] = lambda key: blog_services.blogposts_table.update_item(
+        Key=key, UpdateExpression="SET version = version + :one", ExpressionAttributeValues={":one": 1},
+    )
+    response = client.patch(f"/blog/edit/{post['post_id']}", json={"slug": unique("nuevo")}, headers=auth)
+    assert response.status_code == 409, response.text
+
+    post = client.post("/blog/create", json=post_payload(unique("Borrado")), headers=auth).json()
+    race["action"] = lambda key: blog_services.blogposts_table.delete_item(Key=key)
+    response = client.patch(f"/blog/edit/{post['post_id']}", json={"slug": unique("nuevo")}, headers=auth)
+    assert response.status_code == 404, response.text
+
+
+def test_posts_batch_uses_listing_projection(client, auth):
+    post = client.post("/blog/create", json=post_payload(unique("Lote")), headers=auth).json()
+    response = client.get("/blog/posts/batch", params={"ids": f"{post['slug']},{unique('falta')}"})
+    assert response.status_code == 200, response.text
+    page = response.json()
+    assert [item["post_id"] for item in page["items"]] == [post["post_id"]] and len(page["missing"]) == 1
+    # Igual que /posts: resumen por defecto, contenido completo solo con full
+    assert set(page["items"][0]) == set(client.get("/blog/posts", params={"limit": 1}).json()["items"][0])
+    full = client.get("/blog/posts/batch", params={"ids": post["post_id"], "full": True}).json()
+    assert full["items"][0]["content"] == post["content"]
+
+
+def test_batch_delete_keeps_slugs_owned_by_other_posts(client, auth):
+    kept = client.post("/blog/create", json=post_payload(unique("Sigue")), headers=auth).json()
+    deleted = client.post("/blog/create", json=post_payload(unique("Borrado")), headers=auth).json()
+    moved = client.post("/blog/create", json=post_payload(unique("Movido")), headers=auth).json()
+    # La reserva del slug de `moved` ya pasó a otro post (su ítem todavía no lo refleja)
+    asyncio.run(blog_services.slugs_table.put_item(Item={"slug": moved["slug"], "post_id": kept["post_id"]}))
+
+    missing = unique("no-existe")
+    response = client.post("/blog/delete/batch", json={"post_ids": [deleted["post_id"], moved["post_id"], missing]}, headers=auth)
+    assert response.status_code == 200, response.text
+    assert sorted(response.json()["deleted"]) == sorted([deleted["post_id"], moved["post_id"]])
+    assert response.json()["not_found"] == [missing]
+
+    assert client.get(f"/blog/post/{deleted['post_id']}").status_code == 404
+    assert asyncio.run(blog_services.get_slug_owner(deleted["slug"])) is None
+    assert asyncio.run(blog_services.get_slug_owner(moved["slug"])) == kept["post_id"]
+
+
+def test_batch_delete_requires_moderator(client, register):
+    _, headers = register(role="user")
+    assert client.post("/blog/delete/batch", json={"post_ids": [unique("post")]}, headers=headers).status_code == 403
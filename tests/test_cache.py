@@ -0,0 +1,111 @@
+import asyncio
+import os
+
+import pytest
+
+from core import config
+from core.cache import CacheBackend, MemoryCache, ReadThroughCache
+from tests.conftest import unique
+
+
+class CountingBackend(MemoryCache):
+    """MemoryCache como backend compartido, contando las lecturas de valores."""
+
+    def __init__(self):
+        super().__init__(1000, 60)
+        self.gets = 0
+
+    async def get(self, key):
+        self.gets += 1
+        return await super().get(key)
+
+
+def loader_returning(*values):
+    calls = []
+
+    async def load():
+        calls.append(1)
+        return values[min(len(calls), len(values)) - 1]
+
+    return load, calls
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="necesita fork")
+def test_invalidation_reaches_forked_workers():
+    key = unique("fork")
+    cache = ReadThroughCache("fork", MemoryCache(100, 60))
+    load, calls = loader_returning("v1", "v2")
+    assert asyncio.run(cache.get_or_load(key, load)) == "v1"
+    assert asyncio.run(cache.get_or_load(key, load)) == "v1" and len(calls) == 1
+
+    # Otro worker (heredó los contadores en el fork) invalida la key
+    pid = os.fork()
+    if pid == 0:
+        other = ReadThroughCache("fork", MemoryCache(100, 60))
+        asyncio.run(other.invalidate(key))
+        os._exit(0)
+    os.waitpid(pid, 0)
+
+    assert asyncio.run(cache.get_or_load(key, load)) == "v2"
+
+    async def load_many(keys):
+        return {k: "m" for k in keys}
+
+    assert asyncio.run(cache.get_many_or_load(["otra", key], load_many)) == {"otra": "m", key: "v2"}
+
+
+def test_shared_backend_keeps_local_tier(monkeypatch):
+    monkeypatch.setattr(config, "CACHE_EPOCH_RECHECK_SECONDS", 60)
+    shared = CountingBackend()
+    key = unique("two-tier")
+    a = ReadThroughCache("a", MemoryCache(100, 60), shared)
+    b = ReadThroughCache("b", MemoryCache(100, 60), shared)
+
+    async def run():
+        load, calls = loader_returning("old")
+        assert await a.get_or_load(key, load) == "old"
+        assert await b.get_or_load(key, load) == "old" and len(calls) == 1  # De lo compartido
+        gets = shared.gets
+        for _ in range(5):
+            assert await b.get_or_load(key, load) == "old"
+        assert shared.gets == gets  # Del nivel local, sin ir al compartido
+
+        await a.invalidate(key)
+        load, _ = loader_returning("new")
+        assert await a.get_or_load(key, load) == "new"  # Quien invalida lo ve enseguida
+        # Otra instancia lo ve al releer la versión (CACHE_EPOCH_RECHECK_SECONDS)
+        await b._versions.delete(key)
+        assert await b.get_or_load(key, load) == "new"
+
+    asyncio.run(run())
+
+
+def test_stale_load_does_not_poison_shared_backend(monkeypatch):
+    monkeypatch.setattr(config, "CACHE_EPOCH_RECHECK_SECONDS", 0)
+    shared = CountingBackend()
+    key = unique("stale")
+    writer = ReadThroughCache("writer", MemoryCache(100, 60), shared)
+    reader = ReadThroughCache("reader", MemoryCache(100, 60), shared)
+
+    async def run():
+        # El reader carga el valor viejo y, antes de guardarlo, otro proceso invalida
+        async def slow_old():
+            await writer.invalidate(key)
+            return "old"
+
+        assert await reader.get_or_load(key, slow_old) == "old"
+        load, calls = loader_returning("new")
+        assert await writer.get_or_load(key, load) == "new" and len(calls) == 1
+        assert await reader.get_or_load(key, load) == "new"
+
+    asyncio.run(run())
+
+
+def test_backend_must_implement_the_whole_interface():
+    class Partial(CacheBackend):
+        async def get(self, key):
+            return None
+
+    # Sin get_versions/bump_versions fallaría recién al invalidar: se rechaza al crearlo
+    with pytest.raises(TypeError):
+        Partial()
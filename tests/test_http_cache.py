@@ -0,0 +1,54 @@
+from core import config, http_cache
+from tests.conftest import post_payload, unique
+
+
+def test_post_conditional_get(client, auth, monkeypatch):
+    post = client.post("/blog/create", json=post_payload(unique("Condicional")), headers=auth).json()
+    url = f"/blog/post/{post['slug']}"
+
+    response = client.get(url)
+    assert response.status_code == 200
+    etag, last_modified = response.headers["etag"], response.headers["last-modified"]
+    assert response.headers["cache-control"] == config.BLOG_POST_CACHE_CONTROL
+    assert response.headers[config.SURROGATE_KEY_HEADER] == f"post-{post['post_id']}"
+
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 304 and response.headers["etag"] == etag and not response.content
+    assert client.get(url, headers={"If-None-Match": f'W/{etag}, "otro"'}).status_code == 304
+    assert client.get(url, headers={"If-Modified-Since": last_modified}).status_code == 304
+    assert client.get(url, headers={"If-Modified-Since": "Mon, 01 Jan 2001 00:00:00 GMT"}).status_code == 200
+    # If-None-Match tiene prioridad sobre If-Modified-Since
+    assert client.get(url, headers={"If-None-Match": '"otro"', "If-Modified-Since": last_modified}).status_code == 200
+
+    # Editar el post cambia su ETag y avisa al CDN
+    purged = []
+    monkeypatch.setattr(http_cache, "_purge_hooks", [purged.extend])
+    assert client.patch(f"/blog/edit/{post['post_id']}", json={"title": "Editado"}, headers=auth).status_code == 200
+    assert f"post-{post['post_id']}" in purged
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200 and response.headers["etag"] != etag
+
+
+def test_listing_conditional_get(client, register):
+    user, headers = register()
+    client.post("/blog/create", json=post_payload(unique("Listado")), headers=headers)
+    params = {"author": user["user"]["id"]}
+
+    response = client.get("/blog/posts", params=params)
+    etag, last_modified = response.headers["etag"], response.headers["last-modified"]
+    assert response.headers["cache-control"] == config.BLOG_LIST_CACHE_CONTROL
+    assert client.get("/blog/posts", params=params, headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/blog/posts", params=params, headers={"If-Modified-Since": last_modified}).status_code == 304
+    # La vista completa es otra representación
+    assert client.get("/blog/posts", params={**params, "full": True}, headers={"If-None-Match": etag}).status_code == 200
+
+    # Un post nuevo cambia la página
+    client.post("/blog/create", json=post_payload(unique("Listado")), headers=headers)
+    assert client.get("/blog/posts", params=params, headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_batch_conditional_get(client, auth):
+    post = client.post("/blog/create", json=post_payload(unique("Lote")), headers=auth).json()
+    params = {"ids": post["post_id"]}
+    etag = client.get("/blog/posts/batch", params=params).headers["etag"]
+    assert client.get("/blog/posts/batch", params=params, headers={"If-None-Match": etag}).status_code == 304
@@ -0,0 +1,136 @@
+import asyncio
+import base64
+import io
+from datetime import datetime, timedelta, timezone
+
+from botocore.exceptions import ClientError
+import pytest
+from PIL import Image
+
+from blog.utils import s3_utils
+from blog.utils.s3_utils import key_from_url
+from core import config
+from scripts import sweep_orphan_images
+from tests.conftest import post_payload, unique
+
+
+def data_url(color: str) -> str:
+    """PNG válido y distinto por color (las claves son el hash del contenido)."""
+    buffer = io.BytesIO()
+    Image.new("RGB", (4, 4), color).save(buffer, "PNG")
+    return "data:image/png;base64," + base64.b64encode(buffer.getvalue()).decode("ascii")
+
+
+def bucket_keys(s3, prefix: str = "") -> set:
+    return {obj["Key"] for obj in s3.list_objects_v2(Bucket=config.AWS_S3_BUCKET_NAME, Prefix=prefix).get("Contents", [])}
+
+
+def test_dedup_reuses_content_key(client, auth, s3):
+    cover = data_url("green")
+    first = client.post("/blog/create", json=post_payload(unique("Dedup"), cover=cover), headers=auth).json()
+    second = client.post("/blog/create", json=post_payload(unique("Dedup"), cover=cover), headers=auth).json()
+    assert first["cover_url"] == second["cover_url"]
+    key = key_from_url(first["cover_url"])
+    assert key.startswith(s3_utils.IMAGES_PREFIX) and key in bucket_keys(s3, s3_utils.IMAGES_PREFIX)
+
+
+def test_dedup_refreshes_stale_object(s3, monkeypatch):
+    image = base64.b64decode(data_url("olive").split(",", 1)[1])
+    key, created = asyncio.run(s3_utils.store_image(image, "image/png"))
+    assert created
+    assert "last-used" not in s3.head_object(Bucket=config.AWS_S3_BUCKET_NAME, Key=key)["Metadata"]
+
+    # Cualquier objeto existente cuenta como viejo: la reutilización lo refresca
+    monkeypatch.setattr(s3_utils, "TOUCH_AFTER", timedelta(seconds=-1))
+    assert asyncio.run(s3_utils.store_image(image, "image/png")) == (key, False)
+    head = s3.head_object(Bucket=config.AWS_S3_BUCKET_NAME, Key=key)
+    assert "last-used" in head["Metadata"] and head["ContentType"] == "image/png"
+
+
+def test_failed_create_keeps_shared_image(client, auth, s3):
+    cover = data_url("navy")
+    existing = client.post("/blog/create", json=post_payload(unique("Compartida"), cover=cover), headers=auth).json()
+    key = key_from_url(existing["cover_url"])
+
+    # La portada deduplica con la del post existente y la miniatura inválida hace fallar el create:
+    # la imagen compartida no se borra (los huérfanos quedan para el barrido)
+    response = client.post(
+        "/blog/create",
+        json=post_payload(unique("Falla"), cover=cover, thumbnail="no-es-una-imagen"),
+        headers=auth,
+    )
+    assert response.status_code >= 400
+    # Lo mismo si falla por slug repetido
+    response = client.post("/blog/create", json=post_payload(existing["title"], cover=cover), headers=auth)
+    assert response.status_code == 400
+
+    assert key in bucket_keys(s3, s3_utils.IMAGES_PREFIX)
+    assert client.get(f"/blog/post/{existing['post_id']}").json()["cover_url"] == existing["cover_url"]
+
+
+def test_sweep_deletes_only_unreferenced(client, auth, s3, monkeypatch):
+    monkeypatch.setattr(s3_utils, "TOUCH_AFTER", timedelta(0))  # Permite gracia 0
+    post = client.post("/blog/create", json=post_payload(unique("Barrido"), cover=data_url("teal")), headers=auth).json()
+    kept = key_from_url(post["cover_url"])
+    orphan = f"{s3_utils.IMAGES_PREFIX}{unique('orphan')}.png"
+    s3.put_object(Bucket=config.AWS_S3_BUCKET_NAME, Key=orphan, Body=b"x")
+
+    stats = sweep_orphan_images.sweep(grace_hours=0, dry_run=True)
+    assert stats["deleted"] == 0 and orphan in bucket_keys(s3)
+
+    stats = sweep_orphan_images.sweep(grace_hours=0)
+    assert stats["deleted"] >= 1
+    keys = bucket_keys(s3)
+    assert orphan not in keys and kept in keys
+
+
+def test_sweep_skips_images_reused_after_listing(s3, monkeypatch):
+    key = f"{s3_utils.IMAGES_PREFIX}{unique('reused')}.png"
+    s3.put_object(Bucket=config.AWS_S3_BUCKET_NAME, Key=key, Body=b"x")
+
+    # El listado ve el objeto como viejo; para cuando se borra, un dedup ya lo
+    # refrescó (LastModified real = ahora, dentro del período de gracia)
+    def stale_listing(prefix):
+        if key.startswith(prefix):
+            yield {"Key": key, "LastModified": datetime.now(timezone.utc) - timedelta(days=2)}
+
+    monkeypatch.setattr(sweep_orphan_images, "iter_objects", stale_listing)
+    stats = sweep_orphan_images.sweep(grace_hours=24)
+    assert stats["orphans"] == 1 and stats["reused"] == 1 and stats["deleted"] == 0
+    assert key in bucket_keys(s3)
+
+
+def test_sweep_rejects_grace_below_touch_after():
+    with pytest.raises(ValueError):
+        sweep_orphan_images.sweep(grace_hours=s3_utils.TOUCH_AFTER.total_seconds() / 3600)
+
+
+def test_sweep_delete_is_conditional_on_etag(s3, monkeypatch):
+    key = f"{s3_utils.IMAGES_PREFIX}{unique('replaced')}.png"
+    s3.put_object(Bucket=config.AWS_S3_BUCKET_NAME, Key=key, Body=b"x")
+    head_object = config.s3_client.head_object
+
+    # Otra escritura reemplaza el objeto entre el HEAD y el borrado
+    def head_then_replace(**kwargs):
+        head = head_object(**kwargs)
+        s3.put_object(Bucket=config.AWS_S3_BUCKET_NAME, Key=key, Body=b"y")
+        return {**head, "LastModified": datetime.now(timezone.utc) - timedelta(days=2)}
+
+    monkeypatch.setattr(config.s3_client, "head_object", head_then_replace)
+    assert not sweep_orphan_images.delete_if_orphan(key, datetime.now(timezone.utc) - timedelta(days=1))
+    assert key in bucket_keys(s3)
+
+
+def test_finalize_upload_maps_only_missing_objects_to_400(client, register, s3, monkeypatch):
+    user, headers = register()
+    key = f"{s3_utils.pending_upload_prefix(user['user']['id'], 'cover')}{unique('subida')}.png"
+    response = client.post("/blog/create", json=post_payload(cover_key=key), headers=headers)
+    assert response.status_code == 400, response.text
+
+    # Cualquier otro error del HEAD es del servidor, no del cliente
+    def denied(**kwargs):
+        raise ClientError({"Error": {"Code": "AccessDenied", "Message": "Access Denied"}}, "HeadObject")
+
+    monkeypatch.setattr(config.s3_client, "head_object", denied)
+    response = client.post("/blog/create", json=post_payload(cover_key=key), headers=headers)
+    assert response.status_code == 500, response.text
@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+
+from blog.routers import blog_routers
+from core import config, metrics
+from core.rate_limit import ConcurrencyLimit, MemoryRateLimitBackend, Rate, RateLimiter
+from tests.conftest import PASSWORD, post_payload, unique
+from users.routers import users
+
+
+@pytest.fixture
+def enabled(monkeypatch):
+    monkeypatch.setattr(config, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(config, "RATE_LIMIT_TRUSTED_PROXY_HOPS", 1)  # IP del cliente desde X-Forwarded-For
+
+
+def limiter(name: str, **rates: str) -> RateLimiter:
+    return RateLimiter(unique(name), backend=MemoryRateLimitBackend(100), **{kind: Rate.parse(rate) for kind, rate in rates.items()})
+
+
+def from_ip(ip: str) -> dict:
+    return {"X-Forwarded-For": ip}
+
+
+def test_bucket_refill():
+    backend = MemoryRateLimitBackend(10)
+    rate = Rate.parse("2/1")
+
+    async def run():
+        assert await backend.take("k", rate) == 0
+        assert await backend.take("k", rate) == 0
+        wait = await backend.take("k", rate)
+        assert 0 < wait <= 0.5
+        await asyncio.sleep(0.55)
+        assert await backend.take("k", rate) == 0
+
+    asyncio.run(run())
+    assert Rate.parse("0") is None and Rate.parse("") is None
+
+
+def test_login_ip_limit_runs_before_body_parsing(client, enabled, monkeypatch):
+    login_limiter = limiter("login", ip="2/60")
+    monkeypatch.setattr(users, "login_limiter", login_limiter)
+    headers = {**from_ip("203.0.113.1"), "content-type": "application/json"}
+    for _ in range(2):
+        assert client.post("/users/login", content=b"{no es json", headers=headers).status_code == 422
+
+    # El bucket vacío rechaza sin llegar a parsear el cuerpo (si no, sería 422)
+    response = client.post("/users/login", content=b"{no es json", headers=headers)
+    assert response.status_code == 429 and int(response.headers["retry-after"]) >= 1
+    assert metrics.admission_rejections.total(limit=f"{login_limiter.name}:ip") >= 1
+    assert client.post("/users/login", content=b"{no es json", headers={**headers, **from_ip("203.0.113.2")}).status_code == 422
+
+
+def test_login_email_limit_is_per_ip(client, register, enabled, monkeypatch):
+    monkeypatch.setattr(users, "login_limiter", limiter("login", ip="100/60", ip_email="2/60"))
+    email = register()[0]["user"]["email"]
+    attacker, owner = from_ip("198.51.100.7"), from_ip("198.51.100.8")
+
+    codes = [client.post("/users/login", json={"email": email, "password": "wrong"}, headers=attacker).status_code for _ in range(3)]
+    assert codes == [400, 400, 429]
+    # Los intentos fallidos de otro no bloquean al dueño de la cuenta
+    assert client.post("/users/login", json={"email": email, "password": PASSWORD}, headers=owner).status_code == 200
+
+
+def test_create_post_limit_per_user(client, register, enabled, monkeypatch):
+    monkeypatch.setattr(blog_routers, "create_post_limiter", limiter("create_post", user="1/60"))
+    _, headers = register()
+    assert client.post("/blog/create", json=post_payload(), headers=headers).status_code == 201
+    # Rechazado por usuario antes de leer el cuerpo, aunque sea inválido
+    assert client.post("/blog/create", content=b"{no es json", headers={**headers, "content-type": "application/json"}).status_code == 429
+    _, other = register()
+    assert client.post("/blog/create", json=post_payload(), headers=other).status_code == 201
+
+
+def test_concurrency_limit(enabled):
+    slots = ConcurrencyLimit("test", 1)
+
+    async def run():
+        async with slots:
+            with pytest.raises(Exception) as error:
+                async with slots:
+                    pass
+            assert error.value.status_code == 429
+        async with slots:
+            pass
+
+    asyncio.run(run())
+
+
+def test_body_size_limit(client, auth):
+    too_big = b"x" * (config.MAX_REQUEST_BODY_BYTES + 1)
+    assert client.post("/users/login", content=too_big, headers={"content-type": "application/json"}).status_code == 413
+
+    # Sin Content-Length (chunked): se cuentan los bytes a medida que se leen
+    def chunks():
+        for _ in range(5):
+            yield b"x" * (config.MAX_REQUEST_BODY_BYTES // 2)
+
+    response = client.post("/users/login", content=chunks(), headers={"content-type": "application/json"})
+    assert response.status_code == 413, response.text
+
+    # Crear posts admite cuerpos más grandes (imágenes en base64)
+    response = client.post("/blog/create", content=b'{"x": "' + b"a" * 300000 + b'"}', headers={**auth, "content-type": "application/json"})
+    assert response.status_code == 422
@@ -0,0 +1,47 @@
+import asyncio
+import threading
+
+import pytest
+
+from core.resources import ResourceNotReady, Resources
+
+
+def test_fail_fast_builds_off_the_event_loop():
+    resources = Resources()
+    release = threading.Event()
+    threads = []
+
+    def slow_factory():
+        threads.append(threading.current_thread().name)
+        release.wait(5)
+        return "valor"
+
+    resources.register("slow", slow_factory)
+    resources.fail_fast = True
+
+    async def on_loop():
+        return resources.get("slow")
+
+    with pytest.raises(ResourceNotReady) as error:
+        asyncio.run(on_loop())
+    assert error.value.status_code == 503 and not resources.is_ready("slow")
+
+    release.set()
+    resources._building["slow"].result(5)
+    assert resources.is_ready("slow") and asyncio.run(on_loop()) == "valor"
+    assert threads == [threads[0]] and threads[0].startswith("resources")
+
+
+def test_without_fail_fast_builds_in_place():
+    resources = Resources()
+    resources.register("fast", lambda: 1)
+
+    async def on_loop():
+        return resources.get("fast")
+
+    assert asyncio.run(on_loop()) == 1
+
+
+def test_ready_endpoint(client):
+    response = client.get("/ready")
+    assert response.status_code == 200 and response.json() == {"ready": True}
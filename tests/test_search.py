@@ -0,0 +1,110 @@
+import asyncio
+
+from boto3.dynamodb.conditions import Key
+
+from blog.services import search_services
+from tests.conftest import post_payload, unique
+
+
+def term() -> str:
+    # Solo letras: slugify no lo parte en varios términos
+    return unique("termino").replace("-", "")
+
+
+async def postings_of(post_id: str, *terms: str) -> dict:
+    found = {}
+    for t in terms:
+        response = await search_services.search_table.query(KeyConditionExpression=Key("term").eq(t) & Key("post_id").eq(post_id))
+        for item in response.get("Items", []):
+            found[t] = int(item["weight"])
+    return found
+
+
+def test_cap_keeps_heaviest_postings_and_flags_inexact_total(monkeypatch):
+    monkeypatch.setattr(search_services, "MAX_POSTINGS_PER_TERM", 3)
+    common, rare = term(), term()
+
+    async def run():
+        for i in range(6):
+            await search_services.search_table.put_item(Item={"term": common, "post_id": f"cap-{i}", "weight": i + 1})
+        await search_services.search_table.put_item(Item={"term": rare, "post_id": "cap-1", "weight": 1})
+
+        found, truncated = await search_services.postings(common)
+        assert truncated and [post_id for post_id, _ in found] == ["cap-5", "cap-4", "cap-3"]
+        ids, total, exact = await search_services.search(common, 10)
+        assert sorted(ids) == ["cap-3", "cap-4", "cap-5"] and total == 3 and not exact
+        ids, total, exact = await search_services.search(rare, 10)
+        assert ids == ["cap-1"] and total == 1 and exact
+
+    asyncio.run(run())
+
+
+def test_older_version_does_not_overwrite_newer():
+    post_id, old, new = unique("post"), term(), term()
+
+    async def run():
+        await search_services.index_post(post_id, new, "", 3)
+        await search_services.index_post(post_id, old, "", 2)  # Llega tarde
+        assert await postings_of(post_id, old, new) == {new: search_services.TITLE_WEIGHT}
+
+    asyncio.run(run())
+
+
+def test_interleaved_reindex_leaves_no_stale_terms(monkeypatch):
+    post_id, kept, dropped = unique("post"), term(), term()
+    put_posting = search_services._put_posting
+    release = None
+
+    async def delayed_put(post_id_, term_, weight, version):
+        # Los puts de la versión 2 llegan después de que la 3 terminó
+        if version == 2:
+            await release.wait()
+        await put_posting(post_id_, term_, weight, version)
+
+    async def run():
+        nonlocal release
+        release = asyncio.Event()
+        await search_services.index_post(post_id, kept, "", 1)
+        monkeypatch.setattr(search_services, "_put_posting", delayed_put)
+
+        older = asyncio.create_task(search_services.index_post(post_id, f"{kept} {dropped}", "", 2))
+        await asyncio.sleep(0.05)  # La versión 2 ya reclamó el post y espera para escribir
+        await search_services.index_post(post_id, kept, "contenido", 3)
+        release.set()
+        await older
+
+        assert await postings_of(post_id, kept, dropped) == {kept: search_services.TITLE_WEIGHT}
+
+    asyncio.run(run())
+
+
+def test_removed_post_is_not_reindexed_by_a_late_job():
+    post_id, word = unique("post"), term()
+
+    async def run():
+        await search_services.index_post(post_id, word, "", 1)
+        await search_services.remove_post(post_id)
+        await search_services.index_post(post_id, word, "", 2)  # Atrasado: el post ya no existe
+        assert await postings_of(post_id, word) == {}
+        ids, _, _ = await search_services.search(word, 10)
+        assert post_id not in ids
+
+    asyncio.run(run())
+
+
+def test_search_endpoint(client, auth):
+    word = term()
+    first = client.post("/blog/create", json=post_payload(f"{word} {word}"), headers=auth).json()
+    second = client.post("/blog/create", json=post_payload(content=f"solo menciona {word}"), headers=auth).json()
+
+    async def wait_index():
+        while search_services._index_tasks:
+            await asyncio.sleep(0.01)
+
+    for _ in range(100):
+        page = client.get("/blog/search", params={"q": word}).json()
+        if page["total"] == 2:
+            break
+        asyncio.run(wait_index())
+    assert [post["post_id"] for post in page["items"]] == [first["post_id"], second["post_id"]]
+    assert page["total_exact"] and "content" not in page["items"][0]
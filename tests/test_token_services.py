@@ -0,0 +1,62 @@
+import asyncio
+
+from tests.conftest import PASSWORD
+from users.services import token_services
+
+
+def refresh(client, token: str):
+    return client.post("/users/refresh", json={"refresh_token": token})
+
+
+def test_refresh_rotates_tokens(client, register):
+    user, _ = register()
+    response = refresh(client, user["refresh_token"])
+    assert response.status_code == 200, response.text
+    rotated = response.json()
+    assert rotated["refresh_token"] != user["refresh_token"]
+    me = client.get("/users/me", headers={"Authorization": f"Bearer {rotated['access_token']}"})
+    assert me.status_code == 200 and me.json()["id"] == user["user"]["id"]
+
+    # El siguiente de la familia también se puede canjear
+    assert refresh(client, rotated["refresh_token"]).status_code == 200
+
+
+def test_reused_refresh_token_revokes_family(client, register):
+    user, _ = register()
+    rotated = refresh(client, user["refresh_token"]).json()
+
+    # El token ya canjeado vuelve a llegar (robado): se rechaza y se revoca la sesión entera
+    assert refresh(client, user["refresh_token"]).status_code == 401
+    assert refresh(client, rotated["refresh_token"]).status_code == 401
+
+    # Otras sesiones del mismo usuario no se ven afectadas
+    other = client.post("/users/login", json={"email": user["user"]["email"], "password": PASSWORD}).json()
+    assert refresh(client, other["refresh_token"]).status_code == 200
+
+
+def test_logout_revokes_family(client, register):
+    user, _ = register()
+    rotated = refresh(client, user["refresh_token"]).json()
+    assert client.post("/users/logout", json={"refresh_token": rotated["refresh_token"]}).status_code == 204
+    assert refresh(client, rotated["refresh_token"]).status_code == 401
+
+
+def test_refresh_uses_current_role(client, register):
+    user, _ = register(role="admin")
+    asyncio.run(token_services.users_table.update_item(
+        Key={"id": user["user"]["id"]},
+        UpdateExpression="SET #role = :role",
+        ExpressionAttributeNames={"#role": "role"},
+        ExpressionAttributeValues={":role": "user"},
+    ))
+    rotated = refresh(client, user["refresh_token"]).json()
+
+    # El access token nuevo sale del ítem del usuario, no del refresh token: ya no es admin
+    admin_only = "/users/metrics/password-hashing"
+    assert client.get(admin_only, headers={"Authorization": f"Bearer {user['access_token']}"}).status_code == 200
+    assert client.get(admin_only, headers={"Authorization": f"Bearer {rotated['access_token']}"}).status_code == 403
+
+
+def test_access_token_is_not_a_refresh_token(client, register):
+    user, _ = register()
+    assert refresh(client, user["access_token"]).status_code == 401
@@ -0,0 +1,36 @@
+from tests.conftest import PASSWORD, unique, user_payload
+
+
+def test_register_returns_tokens(client):
+    payload = user_payload(role="user")
+    response = client.post("/users/register", json=payload)
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["user"]["email"] == payload["email"] and body["user"]["role"] == "user"
+    assert body["access_token"] and body["refresh_token"] and body["token_type"] == "bearer"
+
+
+def test_register_duplicate_email(client):
+    payload = user_payload()
+    assert client.post("/users/register", json=payload).status_code == 200
+    assert client.post("/users/register", json=payload).status_code == 400
+    # El índice de emails normaliza mayúsculas y espacios
+    assert client.post("/users/register", json={**payload, "email": payload["email"].upper()}).status_code == 400
+
+
+def test_login(client, register):
+    user, _ = register()
+    email = user["user"]["email"]
+
+    response = client.post("/users/login", json={"email": email.upper(), "password": PASSWORD})
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["user"]["id"] == user["user"]["id"]
+    me = client.get("/users/me", headers={"Authorization": f"Bearer {body['access_token']}"})
+    assert me.status_code == 200 and me.json()["email"] == email
+
+
+def test_login_invalid_credentials(client, register):
+    email = register()[0]["user"]["email"]
+    assert client.post("/users/login", json={"email": email, "password": "wrong"}).status_code == 400
+    assert client.post("/users/login", json={"email": f"{unique('nobody')}@example.com", "password": PASSWORD}).status_code == 400
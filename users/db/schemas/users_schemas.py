@@ -46,6 +46,9 @@ class UserLogin(BaseModel):
     class Config:
         from_attributes = True  # Actualiza 'orm_mode' a 'from_attributes'
 
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
 class UserLoginOut(BaseModel):
     access_token: str
     refresh_token: str
@@ -1,26 +1,71 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from core import config
+from core.rate_limit import ConcurrencyLimit, Rate, RateLimiter, client_ip
+from core.security import get_current_user
 from users.db.models.users import User
-from users.db.schemas.users_schemas import AuthResponse, UserCreate, UserLogin, UserLoginOut
-from users.services.users_services import create_user, login_user
+from users.db.schemas.users_schemas import AuthResponse, RefreshRequest, UserCreate, UserLogin, UserLoginOut, UserOut
+from users.services.users_services import create_user, get_user_profile, login_user
+from users.services.password_services import password_hasher
+from users.services.token_services import revoke_refresh_token, rotate_refresh_token
 
 router = APIRouter(tags=["users"],
                 responses={status.HTTP_404_NOT_FOUND:{"message":"Not found"}})
 
+# Login y registro cuestan un hash bcrypt (cientos de ms de CPU): se limitan antes de empezar
+# Por IP + email y no solo email: cualquiera podría agotar el bucket de la cuenta de otro y bloquearla
+login_limiter = RateLimiter("login", ip=Rate.parse(config.RATE_LIMIT_LOGIN_IP), ip_email=Rate.parse(config.RATE_LIMIT_LOGIN_IP_EMAIL))
+register_limiter = RateLimiter("register", ip=Rate.parse(config.RATE_LIMIT_REGISTER_IP))
+login_slots = ConcurrencyLimit("login", config.LOGIN_MAX_CONCURRENCY)
+register_slots = ConcurrencyLimit("register", config.REGISTER_MAX_CONCURRENCY)
+
+# Chequeos de RateLimitMiddleware (application.py): corren antes de leer el cuerpo
+async def admit_login(request: Request):
+    await login_limiter.hit(ip=client_ip(request))
+
+async def admit_register(request: Request):
+    await register_limiter.hit(ip=client_ip(request))
+
 @router.post("/register", response_model=AuthResponse, tags=["users"])
-def register(user: UserCreate):
+async def register(user: UserCreate, request: Request):
     try:
-        return create_user(user)  
+        async with register_slots:
+            return await create_user(user)
     except HTTPException as e:
         raise e
     except Exception:
         raise HTTPException(status_code=500, detail="Internal server error (routers/users.py /register.)")
     
 @router.post("/login", response_model=AuthResponse, tags=["users"])
-async def login(user: UserLogin):
+async def login(user: UserLogin, request: Request):
+    # El límite por IP ya se aplicó (admit_login); este necesita el email del cuerpo
+    await login_limiter.hit(ip_email=f"{client_ip(request)}|{user.email}")
     try:
-        return login_user(user)  
+        async with login_slots:
+            return await login_user(user)
     except HTTPException as e:
         raise e
-    except Exception:
+    except Exception as e:
         print(f"Unexpected error: {e}")
         raise HTTPException(status_code=500, detail="Internal server error (routers/users.py /login)")
+
+
+@router.post("/refresh", response_model=UserLoginOut, tags=["users"])
+async def refresh(body: RefreshRequest):
+    return await rotate_refresh_token(body.refresh_token)
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT, tags=["users"])
+async def logout(body: RefreshRequest):
+    await revoke_refresh_token(body.refresh_token)
+
+
+@router.get("/me", response_model=UserOut, tags=["users"])
+async def me(user=Depends(get_current_user)):
+    return await get_user_profile(user["id"])
+
+
+@router.get("/metrics/password-hashing", tags=["users"])
+async def password_hashing_metrics(user=Depends(get_current_user)):
+    if user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Forbidden")
+    return password_hasher.stats()
@@ -0,0 +1,121 @@
+# users/services/password_services.py
+
+import asyncio
+import logging
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+from fastapi import HTTPException
+
+from core import config, metrics
+
+logger = logging.getLogger(__name__)
+
+
+class PasswordHasher:
+    """
+    Hash y verificación de contraseñas con bcrypt en un pool de hilos propio.
+
+    bcrypt libera el GIL mientras calcula, así que un pool de hilos del tamaño
+    de los cores aprovecha la CPU sin ocupar el pool de I/O de AWS. Si hay más
+    de `max_pending` operaciones en cola o en curso, se rechaza con 503 en vez
+    de acumular latencia para todos.
+    """
+
+    def __init__(self, workers: int, max_pending: int, rounds: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.rounds = rounds
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._pending = 0
+        self._latencies = deque(maxlen=1024)  # segundos, últimas operaciones
+        self._counts = {"hash": 0, "verify": 0, "rejected": 0, "rehash": 0}
+
+    async def _submit(self, operation: str, func, *args):
+        if self._pending >= self.max_pending:
+            self._counts["rejected"] += 1
+            raise HTTPException(
+                status_code=503,
+                detail="Server busy, please retry",
+                headers={"Retry-After": "1"},
+            )
+
+        self._pending += 1
+        start = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
+        finally:
+            self._pending -= 1
+            elapsed = time.perf_counter() - start
+            self._latencies.append(elapsed)
+            self._counts[operation] += 1
+            metrics.record_timing(f"bcrypt-{operation}", elapsed)
+
+    async def hash(self, password: str) -> str:
+        salt = bcrypt.gensalt(rounds=self.rounds)
+        hashed = await self._submit("hash", bcrypt.hashpw, password.encode("utf-8"), salt)
+        return hashed.decode("utf-8")
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._submit(
+            "verify", bcrypt.checkpw, password.encode("utf-8"), hashed_password.encode("utf-8")
+        )
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """True si el hash se generó con un factor de costo distinto al configurado."""
+        try:
+            return int(hashed_password.split("$")[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
+
+    def stats(self) -> dict:
+        latencies = sorted(self._latencies)
+
+        def percentile(p: float) -> float:
+            if not latencies:
+                return 0.0
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000, 2)
+
+        busy = min(self._pending, self.workers)
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "rounds": self.rounds,
+            "busy_workers": busy,
+            "queued": self._pending - busy,
+            "utilisation": round(busy / self.workers, 2),
+            "latency_ms_p50": percentile(0.50),
+            "latency_ms_p95": percentile(0.95),
+            "latency_ms_p99": percentile(0.99),
+            **self._counts,
+        }
+
+
+password_hasher = PasswordHasher(
+    workers=config.PASSWORD_HASH_WORKERS,
+    max_pending=config.PASSWORD_HASH_MAX_PENDING,
+    rounds=config.BCRYPT_ROUNDS,
+)
+
+# Re-hashes en curso: se guarda la referencia para que el GC no cancele la tarea
+_rehash_tasks = set()
+
+
+def schedule_rehash(password: str, save) -> None:
+    """
+    Re-hashea la contraseña con el costo actual fuera del request de login.
+    `save(new_hash)` es la corrutina que persiste el nuevo hash.
+    """
+    async def rehash():
+        try:
+            await save(await password_hasher.hash(password))
+            password_hasher._counts["rehash"] += 1
+        except Exception as e:
+            logger.error(f"Error re-hasheando contraseña: {e}")
+
+    task = asyncio.create_task(rehash())
+    _rehash_tasks.add(task)
+    task.add_done_callback(_rehash_tasks.discard)
@@ -0,0 +1,168 @@
+# users/services/token_services.py
+"""
+Refresh tokens con rotación y detección de reutilización.
+
+Cada refresh token emitido tiene un ítem en REFRESH_TOKENS_TABLE (por jti).
+Refrescar no calcula bcrypt: lee el usuario por clave (nombre y rol
+vigentes) y escribe en una transacción. Los tokens de una misma sesión
+forman una familia (`fam`):
+  - al refrescar, el token usado se marca con `used_at` y se emite otro de
+    la misma familia, en la misma transacción
+  - si llega un token ya usado (robado y reutilizado), se revoca la familia
+    entera escribiendo el ítem "FAMILY#<fam>"; logout hace lo mismo
+Todos los ítems llevan `expires_at` para que el TTL de DynamoDB los borre.
+"""
+
+import logging
+import time
+from typing import Optional
+from uuid import uuid4
+
+from fastapi import HTTPException
+from jose import JWTError
+
+from core.client import adynamodbClient, dynamodbClient, table, to_dynamo_item
+from core.config import REFRESH_TOKEN_EXPIRE_DAYS
+from core.schema import REFRESH_TOKENS_TABLE, USERS_TABLE
+from core.security import create_access_token, create_refresh_token, token_verifier
+from users.db.schemas.users_schemas import UserLoginOut
+
+logger = logging.getLogger(__name__)
+
+refresh_table = table(REFRESH_TOKENS_TABLE)
+users_table = table(USERS_TABLE)
+
+REFRESH_TOKEN_TTL_SECONDS = REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60
+
+
+def family_key(family_id: str) -> str:
+    return f"FAMILY#{family_id}"
+
+
+def refresh_item(jti: str, family_id: str, user: dict, expires_at: int) -> dict:
+    return {
+        "jti": jti,
+        "family_id": family_id,
+        "user_id": user["id"],
+        "issued_at": int(time.time()),
+        "expires_at": expires_at,
+    }
+
+
+def _new_refresh_token(user: dict, family_id: str):
+    """Retorna (token, ítem a guardar)."""
+    jti = uuid4().hex
+    token = create_refresh_token(data={"sub": user["id"], "jti": jti, "fam": family_id})
+    return token, refresh_item(jti, family_id, user, int(time.time()) + REFRESH_TOKEN_TTL_SECONDS)
+
+
+async def issue_refresh_token(user: dict) -> str:
+    """Refresh token de una sesión nueva (login / registro)."""
+    token, item = _new_refresh_token(user, uuid4().hex)
+    await refresh_table.put_item(Item=item)
+    return token
+
+
+def decode_refresh_token(token: str) -> dict:
+    try:
+        claims = token_verifier.decode(token)
+    except JWTError:
+        raise HTTPException(status_code=401, detail="Token inválido o expirado")
+    if claims.get("type") != "refresh" or not claims.get("jti") or not claims.get("fam"):
+        raise HTTPException(status_code=401, detail="Token inválido o expirado")
+    return claims
+
+
+async def revoke_family(family_id: str) -> None:
+    """Revoca todos los refresh tokens de la familia, incluido el vigente."""
+    # Ningún token de la familia vive más que un refresh token recién emitido
+    await refresh_table.put_item(Item={
+        "jti": family_key(family_id),
+        "revoked_at": int(time.time()),
+        "expires_at": int(time.time()) + REFRESH_TOKEN_TTL_SECONDS,
+    })
+
+
+async def load_user(user_id: str) -> Optional[dict]:
+    """Nombre y rol vigentes del usuario (sin caché: un cambio de rol aplica en el próximo refresh)."""
+    item = (await users_table.get_item(
+        Key={"id": user_id},
+        ProjectionExpression="id, #name, #role",
+        ExpressionAttributeNames={"#name": "name", "#role": "role"},
+    )).get("Item")
+    return {"id": item["id"], "name": item["name"], "role": item["role"]} if item else None
+
+
+async def rotate_refresh_token(token: str) -> UserLoginOut:
+    """
+    Canjea un refresh token por un access token nuevo y el siguiente refresh
+    token de la familia. El token canjeado queda inutilizable.
+
+    Los datos del access token salen del ítem del usuario, no del refresh
+    token: degradar o eliminar al usuario aplica en el próximo refresh.
+    Marcar el token como usado y guardar el nuevo es una sola transacción:
+    si falla, no se escribe nada y el cliente puede reintentar con el
+    mismo token sin que se tome como reutilización.
+    """
+    claims = decode_refresh_token(token)
+    user_id, jti, family_id = claims["sub"], claims["jti"], claims["fam"]
+
+    user = await load_user(user_id)
+    if not user:
+        await revoke_family(family_id)
+        raise HTTPException(status_code=401, detail="Token inválido o expirado")
+
+    new_token, item = _new_refresh_token(user, family_id)
+    try:
+        await adynamodbClient.transact_write_items(
+            TransactItems=[
+                # Token canjeado: debe existir, ser de este usuario y no estar usado
+                {
+                    "Update": {
+                        "TableName": REFRESH_TOKENS_TABLE,
+                        "Key": to_dynamo_item({"jti": jti}),
+                        "UpdateExpression": "SET used_at = :now",
+                        "ConditionExpression": "attribute_exists(jti) AND attribute_not_exists(used_at) AND user_id = :user_id",
+                        "ExpressionAttributeValues": to_dynamo_item({":now": int(time.time()), ":user_id": user_id}),
+                    }
+                },
+                # La familia no fue revocada (logout o reutilización)
+                {
+                    "ConditionCheck": {
+                        "TableName": REFRESH_TOKENS_TABLE,
+                        "Key": to_dynamo_item({"jti": family_key(family_id)}),
+                        "ConditionExpression": "attribute_not_exists(jti)",
+                    }
+                },
+                {
+                    "Put": {
+                        "TableName": REFRESH_TOKENS_TABLE,
+                        "Item": to_dynamo_item(item),
+                        "ConditionExpression": "attribute_not_exists(jti)",
+                    }
+                },
+            ]
+        )
+    except dynamodbClient.exceptions.TransactionCanceledException as e:
+        codes = [reason.get("Code") for reason in e.response.get("CancellationReasons") or []]
+        if codes and codes[0] == "ConditionalCheckFailed":
+            # El token ya se había canjeado (o no existe): reutilización
+            logger.warning(f"Reutilización de refresh token detectada; se revoca la familia {family_id}")
+            await revoke_family(family_id)
+            raise HTTPException(status_code=401, detail="Token inválido o expirado")
+        if "ConditionalCheckFailed" in codes:
+            raise HTTPException(status_code=401, detail="Token inválido o expirado")
+        # Conflicto con otra transacción u otro error transitorio: nada se escribió, se puede reintentar
+        raise HTTPException(status_code=503, detail="No se pudo renovar la sesión, intenta de nuevo")
+
+    return UserLoginOut(
+        access_token=create_access_token(data={"sub": user["id"], "name": user["name"], "role": user["role"]}),
+        refresh_token=new_token,
+        token_type="bearer",
+    )
+
+
+async def revoke_refresh_token(token: str) -> None:
+    """Logout: revoca la sesión (familia) a la que pertenece el refresh token."""
+    claims = decode_refresh_token(token)
+    await revoke_family(claims["fam"])
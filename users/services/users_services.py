@@ -1,9 +1,13 @@
 from users.db.schemas.users_schemas import AuthResponse, UserCreate, UserLogin, UserLoginOut, UserOut
-from core.security import create_access_token, create_refresh_token
+from core.security import create_access_token
 from fastapi import HTTPException
 from datetime import datetime
-import bcrypt
-from core.client import dynamodb
+from core.client import adynamodbClient, dynamodbClient, table, to_dynamo_item
+from core import config
+from core.cache import MemoryCache, ReadThroughCache, build_shared_backend
+from core.schema import USERS_TABLE, USER_EMAILS_TABLE
+from users.services.password_services import password_hasher, schedule_rehash
+from users.services.token_services import issue_refresh_token
 import logging
 from uuid import uuid4
 
@@ -12,21 +16,30 @@ from uuid import uuid4
 logging.basicConfig(level=logging.ERROR)
 logger = logging.getLogger(__name__)
 
-users_table = dynamodb.Table("cleaning_users_users")
+users_table = table(USERS_TABLE)
+emails_table = table(USER_EMAILS_TABLE)  # email -> id (unicidad y búsqueda O(1))
 
-def create_user(user: UserCreate) -> AuthResponse:
+# Perfil público de usuarios por id (sin hashed_password), para no ir a DynamoDB en cada request
+users_cache = ReadThroughCache(
+    "users",
+    MemoryCache(config.CACHE_MAX_ENTRIES, config.CACHE_TTL_SECONDS),
+    build_shared_backend("users:"),
+)
+
+def email_key(email: str) -> str:
+    """Normaliza el email para usarlo como clave del índice de emails."""
+    return email.strip().lower()
+
+async def create_user(user: UserCreate) -> AuthResponse:
     try:
         if not user.email or not user.name or not user.password:
             raise HTTPException(status_code=400, detail="All fields are required")
 
-        response = users_table.scan(
-            FilterExpression="email = :email_val",
-            ExpressionAttributeValues={":email_val": user.email}
-        )
-        if response["Count"] > 0:
+        # Chequeo rápido para no gastar bcrypt en emails ya registrados
+        if "Item" in await emails_table.get_item(Key={"email": email_key(user.email)}):
             raise HTTPException(status_code=400, detail="Could not process the request")
 
-        hashed_password = bcrypt.hashpw(user.password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')    # Hash de la contraseña
+        hashed_password = await password_hasher.hash(user.password)    # Hash de la contraseña
         
         user_id = str(uuid4())  # Generar un UUID único para el usuario
 
@@ -44,12 +57,36 @@ def create_user(user: UserCreate) -> AuthResponse:
             "picture": user.image
         }
 
-        users_table.put_item(Item=item)
+        # Usuario + reserva del email en una sola transacción: si otro registro
+        # con el mismo email gana la carrera, la condición cancela ambos writes
+        try:
+            await adynamodbClient.transact_write_items(
+                TransactItems=[
+                    {
+                        "Put": {
+                            "TableName": USER_EMAILS_TABLE,
+                            "Item": to_dynamo_item({"email": email_key(user.email), "user_id": user_id}),
+                            "ConditionExpression": "attribute_not_exists(email)",
+                        }
+                    },
+                    {
+                        "Put": {
+                            "TableName": USERS_TABLE,
+                            "Item": to_dynamo_item(item),
+                            "ConditionExpression": "attribute_not_exists(id)",
+                        }
+                    },
+                ]
+            )
+        except dynamodbClient.exceptions.TransactionCanceledException:
+            raise HTTPException(status_code=400, detail="Could not process the request")
 
         # Generar tokens
         try:
             access_token = create_access_token(data={"sub": user_id, "name":user.name, "role": user.role})
-            refresh_token = create_refresh_token(data={"sub": user_id})
+            refresh_token = await issue_refresh_token({"id": user_id, "name": user.name, "role": user.role})
+        except HTTPException:
+            raise  # p. ej. 503 si el SECRET_KEY todavía no está disponible
         except Exception as token_error:
             logger.error(f"Error generating tokens: {token_error}")
             raise HTTPException(status_code=500, detail="Error generating tokens")
@@ -79,26 +116,35 @@ def create_user(user: UserCreate) -> AuthResponse:
         logger.error(f"Unexpected error: {e}")
         raise HTTPException(status_code=500, detail="Internal server error (users_services.py /create_user)")
 
-def login_user(user: UserLogin) -> AuthResponse:
+async def login_user(user: UserLogin) -> AuthResponse:
     if not user.email or not user.password:
             raise HTTPException(status_code=400, detail="All fields are required")
-    db_user = users_table.scan(
-            FilterExpression="email = :email_val",
-            ExpressionAttributeValues={":email_val": user.email}
-        )
-    
-    if db_user["Count"] == 0:        
+    email_item = (await emails_table.get_item(Key={"email": email_key(user.email)})).get("Item")
+    if not email_item:
+         raise HTTPException(status_code=400, detail="Invalid credentials")
+
+    db_user = (await users_table.get_item(Key={"id": email_item["user_id"]})).get("Item")
+    if not db_user:
          raise HTTPException(status_code=400, detail="Invalid credentials")
-    
-    db_user = db_user["Items"][0]
 
      # Verificar que la contraseña proporcionada coincide con el hash almacenado
-    if not bcrypt.checkpw(user.password.encode('utf-8'), db_user["hashed_password"].encode('utf-8')):
+    if not await password_hasher.verify(user.password, db_user["hashed_password"]):
         raise HTTPException(status_code=400, detail="Invalid credentials")
+
+    # Si cambió el factor de costo, re-hashear con la contraseña en claro que ya tenemos
+    if password_hasher.needs_rehash(db_user["hashed_password"]):
+        async def save_hash(new_hash: str):
+            await users_table.update_item(
+                Key={"id": db_user["id"]},
+                UpdateExpression="SET hashed_password = :new_hash",
+                ConditionExpression="hashed_password = :old_hash",
+                ExpressionAttributeValues={":new_hash": new_hash, ":old_hash": db_user["hashed_password"]},
+            )
+        schedule_rehash(user.password, save_hash)
     
     # Si la contraseña es correcta, generar los tokens
     access_token = create_access_token(data={"sub": db_user["id"], "name": db_user["name"], "role": db_user["role"]})
-    refresh_token = create_refresh_token(data={"sub": db_user["id"]})
+    refresh_token = await issue_refresh_token(db_user)
     
     # Construir la respuesta con los tokens y la información del usuario
     return AuthResponse(
@@ -113,4 +159,24 @@ def login_user(user: UserLogin) -> AuthResponse:
         access_token=access_token,
         refresh_token=refresh_token,
         token_type="bearer"
-    )
\ No newline at end of file
+    )
+
+
+async def get_user_profile(user_id: str) -> UserOut:
+    async def load():
+        item = (await users_table.get_item(Key={"id": user_id})).get("Item")
+        if not item:
+            return None
+        return {
+            "id": item["id"],
+            "email": item["email"],
+            "name": item["name"],
+            "role": item["role"],
+            "picture": item.get("picture"),
+            "created_at": item.get("created_at"),
+        }
+
+    profile = await users_cache.get_or_load(user_id, load)
+    if not profile:
+        raise HTTPException(status_code=404, detail="User not found")
+    return UserOut(**profile)